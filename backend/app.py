@@ -7,20 +7,38 @@ from pathlib import Path
 
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
+import json
+import asyncio
 
-from backend.schemas.validate import ExplainationRequest
-from backend.utils.openai_helpers import get_explanation
+from backend.schemas.validate import ExplainationRequest, ExplainationBatchRequest
+from backend.utils.openai_helpers import get_explanation, stream_explanation, PROMPT_VERSION
+from backend.utils.explanation_cache import explanation_cache, make_cache_key
+from backend.utils.retriever import retriever_service
+from backend.utils.singleflight import SingleFlight
+from backend.utils.prompt_loader import prompt_registry
 from backend.config import PAGEPAL_API_KEY
 from backend.utils.logging_config import setup_logger
 from backend.utils.auth_utils import verify_api_key
-from backend.db.db import managed_connection
+from backend.db.db import pool_status
+from backend.db.async_db import managed_async_connection, async_pool_status
 from backend.routers import books, chunks
-from backend.config import CORS_ORIGINS
+from backend.config import CORS_ORIGINS, EXPLAIN_BATCH_CONCURRENCY, EXPLAIN_BATCH_RATE_LIMIT, COMPRESSION_MIN_SIZE
+from backend.utils.http_cache import CompressionMiddleware
+from backend.utils.catalog_cache import catalog_cache
+from contextlib import asynccontextmanager
 
 from sqlalchemy import text
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # load the catalog before serving and keep it current while the worker runs
+    await catalog_cache.start()
+    yield
+    await catalog_cache.stop()
+
 app = FastAPI(
+    lifespan=lifespan,
     title="LLM Reading Tutor API",
     version="1.0.0",
     openapi_tags=[
@@ -45,6 +63,9 @@ app.add_exception_handler(429, _rate_limit_exceeded_handler) # set a limiter
 
 logger = setup_logger(__name__)
 
+# identical explanations requested at the same time share one LLM call
+explanation_flights = SingleFlight()
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=CORS_ORIGINS,
@@ -53,6 +74,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# book and chunk content only; streamed explanations must not be buffered by a compressor
+app.add_middleware(
+    CompressionMiddleware,
+    prefixes=("/book", "/languages", "/levels"),
+    minimum_size=COMPRESSION_MIN_SIZE,
+)
+
 app.include_router(books.router)
 app.include_router(chunks.router)
 
@@ -64,10 +92,10 @@ async def health():
 @app.get("/health/strict", summary="Strict health check", tags=["Utility"])
 async def health_strict():
     try:
-        with managed_connection() as db:
-            db.execute(text("SELECT 1"))
+        async with managed_async_connection() as db:
+            await db.execute(text("SELECT 1"))
             try:
-                row = db.execute(text("SELECT version_num FROM alembic_version")).fetchone()
+                row = (await db.execute(text("SELECT version_num FROM alembic_version"))).fetchone()
                 alembic_version = row[0] if row else None
             except Exception:
                 alembic_version = None
@@ -79,6 +107,14 @@ async def health_strict():
             content={"status": "degraded", "db": "unavailable"},
         )
 
+@app.get("/health/pool",
+         summary="Connection pool metrics",
+         description="Returns checked-out connections, overflow and checkout wait times for the DB pools",
+         tags=["Utility"],
+         dependencies=[Depends(verify_api_key)])
+async def health_pool():
+    return {"sync": pool_status(), "async": async_pool_status()}
+
 # testing purposes
 @app.get("/secure", 
          summary="API key verification",
@@ -94,25 +130,224 @@ async def secure_endpoint():
     """
     return {"message": "This is protected!"}
 
+def _explanation_kwargs(payload: ExplainationRequest) -> dict:
+    return {
+        "text": payload.text,
+        "level": payload.language_level,
+        "context_before": payload.context_before,
+        "context_after": payload.context_after,
+        "book_title": payload.book_title,
+        "book_author": payload.book_author,
+        "book_language": payload.book_language,
+    }
+
+def _explanation_cache_key(payload: ExplainationRequest) -> str:
+    return make_cache_key(**_explanation_kwargs(payload), prompt_version=PROMPT_VERSION)
+
+# rate limit only applies to explanations that actually reach the LLM,
+# and is shared by the regular, streaming and batch endpoints
+@limiter.shared_limit("3/minute", scope="explain")
+async def _explain_stream_uncached(request: Request, payload: ExplainationRequest):
+    return stream_explanation(**_explanation_kwargs(payload))
+
+@limiter.shared_limit("3/minute", scope="explain")
+async def _charge_explain_budget(request: Request) -> None:
+    # charged once per caller before joining a coalesced call, so one client's limit never
+    # fails another client's request
+    return None
+
+# slowapi checks a request's limits only once, so a batch pays both in a single call: one unit of
+# the shared explain budget plus one unit per uncached selection on its own per-client limit
+@limiter.shared_limit("3/minute", scope="explain")
+@limiter.shared_limit(EXPLAIN_BATCH_RATE_LIMIT, scope="explain_batch",
+                      cost=lambda request: request.state.explain_batch_cost)
+async def _charge_explain_batch(request: Request) -> None:
+    return None
+
+def _sse(data: dict, event: str = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+async def _stream_cached(explanation: str):
+    yield _sse({"delta": explanation})
+    yield _sse({"explanation": explanation}, event="done")
+
+async def _stream_and_store(request: Request, tokens, cache_key: str):
+    """
+    Relays LLM tokens as SSE and caches the full explanation once the stream completes.
+
+    If the reader disconnects, the upstream stream is closed, which cancels the completion.
+    """
+    parts = []
+    completed = False
+    try:
+        async for token in tokens:
+            if await request.is_disconnected():
+                logger.info("/explain/stream client disconnected, cancelling upstream call")
+                break
+            parts.append(token)
+            yield _sse({"delta": token})
+        else:
+            completed = True
+    except Exception as e:
+        logger.error(f"OpenAI streaming error: {e}")
+        yield _sse({"detail": "Explanation failed. Please try again later."}, event="error")
+    finally:
+        await tokens.aclose()
+
+    if completed:
+        explanation = "".join(parts).strip()
+        logger.info(f"/explain/stream completed with {len(explanation)} characters")
+        await explanation_cache.aset(cache_key, explanation)
+        yield _sse({"explanation": explanation}, event="done")
+
 # endpoint to retrieve explanation of a text    
 @app.post("/explain", 
           summary="Explanation of text",
           description="Returns an explanation of the text provided",
           tags=["AI"],
           dependencies=[Depends(verify_api_key)])
-@limiter.limit("3/minute")
 async def explain(request: Request, payload: ExplainationRequest):
+    cache_key = _explanation_cache_key(payload)
+    cached = await explanation_cache.aget(cache_key)
+    if cached is not None:
+        return {"explanation": cached}
+
+    # every caller is rate limited on its own; identical concurrent requests then share one LLM call
+    await _charge_explain_budget(request=request)
+
+    async def compute() -> str:
+        explanation = await get_explanation(**_explanation_kwargs(payload))
+        await explanation_cache.aset(cache_key, explanation)
+        return explanation
+
     try:
-        explanation = await get_explanation(
-            text=payload.text,
-            level=payload.language_level,
-            context_before=payload.context_before,
-            context_after=payload.context_after,
-            book_title=payload.book_title,
-            book_author=payload.book_author,
-            book_language=payload.book_language,
-        )
-        return {"explanation": explanation}
+        explanation = await explanation_flights.do(cache_key, compute)
     except Exception as e:
         logger.error(f"OpenAI error: {e}")
-        raise HTTPException(status_code=500, detail="Explanation failed. Please try again later.")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Explanation failed. Please try again later.")
+
+    return {"explanation": explanation}
+
+@app.post("/explain/stream",
+          summary="Streaming explanation of text",
+          description="Streams an explanation of the text provided as Server-Sent Events",
+          tags=["AI"],
+          dependencies=[Depends(verify_api_key)])
+async def explain_stream(request: Request, payload: ExplainationRequest):
+    cache_key = _explanation_cache_key(payload)
+    cached = await explanation_cache.aget(cache_key)
+    if cached is not None:
+        events = _stream_cached(cached)
+    else:
+        tokens = await _explain_stream_uncached(request=request, payload=payload)
+        events = _stream_and_store(request, tokens, cache_key)
+
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.post("/explain/batch",
+          summary="Explanations for several selections",
+          description="Returns explanations for many selections sharing a book, level and context, keyed by selection",
+          tags=["AI"],
+          dependencies=[Depends(verify_api_key)])
+async def explain_batch(request: Request, payload: ExplainationBatchRequest):
+    shared = payload.model_dump(exclude={"selections"})
+    items = {}
+    for selection in payload.selections:
+        if selection not in items:
+            items[selection] = ExplainationRequest(text=selection, **shared)
+    keys = {selection: _explanation_cache_key(item) for selection, item in items.items()}
+
+    cached = await explanation_cache.aget_many(list(keys.values()))
+    explanations = {selection: cached[key] for selection, key in keys.items() if key in cached}
+    errors = {}
+
+    misses = [selection for selection in items if selection not in explanations]
+    if misses:
+        request.state.explain_batch_cost = len(misses)
+        await _charge_explain_batch(request=request)
+        semaphore = asyncio.Semaphore(EXPLAIN_BATCH_CONCURRENCY)
+
+        async def explain_one(selection: str):
+            key = keys[selection]
+
+            async def compute() -> str:
+                async with semaphore:
+                    explanation = await get_explanation(**_explanation_kwargs(items[selection]))
+                await explanation_cache.aset(key, explanation)
+                return explanation
+
+            try:
+                explanations[selection] = await explanation_flights.do(key, compute)
+            except Exception as e:
+                logger.error(f"OpenAI error for batch selection: {e}")
+                errors[selection] = "Explanation failed. Please try again later."
+
+        await asyncio.gather(*(explain_one(selection) for selection in misses))
+
+    return {
+        "explanations": {selection: explanations.get(selection) for selection in items},
+        "errors": errors,
+    }
+
+@app.get("/explain/cache/stats",
+         summary="Explanation cache statistics",
+         description="Returns hit/miss counters for the explanation cache",
+         tags=["AI"],
+         dependencies=[Depends(verify_api_key)])
+async def explain_cache_stats():
+    return explanation_cache.stats()
+
+@app.get("/explain/coalescing/stats",
+         summary="Explanation coalescing statistics",
+         description="Returns how many explanation calls were executed and how many identical concurrent requests joined them",
+         tags=["AI"],
+         dependencies=[Depends(verify_api_key)])
+async def explain_coalescing_stats():
+    return explanation_flights.stats()
+
+@app.get("/retrieval/cache/stats",
+         summary="Query embedding cache statistics",
+         description="Returns hit/miss counters for the query embedding cache used by retrieval",
+         tags=["AI"],
+         dependencies=[Depends(verify_api_key)])
+async def retrieval_cache_stats():
+    return retriever_service.embedding_cache.stats()
+
+@app.get("/retrieval/matrices/stats",
+         summary="In-process search statistics",
+         description="Returns the books, memory use and hit/load counters of the numpy retrieval backend",
+         tags=["AI"],
+         dependencies=[Depends(verify_api_key)])
+async def retrieval_matrix_stats():
+    return {"backend": retriever_service.backend, **retriever_service.numpy_engine.stats()}
+
+@app.get("/catalog/stats",
+         summary="Catalog cache statistics",
+         description="Returns the version, size and reload count of the in-memory catalog",
+         tags=["Books"],
+         dependencies=[Depends(verify_api_key)])
+async def catalog_stats():
+    return catalog_cache.stats()
+
+@app.get("/prompts/stats",
+         summary="Prompt template sizes",
+         description="Returns the token count of every loaded prompt template and the version in use",
+         tags=["AI"],
+         dependencies=[Depends(verify_api_key)])
+async def prompt_stats():
+    return {"active_version": PROMPT_VERSION, "templates": prompt_registry.token_counts()}
+
+@app.post("/prompts/reload",
+          summary="Reload prompt templates",
+          description="Recompiles the prompt templates from disk",
+          tags=["AI"],
+          dependencies=[Depends(verify_api_key)])
+async def reload_prompts():
+    loaded = prompt_registry.reload()
+    logger.info(f"Reloaded prompt templates: {loaded}")
+    return {"loaded": loaded}
@@ -11,15 +11,70 @@ POSTGRES_USER = os.getenv("POSTGRES_USER")
 POSTGRES_PASSWORD = os.getenv("POSTGRES_PASSWORD")
 POSTGRES_DB = os.getenv("POSTGRES_DB")
 DATABASE_URL = os.getenv("DATABASE_URL")
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")  # derived from DATABASE_URL (asyncpg) if unset
+
+# connection pool (size it against the number of uvicorn workers)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+BULK_INSERT_BATCH_SIZE = int(os.getenv("BULK_INSERT_BATCH_SIZE", "1000"))
+DB_FETCH_SIZE = int(os.getenv("DB_FETCH_SIZE", "1000"))  # rows per round trip for iter_select / iter_raw
+BACKFILL_BATCH_SIZE = int(os.getenv("BACKFILL_BATCH_SIZE", "5000"))  # rows per committed backfill slice
+BACKFILL_SLEEP = float(os.getenv("BACKFILL_SLEEP", "0"))  # seconds between backfill slices
 
 # openAI
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_EMBEDDINGS = os.getenv("OPENAI_EMBEDDINGS", "text-embedding-3-small")
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL")  # e.g. a local stand-in server for tests
+PROMPT_VERSION = os.getenv("PROMPT_VERSION", "v2")  # explanation_<version>.j2
+
+# ingestion
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "128"))
+EMBEDDING_MAX_CONCURRENCY = int(os.getenv("EMBEDDING_MAX_CONCURRENCY", "4"))
+EMBEDDING_MAX_ATTEMPTS = int(os.getenv("EMBEDDING_MAX_ATTEMPTS", "6"))
+CHUNK_MAX_TOKENS = int(os.getenv("CHUNK_MAX_TOKENS", "160"))  # one reader page per chunk
 
 #pagepal
 PAGEPAL_API_KEY = os.getenv("PAGEPAL_API_KEY")
 
+# explanation cache
+EXPLANATION_CACHE_SIZE = int(os.getenv("EXPLANATION_CACHE_SIZE", "2048"))
+EXPLANATION_CACHE_PERSIST = os.getenv("EXPLANATION_CACHE_PERSIST", "true").lower() == "true"
+
+# batch explanations
+EXPLAIN_BATCH_MAX_SELECTIONS = int(os.getenv("EXPLAIN_BATCH_MAX_SELECTIONS", "50"))
+EXPLAIN_BATCH_CONCURRENCY = int(os.getenv("EXPLAIN_BATCH_CONCURRENCY", "5"))
+EXPLAIN_BATCH_RATE_LIMIT = os.getenv("EXPLAIN_BATCH_RATE_LIMIT", "60/minute")  # uncached selections per client
+
+# retrieval (per-request overrides are accepted by retrieve_top_chunks)
+PGVECTOR_EF_SEARCH = int(os.getenv("PGVECTOR_EF_SEARCH", "40"))
+PGVECTOR_PROBES = int(os.getenv("PGVECTOR_PROBES", "10"))
+PGVECTOR_ITERATIVE_SCAN = os.getenv("PGVECTOR_ITERATIVE_SCAN", "strict_order")  # only sent on pgvector >= 0.8, "off" to disable
+RETRIEVER_BACKEND = os.getenv("RETRIEVER_BACKEND", "pgvector")  # "pgvector" or "numpy" (exact search in process)
+BOOK_MATRIX_MAX_MB = int(os.getenv("BOOK_MATRIX_MAX_MB", "512"))  # memory budget for per-book embedding matrices
+BOOK_MATRIX_CACHE_DIR = os.getenv("BOOK_MATRIX_CACHE_DIR", "")  # .npy files memory-mapped on later loads, empty = off
+BOOK_MATRIX_TTL = int(os.getenv("BOOK_MATRIX_TTL", "300"))  # seconds before a matrix's content_version is re-checked
+QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "4096"))
+QUERY_EMBEDDING_CACHE_TTL = int(os.getenv("QUERY_EMBEDDING_CACHE_TTL", "86400"))  # seconds, 0 = never expire
+QUERY_EMBEDDING_CACHE_PERSIST = os.getenv("QUERY_EMBEDDING_CACHE_PERSIST", "false").lower() == "true"
+QUERY_EMBEDDING_CACHE_PRUNE_INTERVAL = int(os.getenv("QUERY_EMBEDDING_CACHE_PRUNE_INTERVAL", "3600"))  # seconds between deletes of expired rows
+
+# reader
+BOOK_META_CACHE_TTL = int(os.getenv("BOOK_META_CACHE_TTL", "300"))
+CHUNK_WINDOW_MAX_CHUNKS = int(os.getenv("CHUNK_WINDOW_MAX_CHUNKS", "20"))  # cap on chunks returned per request
+
+# catalog cache (books, languages, levels)
+CATALOG_LISTEN = os.getenv("CATALOG_LISTEN", "true").lower() == "true"  # reload on NOTIFY catalog_changed
+CATALOG_REFRESH_INTERVAL = int(os.getenv("CATALOG_REFRESH_INTERVAL", "300"))  # seconds, fallback reload
+
+# http caching and compression for book and chunk routes
+HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", "300"))  # seconds browsers reuse a response
+HTTP_CACHE_S_MAXAGE = int(os.getenv("HTTP_CACHE_S_MAXAGE", "86400"))  # seconds shared caches (CDN) reuse public responses
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "500"))  # bytes
+
 #cors
 _raw = os.getenv("CORS_ORIGINS", "http://localhost:5173")
 CORS_ORIGINS = [o.strip() for o in _raw.split(",") if o.strip()]
\ No newline at end of file
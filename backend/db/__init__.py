@@ -2,4 +2,7 @@ from .init_db import create_tables
 from .models.book import Book
 from .models.chunk import Chunk
 from .models.ai_output import AIOutput
-from .models.language_level import LanguageLevel
\ No newline at end of file
+from .models.language_level import LanguageLevel
+from .models.query_embedding import QueryEmbedding
+from .models.ingestion_job import IngestionJob
+from .models.chunk_embedding import ChunkEmbedding
\ No newline at end of file
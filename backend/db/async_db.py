@@ -0,0 +1,216 @@
+import uuid
+import time
+import logging
+from contextlib import asynccontextmanager
+from sqlalchemy import text
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+
+from backend.config import (
+    DATABASE_URL,
+    ASYNC_DATABASE_URL,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING,
+)
+
+log = logging.getLogger(__name__)
+
+def _async_url(url: str):
+    """
+    Converts a sync Postgres URL (psycopg2) into an asyncpg one.
+
+    asyncpg does not understand libpq's `sslmode`, so it is translated into connect args.
+
+    Returns:
+        tuple: (URL, connect_args) for create_async_engine.
+    """
+    parsed = make_url(url).set(drivername="postgresql+asyncpg")
+    connect_args = {}
+    sslmode = parsed.query.get("sslmode")
+    if sslmode:
+        parsed = parsed.difference_update_query(["sslmode"])
+        if sslmode != "disable":
+            connect_args["ssl"] = sslmode
+    return parsed, connect_args
+
+_url, _connect_args = _async_url(ASYNC_DATABASE_URL or DATABASE_URL)
+
+async_engine = create_async_engine(
+    _url,
+    connect_args=_connect_args,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+)
+
+@asynccontextmanager
+async def managed_async_connection():
+    """
+    Async context manager that opens and closes an AsyncSession.
+
+    Yields:
+        AsyncSession: An active session bound to the asyncpg engine.
+    """
+    db = AsyncSession(bind=async_engine)
+    try:
+        yield db
+    finally:
+        await db.close()
+
+@asynccontextmanager
+async def _session_scope(session: AsyncSession = None):
+    """
+    Reuses the caller's session if one is given, otherwise opens a new one.
+    """
+    if session is not None:
+        yield session
+    else:
+        async with managed_async_connection() as db:
+            yield db
+
+async def get_async_session():
+    """
+    FastAPI dependency that hands a single async session to the whole request.
+
+    Yields:
+        AsyncSession: A session that the helpers in this module accept via `session=`.
+    """
+    async with managed_async_connection() as db:
+        yield db
+
+def async_pool_status() -> dict:
+    """
+    Reports async connection pool usage.
+
+    Returns:
+        dict: Pool size, checked-in/checked-out connections and overflow in use.
+    """
+    pool = async_engine.pool
+    return {
+        "pool_size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+    }
+
+async def insert(table_name: str, columns_list: list[str], values_list: list, session: AsyncSession = None):
+    """
+    Inserts a new row into the given table.
+
+    Args:
+        table_name (str): The name of the table.
+        columns_list (list[str]): List of column names.
+        values_list (list): List of values corresponding to each column.
+        session (AsyncSession, optional): Session to run on. Opens its own if omitted.
+
+    Returns:
+        int: Number of rows inserted (should be 1).
+    """
+    start_time = time.time()
+    request_id = str(uuid.uuid4())
+    if table_name != "chunks":
+        log.info(f"[{request_id}] Inserting values into {table_name}: {values_list}")
+
+    async with _session_scope(session) as db:
+        columns = ', '.join(columns_list)
+        placeholders = ', '.join([f":val{i}" for i in range(len(values_list))])
+        query = text(f"INSERT INTO {table_name} ({columns}) VALUES ({placeholders})")
+        params = {f"val{i}": v for i, v in enumerate(values_list)}
+
+        result = await db.execute(query, params)
+        await db.commit()
+
+    exec_time = round(time.time() - start_time, 4)
+    if table_name != "chunks":
+        log.info(f"[{request_id}] insert() completed in {exec_time}s")
+    return result.rowcount
+
+async def select(table_name: str, columns: str = "*", condition: dict = None, session: AsyncSession = None):
+    """
+    Queries a table and returns matching records as a list of dicts.
+
+    Args:
+        table_name (str): The name of the table.
+        columns (str, optional): Columns to return (default is "*").
+        condition (dict, optional): Optional WHERE clause as key-value pairs.
+        session (AsyncSession, optional): Session to run on. Opens its own if omitted.
+
+    Returns:
+        list[dict]: List of matching records as dictionaries.
+    """
+    start_time = time.time()
+    request_id = str(uuid.uuid4())
+    log.info(f"[{request_id}] Selecting {columns} from {table_name} where {condition}")
+
+    async with _session_scope(session) as db:
+        query_str = f"SELECT {columns} FROM {table_name}"
+        params = {}
+
+        if condition:
+            clause = ' AND '.join([f"{k} = :{k}" for k in condition.keys()])
+            query_str += f" WHERE {clause}"
+            params = condition
+
+        result = await db.execute(text(query_str), params)
+        records = [dict(row) for row in result.mappings().all()]
+
+    exec_time = round(time.time() - start_time, 4)
+    log.info(f"[{request_id}] select() completed in {exec_time}s")
+    return records
+
+async def exists(table_name: str, condition: dict, session: AsyncSession = None):
+    """
+    Checks whether any records exist that match a given condition.
+
+    Args:
+        table_name (str): The name of the table.
+        condition (dict): WHERE condition to match against.
+        session (AsyncSession, optional): Session to run on. Opens its own if omitted.
+
+    Returns:
+        bool: True if at least one record matches, False otherwise.
+    """
+    start_time = time.time()
+    request_id = str(uuid.uuid4())
+
+    log.info(f"[{request_id}] Checking existence in {table_name} where {condition}")
+
+    async with _session_scope(session) as db:
+        where_clause = ' AND '.join([f"{k} = :{k}" for k in condition.keys()])
+        query_str = f"SELECT EXISTS (SELECT 1 FROM {table_name} WHERE {where_clause})"
+
+        result = (await db.execute(text(query_str), condition)).scalar()
+
+    exec_time = round(time.time() - start_time, 4)
+    log.info(f"[{request_id}] exists() completed in {exec_time}s")
+    return bool(result)
+
+async def raw(query_str: str, params: dict = None, session: AsyncSession = None):
+    """
+    Runs a raw SQL query and returns the results as a list of dicts.
+
+    Args:
+        query_str (str): The raw SQL query string.
+        params (dict, optional): Query parameters.
+        session (AsyncSession, optional): Session to run on. Opens its own if omitted.
+
+    Returns:
+        list[dict]: Query results as list of dictionaries.
+    """
+    start_time = time.time()
+    request_id = str(uuid.uuid4())
+
+    log.info(f"[{request_id}] Executing raw SQL: {query_str} with params {params}")
+
+    async with _session_scope(session) as db:
+        result = await db.execute(text(query_str), params or {})
+        records = [dict(row) for row in result.mappings().all()]
+
+    exec_time = round(time.time() - start_time, 4)
+    log.info(f"[{request_id}] raw() completed in {exec_time}s")
+    return records
@@ -0,0 +1,174 @@
+import json
+import os
+import time
+import uuid
+import logging
+from dataclasses import dataclass, asdict
+from typing import Callable, Optional
+
+from sqlalchemy import text
+
+from backend.config import BACKFILL_BATCH_SIZE, BACKFILL_SLEEP
+from backend.db.db import managed_connection
+
+log = logging.getLogger(__name__)
+
+# one keyset slice: the next batch_size keys after :after, updated in a single statement.
+# the slice key is aliased so SET expressions can use the table's own columns unqualified
+SLICE_SQL = """
+    WITH slice AS (
+        SELECT {key} AS backfill_key
+        FROM {table}
+        WHERE {key} > :after {and_where}
+        ORDER BY {key}
+        LIMIT :batch_size
+    ), updated AS (
+        UPDATE {table} t SET {set_sql}
+        FROM slice
+        WHERE t.{key} = slice.backfill_key
+        RETURNING 1
+    )
+    SELECT (SELECT count(*) FROM updated) AS updated,
+           (SELECT count(*) FROM slice) AS scanned,
+           (SELECT max(backfill_key) FROM slice) AS last_key
+"""
+REMAINING_SQL = "SELECT count(*) FROM {table} WHERE {key} > :after {and_where}"
+
+@dataclass
+class BackfillResult:
+    """
+    Outcome of a backfill run (or, for a dry run, of its sample slice).
+    """
+    table: str
+    last_key: Optional[int]
+    updated: int = 0
+    slices: int = 0
+    seconds: float = 0.0
+    done: bool = False
+    remaining: Optional[int] = None
+    estimated_seconds: Optional[float] = None
+
+def load_checkpoint(path: str) -> Optional[int]:
+    """
+    Reads the last processed key from a checkpoint file.
+
+    Args:
+        path (str): Checkpoint file written by run_backfill.
+
+    Returns:
+        int | None: The last key, or None if there is no checkpoint yet.
+    """
+    if not path or not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f).get("last_key")
+
+def save_checkpoint(path: str, result: BackfillResult) -> None:
+    # written to a temp file and renamed, so an interrupted run never leaves a torn checkpoint
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(asdict(result), f)
+    os.replace(tmp_path, path)
+
+def _run_slice(db, table: str, key: str, set_sql: str, and_where: str, params: dict, after: int, batch_size: int) -> dict:
+    query = text(SLICE_SQL.format(table=table, key=key, set_sql=set_sql, and_where=and_where))
+    return dict(db.execute(query, {**params, "after": after, "batch_size": batch_size}).mappings().one())
+
+def run_backfill(
+    table: str,
+    set_sql: str,
+    where: Optional[str] = None,
+    params: Optional[dict] = None,
+    key_column: str = "id",
+    batch_size: int = BACKFILL_BATCH_SIZE,
+    sleep: float = BACKFILL_SLEEP,
+    start_after: Optional[int] = None,
+    checkpoint_path: Optional[str] = None,
+    max_slices: Optional[int] = None,
+    dry_run: bool = False,
+    on_slice: Optional[Callable[[BackfillResult], None]] = None,
+) -> BackfillResult:
+    """
+    Applies a SQL SET expression to a table in keyset-ordered slices, committing each slice.
+
+    The transformation runs on the server (UPDATE ... SET {set_sql}), batch_size rows
+    at a time in key order, so locks are short and progress survives an interruption.
+    With a checkpoint file the run resumes after the last committed slice.
+
+    Args:
+        table (str): Table to update.
+        set_sql (str): SET clause, e.g. "metadata = jsonb_build_object('book_id', book_id)".
+        where (str, optional): Extra filter on rows to update, e.g. "metadata IS NULL".
+        params (dict, optional): Bind parameters used by set_sql or where.
+        key_column (str, optional): Integer key the slices are ordered by (default "id").
+        batch_size (int, optional): Rows per slice (default BACKFILL_BATCH_SIZE).
+        sleep (float, optional): Seconds to pause between slices, to throttle load on the primary.
+        start_after (int, optional): Only update keys greater than this; overrides the checkpoint.
+        checkpoint_path (str, optional): File that records the last committed key.
+        max_slices (int, optional): Stop after this many slices.
+        dry_run (bool, optional): Time one slice in a rolled-back transaction and estimate the rest.
+        on_slice (Callable, optional): Called with the running result after every slice.
+
+    Returns:
+        BackfillResult: Rows updated, slices run and the last key processed; for a dry run,
+            the remaining row count and estimated time instead.
+    """
+    request_id = str(uuid.uuid4())
+    params = params or {}
+    and_where = f"AND ({where})" if where else ""
+    if start_after is None:
+        start_after = load_checkpoint(checkpoint_path)
+    after = start_after if start_after is not None else -1
+
+    result = BackfillResult(table=table, last_key=start_after)
+    log.info(f"[{request_id}] Backfilling {table} SET {set_sql} after {key_column} {after} "
+             f"({batch_size} rows per slice{', dry run' if dry_run else ''})")
+
+    with managed_connection() as db:
+        if dry_run:
+            remaining_sql = REMAINING_SQL.format(table=table, key=key_column, and_where=and_where)
+            result.remaining = db.execute(text(remaining_sql), {**params, "after": after}).scalar()
+
+            start_time = time.perf_counter()
+            sample = _run_slice(db, table, key_column, set_sql, and_where, params, after, batch_size)
+            slice_seconds = time.perf_counter() - start_time
+            db.rollback()
+
+            result.seconds = slice_seconds
+            if sample["scanned"]:
+                slices = -(-result.remaining // batch_size)
+                result.estimated_seconds = slices * slice_seconds + max(slices - 1, 0) * sleep
+            else:
+                result.estimated_seconds = 0.0
+            log.info(f"[{request_id}] Dry run: {result.remaining} rows remaining, "
+                     f"estimated {result.estimated_seconds:.1f}s")
+            return result
+
+        start_time = time.perf_counter()
+        while max_slices is None or result.slices < max_slices:
+            outcome = _run_slice(db, table, key_column, set_sql, and_where, params, after, batch_size)
+            if not outcome["scanned"]:
+                db.rollback()
+                result.done = True
+                break
+            db.commit()
+
+            after = outcome["last_key"]
+            result.last_key = after
+            result.updated += outcome["updated"]
+            result.slices += 1
+            result.seconds = time.perf_counter() - start_time
+            if outcome["scanned"] < batch_size:
+                result.done = True
+            if checkpoint_path:
+                save_checkpoint(checkpoint_path, result)
+            if on_slice:
+                on_slice(result)
+            if result.done:
+                break
+            if sleep:
+                time.sleep(sleep)
+
+    log.info(f"[{request_id}] Backfill of {table} updated {result.updated} rows in {result.slices} slices "
+             f"({result.seconds:.1f}s), last {key_column} {result.last_key}")
+    return result
@@ -1,31 +1,97 @@
+import io
+import json
 import uuid
 import time
 import logging
+import threading
 from contextlib import contextmanager
+from itertools import islice
+from typing import Iterable, Iterator, Sequence
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
-from backend.config import DATABASE_URL
+from psycopg2.extras import Json
+
+from backend.config import DATABASE_URL, BULK_INSERT_BATCH_SIZE, DB_FETCH_SIZE
 from backend.utils.logging_utils import method_name
 from backend.db.init_db import engine 
 
 log = logging.getLogger(__name__)
 
+_pool_wait_lock = threading.Lock()
+_pool_wait = {"checkouts": 0, "total_wait": 0.0, "max_wait": 0.0}
+
+def _record_checkout_wait(wait: float):
+    with _pool_wait_lock:
+        _pool_wait["checkouts"] += 1
+        _pool_wait["total_wait"] += wait
+        _pool_wait["max_wait"] = max(_pool_wait["max_wait"], wait)
+
 @contextmanager
 def managed_connection():
     """
     Context manager that opens and closes a SQLAlchemy database session.
+
+    The session is bound to a single pooled connection for its whole lifetime,
+    and the time spent waiting for that connection is recorded for pool_status().
     
     Yields:
         Session: An active SQLAlchemy session bound to the engine.
     """
-    db = Session(bind=engine)
+    start_time = time.perf_counter()
+    connection = engine.connect()
+    _record_checkout_wait(time.perf_counter() - start_time)
+
+    db = Session(bind=connection)
     try:
         yield db
     finally:
         db.close()
+        connection.close()
+
+@contextmanager
+def _session_scope(session: Session = None):
+    """
+    Reuses the caller's session if one is given, otherwise opens a new one.
+    """
+    if session is not None:
+        yield session
+    else:
+        with managed_connection() as db:
+            yield db
 
-def insert(table_name: str, columns_list: list[str], values_list: list):
+def get_session():
+    """
+    FastAPI dependency that hands a single pooled connection to the whole request.
+
+    Yields:
+        Session: A session that the helpers in this module accept via `session=`.
+    """
+    with managed_connection() as db:
+        yield db
+
+def pool_status() -> dict:
+    """
+    Reports connection pool usage, for sizing the pool against the worker count.
+
+    Returns:
+        dict: Pool size, checked-in/checked-out connections, overflow in use and checkout wait times.
+    """
+    pool = engine.pool
+    with _pool_wait_lock:
+        wait = dict(_pool_wait)
+    checkouts = wait["checkouts"]
+    return {
+        "pool_size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "checkouts": checkouts,
+        "avg_wait_ms": round(wait["total_wait"] / checkouts * 1000, 3) if checkouts else 0.0,
+        "max_wait_ms": round(wait["max_wait"] * 1000, 3),
+    }
+
+def insert(table_name: str, columns_list: list[str], values_list: list, session: Session = None):
     """
     Inserts a new row into the given table.
 
@@ -33,6 +99,7 @@ def insert(table_name: str, columns_list: list[str], values_list: list):
         table_name (str): The name of the table.
         columns_list (list[str]): List of column names.
         values_list (list): List of values corresponding to each column.
+        session (Session, optional): Session to run on, e.g. from get_session(). Opens its own if omitted.
 
     Returns:
         int: Number of rows inserted (should be 1).
@@ -42,7 +109,7 @@ def insert(table_name: str, columns_list: list[str], values_list: list):
     if table_name != "chunks":
         log.info(f"[{request_id}] Inserting values into {table_name}: {values_list}")
 
-    with managed_connection() as db:
+    with _session_scope(session) as db:
         columns = ', '.join(columns_list)
         placeholders = ', '.join([f":val{i}" for i in range(len(values_list))])
         query = text(f"INSERT INTO {table_name} ({columns}) VALUES ({placeholders})")
@@ -56,7 +123,7 @@ def insert(table_name: str, columns_list: list[str], values_list: list):
         log.info(f"[{request_id}] {method_name()} completed in {exec_time}s")
     return result.rowcount
 
-def select(table_name: str, columns: str = "*", condition: dict = None):
+def select(table_name: str, columns: str = "*", condition: dict = None, session: Session = None):
     """
     Queries a table and returns matching records as a list of dicts.
 
@@ -64,6 +131,7 @@ def select(table_name: str, columns: str = "*", condition: dict = None):
         table_name (str): The name of the table.
         columns (str, optional): Columns to return (default is "*").
         condition (dict, optional): Optional WHERE clause as key-value pairs.
+        session (Session, optional): Session to run on, e.g. from get_session(). Opens its own if omitted.
 
     Returns:
         list[dict]: List of matching records as dictionaries.
@@ -72,7 +140,7 @@ def select(table_name: str, columns: str = "*", condition: dict = None):
     request_id = str(uuid.uuid4())
     log.info(f"[{request_id}] Selecting {columns} from {table_name} where {condition}")
 
-    with managed_connection() as db:
+    with _session_scope(session) as db:
         query_str = f"SELECT {columns} FROM {table_name}"
         params = {}
 
@@ -91,7 +159,7 @@ def select(table_name: str, columns: str = "*", condition: dict = None):
     log.info(f"[{request_id}] {method_name()} completed in {exec_time}s")
     return records
 
-def update(table_name: str, data: dict, update_condition: dict):
+def update(table_name: str, data: dict, update_condition: dict, session: Session = None):
     """
     Updates rows in a table matching a given condition.
 
@@ -99,6 +167,7 @@ def update(table_name: str, data: dict, update_condition: dict):
         table_name (str): The name of the table.
         data (dict): Column-value pairs to update.
         update_condition (dict): WHERE condition for the update.
+        session (Session, optional): Session to run on, e.g. from get_session(). Opens its own if omitted.
 
     Returns:
         int: Number of rows updated.
@@ -111,7 +180,7 @@ def update(table_name: str, data: dict, update_condition: dict):
 
     log.info(f"[{request_id}] Updating {table_name}: {data} where {update_condition}")
 
-    with managed_connection() as db:
+    with _session_scope(session) as db:
         set_clause = ', '.join([f"{k} = :set_{k}" for k in data.keys()])
         where_clause = ' AND '.join([f"{k} = :cond_{k}" for k in update_condition.keys()])
         query_str = f"UPDATE {table_name} SET {set_clause} WHERE {where_clause}"
@@ -127,13 +196,14 @@ def update(table_name: str, data: dict, update_condition: dict):
     log.info(f"[{request_id}] {method_name()} completed in {exec_time}s")
     return result.rowcount
 
-def delete(table_name: str, condition: dict):
+def delete(table_name: str, condition: dict, session: Session = None):
     """
     Deletes records from a table matching a condition.
 
     Args:
         table_name (str): The name of the table.
         condition (dict): WHERE condition for the delete.
+        session (Session, optional): Session to run on, e.g. from get_session(). Opens its own if omitted.
 
     Returns:
         int: Number of rows deleted.
@@ -146,7 +216,7 @@ def delete(table_name: str, condition: dict):
 
     log.info(f"[{request_id}] Deleting from {table_name} where {condition}")
 
-    with managed_connection() as db:
+    with _session_scope(session) as db:
         where_clause = ' AND '.join([f"{k} = :{k}" for k in condition.keys()])
         query_str = f"DELETE FROM {table_name} WHERE {where_clause}"
         query = text(query_str)
@@ -158,13 +228,14 @@ def delete(table_name: str, condition: dict):
     log.info(f"[{request_id}] {method_name()} completed in {exec_time}s")
     return result.rowcount
 
-def exists(table_name: str, condition: dict):
+def exists(table_name: str, condition: dict, session: Session = None):
     """
     Checks whether any records exist that match a given condition.
 
     Args:
         table_name (str): The name of the table.
         condition (dict): WHERE condition to match against.
+        session (Session, optional): Session to run on, e.g. from get_session(). Opens its own if omitted.
 
     Returns:
         bool: True if at least one record matches, False otherwise.
@@ -174,7 +245,7 @@ def exists(table_name: str, condition: dict):
 
     log.info(f"[{request_id}] Checking existence in {table_name} where {condition}")
 
-    with managed_connection() as db:
+    with _session_scope(session) as db:
         where_clause = ' AND '.join([f"{k} = :{k}" for k in condition.keys()])
         query_str = f"SELECT EXISTS (SELECT 1 FROM {table_name} WHERE {where_clause})"
         query = text(query_str)
@@ -185,13 +256,14 @@ def exists(table_name: str, condition: dict):
     log.info(f"[{request_id}] {method_name()} completed in {exec_time}s")
     return bool(result)
 
-def raw(query_str: str, params: tuple = ()):
+def raw(query_str: str, params: tuple = (), session: Session = None):
     """
     Runs a raw SQL query and returns the results as a list of dicts.
 
     Args:
         query_str (str): The raw SQL query string.
         params (tuple): Query parameters.
+        session (Session, optional): Session to run on, e.g. from get_session(). Opens its own if omitted.
 
     Returns:
         list[dict]: Query results as list of dictionaries.
@@ -201,7 +273,7 @@ def raw(query_str: str, params: tuple = ()):
 
     log.info(f"[{request_id}] Executing raw SQL: {query_str} with params {params}")
 
-    with managed_connection() as db:
+    with _session_scope(session) as db:
         query = text(query_str)
         result = db.execute(query, params)
         rows = result.fetchall()
@@ -211,3 +283,239 @@ def raw(query_str: str, params: tuple = ()):
     exec_time = round(time.time() - start_time, 4)
     log.info(f"[{request_id}] raw() completed in {exec_time}s")
     return records
+
+def _iter_query(query_str: str, params: dict, fetch_size: int, batches: bool, session: Session = None) -> Iterator:
+    """
+    Runs a query on a server-side (named) cursor and yields its rows lazily.
+
+    Only fetch_size rows are held client-side at a time. The session stays open until
+    the generator is exhausted or closed, so consume it promptly.
+    """
+    start_time = time.time()
+    request_id = str(uuid.uuid4())
+    log.info(f"[{request_id}] Streaming SQL: {query_str} with params {params} (fetch size {fetch_size})")
+
+    count = 0
+    with _session_scope(session) as db:
+        result = db.execute(
+            text(query_str),
+            params or {},
+            execution_options={"stream_results": True, "yield_per": fetch_size},
+        )
+        for partition in result.mappings().partitions(fetch_size):
+            count += len(partition)
+            if batches:
+                yield [dict(row) for row in partition]
+            else:
+                for row in partition:
+                    yield dict(row)
+
+    exec_time = round(time.time() - start_time, 4)
+    log.info(f"[{request_id}] streamed {count} rows in {exec_time}s")
+
+def iter_select(table_name: str, columns: str = "*", condition: dict = None, fetch_size: int = DB_FETCH_SIZE,
+                batches: bool = False, session: Session = None) -> Iterator:
+    """
+    Streaming variant of select(): rows come from a server-side cursor instead of fetchall().
+
+    Memory use depends on fetch_size, not on the size of the table.
+
+    Args:
+        table_name (str): The name of the table.
+        columns (str, optional): Columns to return (default is "*").
+        condition (dict, optional): Optional WHERE clause as key-value pairs.
+        fetch_size (int, optional): Rows fetched per round trip (default DB_FETCH_SIZE).
+        batches (bool, optional): Yield lists of up to fetch_size rows instead of single rows.
+        session (Session, optional): Session to run on, e.g. from get_session(). Opens its own if omitted.
+
+    Yields:
+        dict | list[dict]: Each record, or each batch of records.
+    """
+    query_str = f"SELECT {columns} FROM {table_name}"
+    if condition:
+        query_str += " WHERE " + ' AND '.join([f"{k} = :{k}" for k in condition.keys()])
+    return _iter_query(query_str, condition, fetch_size, batches, session)
+
+def iter_raw(query_str: str, params: dict = None, fetch_size: int = DB_FETCH_SIZE,
+             batches: bool = False, session: Session = None) -> Iterator:
+    """
+    Streaming variant of raw(): rows come from a server-side cursor instead of fetchall().
+
+    Args:
+        query_str (str): The raw SQL query string.
+        params (dict, optional): Query parameters.
+        fetch_size (int, optional): Rows fetched per round trip (default DB_FETCH_SIZE).
+        batches (bool, optional): Yield lists of up to fetch_size rows instead of single rows.
+        session (Session, optional): Session to run on, e.g. from get_session(). Opens its own if omitted.
+
+    Yields:
+        dict | list[dict]: Each record, or each batch of records.
+    """
+    return _iter_query(query_str, params, fetch_size, batches, session)
+
+COPY_NULL = "\\N"
+# COPY text format: backslash starts an escape, tab/newline/CR delimit fields and rows
+COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+COLUMN_TYPES_SQL = """
+    SELECT a.attname, t.typname
+    FROM pg_attribute a JOIN pg_type t ON t.oid = a.atttypid
+    WHERE a.attrelid = %s::regclass AND a.attnum > 0 AND NOT a.attisdropped
+"""
+
+def to_pgvector(embedding) -> str:
+    """
+    Formats an embedding (list, tuple or numpy array) as a pgvector literal.
+    """
+    return "[" + ",".join(repr(float(v)) for v in embedding) + "]"
+
+def _copy_value(value, column_type: str = None) -> str:
+    """
+    Encodes a Python value as a COPY (text format) field for a column of the given type.
+
+    vector columns take lists, tuples or numpy arrays as pgvector literals; json/jsonb
+    columns take any JSON-serializable value (or a psycopg2 Json wrapper). Text is escaped,
+    so backslashes and a literal "\\N" survive.
+    """
+    if value is None:
+        return COPY_NULL
+    if column_type == "vector":
+        value = to_pgvector(value.tolist() if hasattr(value, "tolist") else value)
+    elif column_type in ("json", "jsonb"):
+        value = json.dumps(value.adapted if isinstance(value, Json) else value)
+    elif isinstance(value, bool):
+        value = "t" if value else "f"
+    else:
+        if hasattr(value, "tolist"):  # numpy scalars
+            value = value.tolist()
+        if isinstance(value, (list, tuple, dict)):
+            raise ValueError(f"Cannot COPY a {type(value).__name__} into a {column_type} column")
+        value = str(value)
+    return value.translate(COPY_ESCAPES)
+
+def _column_types(cursor, table_name: str, columns_list: list[str]) -> list[str]:
+    cursor.execute(COLUMN_TYPES_SQL, (table_name,))
+    types = dict(cursor.fetchall())
+    return [types.get(column) for column in columns_list]
+
+def _copy_rows(cursor, table_name: str, columns_list: list[str], column_types: list[str], rows: list):
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(_copy_value(v, t) for v, t in zip(row, column_types)))
+        buffer.write("\n")
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY {table_name} ({', '.join(columns_list)}) FROM STDIN", buffer)
+
+def _batched(rows: Iterable[Sequence], batch_size: int):
+    iterator = iter(rows)
+    while batch := list(islice(iterator, batch_size)):
+        yield batch
+
+def bulk_insert(
+    table_name: str,
+    columns_list: list[str],
+    rows: Iterable[Sequence],
+    batch_size: int = BULK_INSERT_BATCH_SIZE,
+    skip_duplicates: bool = False,
+):
+    """
+    Streams many rows into a table with COPY, in batches, inside one transaction.
+
+    With skip_duplicates, rows are copied into a temporary staging table and moved over
+    with INSERT ... ON CONFLICT DO NOTHING, so rows that collide with a unique constraint
+    (e.g. uq_book_page) are skipped in bulk instead of failing the transaction.
+
+    Args:
+        table_name (str): The name of the table.
+        columns_list (list[str]): List of column names.
+        rows (Iterable[Sequence]): Row values in column order. May be a generator.
+        batch_size (int, optional): Rows sent per COPY (default BULK_INSERT_BATCH_SIZE).
+        skip_duplicates (bool, optional): Skip rows that violate a unique constraint.
+
+    Returns:
+        int: Number of rows inserted.
+    """
+    start_time = time.time()
+    request_id = str(uuid.uuid4())
+    columns = ', '.join(columns_list)
+    log.info(f"[{request_id}] Bulk inserting into {table_name} ({columns})")
+
+    inserted = 0
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        column_types = _column_types(cursor, table_name, columns_list)
+        target = table_name
+        if skip_duplicates:
+            target = f"staging_{table_name}"
+            cursor.execute(f"CREATE TEMP TABLE {target} ON COMMIT DROP AS SELECT {columns} FROM {table_name} WITH NO DATA")
+
+        for batch in _batched(rows, batch_size):
+            _copy_rows(cursor, target, columns_list, column_types, batch)
+            if skip_duplicates:
+                cursor.execute(f"INSERT INTO {table_name} ({columns}) SELECT {columns} FROM {target} ON CONFLICT DO NOTHING")
+                inserted += cursor.rowcount
+                cursor.execute(f"TRUNCATE {target}")
+            else:
+                inserted += len(batch)
+
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+
+    exec_time = round(time.time() - start_time, 4)
+    log.info(f"[{request_id}] {method_name()} inserted {inserted} rows in {exec_time}s")
+    return inserted
+
+def bulk_update(
+    table_name: str,
+    key_column: str,
+    columns_list: list[str],
+    rows: Iterable[Sequence],
+    batch_size: int = BULK_INSERT_BATCH_SIZE,
+):
+    """
+    Updates many rows by key: rows are COPYed into a staging table and applied with UPDATE ... FROM.
+
+    Args:
+        table_name (str): The name of the table.
+        key_column (str): Column that identifies each row (e.g. "id").
+        columns_list (list[str]): Columns to update.
+        rows (Iterable[Sequence]): (key, value1, value2, ...) tuples. May be a generator.
+        batch_size (int, optional): Rows sent per COPY (default BULK_INSERT_BATCH_SIZE).
+
+    Returns:
+        int: Number of rows updated.
+    """
+    start_time = time.time()
+    request_id = str(uuid.uuid4())
+    columns = ', '.join([key_column] + columns_list)
+    staging = f"staging_{table_name}"
+    set_clause = ', '.join([f"{c} = s.{c}" for c in columns_list])
+    log.info(f"[{request_id}] Bulk updating {table_name} ({', '.join(columns_list)}) by {key_column}")
+
+    updated = 0
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        column_types = _column_types(cursor, table_name, [key_column] + columns_list)
+        cursor.execute(f"CREATE TEMP TABLE {staging} ON COMMIT DROP AS SELECT {columns} FROM {table_name} WITH NO DATA")
+
+        for batch in _batched(rows, batch_size):
+            _copy_rows(cursor, staging, [key_column] + columns_list, column_types, batch)
+            cursor.execute(f"UPDATE {table_name} t SET {set_clause} FROM {staging} s WHERE t.{key_column} = s.{key_column}")
+            updated += cursor.rowcount
+            cursor.execute(f"TRUNCATE {staging}")
+
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+
+    exec_time = round(time.time() - start_time, 4)
+    log.info(f"[{request_id}] {method_name()} updated {updated} rows in {exec_time}s")
+    return updated
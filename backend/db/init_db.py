@@ -1,5 +1,12 @@
 from sqlalchemy import create_engine
-from backend.config import DATABASE_URL
+from backend.config import (
+    DATABASE_URL,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING,
+)
 from backend.db.base import Base
 
 from backend.db.models.book import Book
@@ -7,8 +14,18 @@ from backend.db.models.chunk import Chunk
 from backend.db.models.ai_output import AIOutput
 from backend.db.models.language_level import LanguageLevel
 from backend.db.models.language_mapping import Language
+from backend.db.models.query_embedding import QueryEmbedding
+from backend.db.models.ingestion_job import IngestionJob
+from backend.db.models.chunk_embedding import ChunkEmbedding
 
-engine = create_engine(DATABASE_URL)
+engine = create_engine(
+    DATABASE_URL,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+)
 
 def create_tables():
     """
@@ -1,4 +1,7 @@
 from .book import Book
 from .chunk import Chunk
 from .ai_output import AIOutput
-from .language_level import LanguageLevel
\ No newline at end of file
+from .language_level import LanguageLevel
+from .query_embedding import QueryEmbedding
+from .ingestion_job import IngestionJob
+from .chunk_embedding import ChunkEmbedding
\ No newline at end of file
@@ -6,8 +6,9 @@ class AIOutput(Base):
     __tablename__ = "aioutput"
 
     id = Column(Integer, primary_key=True, index=True)
-    chunk_id = Column(Integer, ForeignKey("chunks.id"), nullable=False)
+    chunk_id = Column(Integer, ForeignKey("chunks.id"), nullable=True)
     type = Column(String, nullable=False)
+    cache_key = Column(String(64), unique=True, index=True)
     content = Column(Text, nullable=False)
     created_at = Column(DateTime, server_default=func.now())
 
@@ -14,6 +14,7 @@ class Book(Base):
     source = Column(String)
     description = Column(Text)
     created_at = Column(DateTime, server_default=func.now())
+    content_version = Column(Integer, nullable=False, server_default="1")  # bumped whenever chunks change
 
     chunks = relationship("Chunk", back_populates="book")
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, func, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, func, UniqueConstraint
 from sqlalchemy.orm import relationship
 from pgvector.sqlalchemy import Vector
 from sqlalchemy.dialects.postgresql import JSONB 
@@ -12,6 +12,7 @@ class Chunk(Base):
     page_number = Column(Integer, nullable=False)
     text = Column(Text, nullable=False)
     tokens = Column(Integer)
+    content_hash = Column(String(64), index=True)  # key into chunk_embeddings
     embedding = Column(Vector(1536))
     chunk_metadata = Column("metadata", JSONB)
     created_at = Column(DateTime, server_default=func.now())
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, String, DateTime, func
+from pgvector.sqlalchemy import Vector
+from backend.db.base import Base
+
+class ChunkEmbedding(Base):
+    __tablename__ = "chunk_embeddings"
+
+    content_hash = Column(String(64), primary_key=True)  # sha256 of model name + normalized chunk text
+    model = Column(String, nullable=False)
+    embedding = Column(Vector(1536), nullable=False)
+    created_at = Column(DateTime, server_default=func.now())
+
+    def __repr__(self):
+        return f"<ChunkEmbedding(content_hash={self.content_hash}, model={self.model})>"
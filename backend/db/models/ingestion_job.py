@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, func
+from sqlalchemy.dialects.postgresql import JSONB
+from backend.db.base import Base
+
+class IngestionJob(Base):
+    __tablename__ = "ingestion_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    book_id = Column(Integer, ForeignKey("books.id", ondelete="CASCADE"), nullable=False, unique=True)
+    chunker_version = Column(String, nullable=False)
+    status = Column(String, nullable=False, server_default="running")  # running, completed, failed
+    last_page = Column(Integer)  # highest page_number with every page before it committed
+    total_chunks = Column(Integer)  # known once the whole text has been chunked
+    failed_pages = Column(JSONB, nullable=False, server_default="[]")
+    error = Column(Text)
+    started_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now())
+    finished_at = Column(DateTime)
+
+    def __repr__(self):
+        return f"<IngestionJob(book_id={self.book_id}, status={self.status}, last_page={self.last_page})>"
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, Text, DateTime, func
+from pgvector.sqlalchemy import Vector
+from backend.db.base import Base
+
+class QueryEmbedding(Base):
+    __tablename__ = "query_embeddings"
+
+    cache_key = Column(String(64), primary_key=True)
+    model = Column(String, nullable=False)
+    query = Column(Text, nullable=False)
+    embedding = Column(Vector(1536), nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), index=True)
+
+    def __repr__(self):
+        return f"<QueryEmbedding(cache_key={self.cache_key}, model={self.model})>"
@@ -1,20 +1,20 @@
-from fastapi import APIRouter, Depends
-from backend.utils.books_utils import get_all_books
-from backend.utils.auth_utils import verify_api_key
-
-router = APIRouter()
-
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from backend.utils.auth_utils import verify_api_key
 from backend.utils.books_utils import (
     get_all_books, 
     get_languages, 
     get_levels_for_language, 
     get_books_by_language_and_level,
-    get_language_mappings
+    get_language_mappings,
+    get_catalog_version
 )
+from backend.utils.http_cache import FastJSONResponse, cached_json_response, etag_matches, make_etag, not_modified
+
+router = APIRouter(default_response_class=FastJSONResponse)
 
-router = APIRouter()
+async def _catalog_etag(request: Request) -> str:
+    # same catalog contents give the same ETag on every worker
+    return make_etag("catalog", await get_catalog_version(), request.url.path)
 
 @router.get("/books", 
             summary="List books",
@@ -22,8 +22,11 @@ router = APIRouter()
             tags=["Books"],
             dependencies=[Depends(verify_api_key)]
             )
-def list_books():
-    return get_all_books()
+async def list_books(request: Request):
+    etag = await _catalog_etag(request)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return cached_json_response(request, await get_all_books(), etag=etag)
 
 @router.get("/languages",
             summary="List language mappings",
@@ -31,8 +34,11 @@ def list_books():
             tags=["Books"],
             dependencies=[Depends(verify_api_key)]
             )
-def list_language_mappings():
-    return get_language_mappings()
+async def list_language_mappings(request: Request):
+    etag = await _catalog_etag(request)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return cached_json_response(request, await get_language_mappings(), etag=etag)
 
 @router.get("/levels/{language}", 
             summary="List CEFR levels for a given language",
@@ -40,11 +46,11 @@ def list_language_mappings():
             tags=["Books"],
             dependencies=[Depends(verify_api_key)]
             )
-def list_levels(language: str):
-    levels = get_levels_for_language(language)
+async def list_levels(request: Request, language: str):
+    levels = await get_levels_for_language(language)
     if not levels:
         raise HTTPException(status_code=404, detail="Language not found")
-    return levels
+    return cached_json_response(request, levels, etag=await _catalog_etag(request))
 
 @router.get("/books/{language}/{level}",
             summary="Get books by language and level", 
@@ -52,8 +58,8 @@ def list_levels(language: str):
             tags=["Books"],
             dependencies=[Depends(verify_api_key)]
             )
-def books_by_lang_level(language: str, level: str):
-    books = get_books_by_language_and_level(language, level)
+async def books_by_lang_level(request: Request, language: str, level: str):
+    books = await get_books_by_language_and_level(language, level)
     if not books:
         raise HTTPException(status_code=404, detail="No books found for this language/level")
-    return books
\ No newline at end of file
+    return cached_json_response(request, books, etag=await _catalog_etag(request))
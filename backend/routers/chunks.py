@@ -1,17 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.db.async_db import get_async_session
 from backend.utils.auth_utils import verify_api_key
-from backend.utils.chunks_utils import get_chunk_by_page
+from backend.utils.chunks_utils import get_chunk_by_page, get_cached_content_version
+from backend.utils.http_cache import FastJSONResponse, cached_json_response, etag_matches, make_etag, not_modified
+from backend.config import CHUNK_WINDOW_MAX_CHUNKS
 
-router = APIRouter()
+router = APIRouter(default_response_class=FastJSONResponse)
 
 @router.get("/book/{gutenberg_id}/chunks",
             summary="Get a specific chunk of a book",
-            description="Returns a chunk of text for a specific book and page number",
+            description="Returns a chunk of text for a specific book and page number, "
+                        "optionally with the chunks of the pages ahead of and behind it",
             tags=["Chunks"],
             dependencies=[Depends(verify_api_key)]
             )
-def get_book_chunk(gutenberg_id: int, page: int = Query(1, ge=1), limit: int = Query(1, ge=1)):
-    result = get_chunk_by_page(gutenberg_id, page, limit)
+async def get_book_chunk(request: Request, gutenberg_id: int, page: int = Query(1, ge=1),
+                         limit: int = Query(1, ge=1, le=CHUNK_WINDOW_MAX_CHUNKS),
+                         ahead: int = Query(0, ge=0, le=CHUNK_WINDOW_MAX_CHUNKS),
+                         behind: int = Query(0, ge=0, le=CHUNK_WINDOW_MAX_CHUNKS),
+                         session: AsyncSession = Depends(get_async_session)):
+    # a revalidation for an unchanged book is answered from the cached content version, without a query
+    cached = get_cached_content_version(gutenberg_id)
+    if cached is not None:
+        etag = make_etag(gutenberg_id, *cached, page, limit, ahead, behind)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+    result = await get_chunk_by_page(gutenberg_id, page, limit, ahead=ahead, behind=behind, session=session)
     if not result:
         raise HTTPException(status_code=404, detail="Page out of range or book not found")
-    return result
+    etag = make_etag(gutenberg_id, result["content_version"], result["total_chunks"], page, limit, ahead, behind)
+    return cached_json_response(request, result, etag=etag)
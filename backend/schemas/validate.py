@@ -1,6 +1,8 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional
 
+from backend.config import EXPLAIN_BATCH_MAX_SELECTIONS
+
 class ExplainationRequest(BaseModel):
     text: str
     language_level: str
@@ -9,3 +11,12 @@ class ExplainationRequest(BaseModel):
     book_title: Optional[str] = None
     book_author: Optional[str] = None
     book_language: Optional[str] = None
+
+class ExplainationBatchRequest(BaseModel):
+    selections: list[str] = Field(..., min_length=1, max_length=EXPLAIN_BATCH_MAX_SELECTIONS)
+    language_level: str
+    context_before: Optional[str] = None
+    context_after: Optional[str] = None
+    book_title: Optional[str] = None
+    book_author: Optional[str] = None
+    book_language: Optional[str] = None
@@ -1,33 +1,45 @@
-from backend.db import db
+from backend.utils.catalog_cache import catalog_cache
 
-def get_all_books():
+# the catalog changes only when books or reference data are ingested, so these are
+# answered from the in-memory catalog cache instead of querying Postgres
+
+async def get_catalog_version() -> str:
+    """
+    Returns the content hash of the catalog currently being served.
+
+    Returns:
+        str: Catalog version, which changes whenever books, languages or levels change.
+    """
+    return (await catalog_cache.get()).version
+
+async def get_all_books():
     """
-    Retrieves all books from the books table.
+    Retrieves all books from the catalog.
 
     Returns:
         list[dict]: List of books with id, title, author, language, and language level.
     """
-    return db.select("books", columns="id, title, author, language, language_level")
+    return (await catalog_cache.get()).books
 
-def get_language_mappings():
+async def get_language_mappings():
     """
     Returns list of all available language codes and labels.
 
     Returns:
         list[dict]: List of {code, name} pairs.
     """
-    return db.select("language_mapping", columns="code, name")
+    return (await catalog_cache.get()).language_mappings
 
-def get_languages():
+async def get_languages():
     """
-    Retrieves distinct languages from the language_levels table.
+    Retrieves distinct languages that have CEFR levels.
 
     Returns:
         list[dict]: List of available languages.
     """
-    return db.select("language_levels", columns="DISTINCT language")
+    return [{"language": language} for language in (await catalog_cache.get()).levels_by_language]
 
-def get_levels_for_language(language: str):
+async def get_levels_for_language(language: str):
     """
     Retrieves CEFR levels for a given language.
 
@@ -37,9 +49,9 @@ def get_levels_for_language(language: str):
     Returns:
         list[dict]: List of levels for the language.
     """
-    return db.select("language_levels", columns="level", condition={"language": language})
+    return (await catalog_cache.get()).levels_by_language.get(language, [])
 
-def get_books_by_language_and_level(language: str, level: str):
+async def get_books_by_language_and_level(language: str, level: str):
     """
     Retrieves books matching the given language and CEFR level.
 
@@ -50,7 +62,4 @@ def get_books_by_language_and_level(language: str, level: str):
     Returns:
         list[dict]: List of matching books.
     """
-    return db.select("books", columns="id, gutenberg_id, title, author, language, language_level", condition={
-        "language": language,
-        "language_level": level
-    })
+    return (await catalog_cache.get()).books_by_language_level.get((language, level), [])
@@ -0,0 +1,188 @@
+import asyncio
+import hashlib
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from backend.config import CATALOG_LISTEN, CATALOG_REFRESH_INTERVAL
+from backend.db import async_db
+from backend.db.async_db import async_engine
+from backend.utils.chunks_utils import invalidate_book_meta
+
+log = logging.getLogger(__name__)
+
+# ingestion scripts notify this channel; the payload is the changed book's gutenberg_id, or empty
+CATALOG_CHANNEL = "catalog_changed"
+
+BOOK_LIST_FIELDS = ("id", "title", "author", "language", "language_level")
+
+def notify_catalog_changed(session: Session, gutenberg_id: Optional[int] = None):
+    """
+    Tells every API worker to reload its catalog cache once the caller's transaction commits.
+
+    Args:
+        session (Session): Sync session of the ingestion script; NOTIFY is delivered on commit.
+        gutenberg_id (Optional[int]): Book whose content changed, so its page cache is dropped too.
+    """
+    session.execute(text("SELECT pg_notify(:channel, :payload)"),
+                    {"channel": CATALOG_CHANNEL, "payload": "" if gutenberg_id is None else str(gutenberg_id)})
+
+@dataclass
+class CatalogSnapshot:
+    books: list = field(default_factory=list)
+    language_mappings: list = field(default_factory=list)
+    levels_by_language: dict = field(default_factory=dict)
+    books_by_language_level: dict = field(default_factory=dict)
+    version: str = ""
+
+def build_snapshot(books: list[dict], mappings: list[dict], levels: list[dict]) -> CatalogSnapshot:
+    """
+    Builds the in-memory indexes served by the catalog endpoints.
+
+    Args:
+        books (list[dict]): Rows of books ordered by id.
+        mappings (list[dict]): Rows of language_mapping.
+        levels (list[dict]): Rows of language_levels (language, level).
+
+    Returns:
+        CatalogSnapshot: Lists and lookup dicts, plus a content hash used as the catalog version.
+    """
+    levels_by_language = {}
+    for row in levels:
+        levels_by_language.setdefault(row["language"], []).append({"level": row["level"]})
+
+    books_by_language_level = {}
+    for book in books:
+        books_by_language_level.setdefault((book["language"], book["language_level"]), []).append(book)
+
+    payload = json.dumps([books, mappings, levels], sort_keys=True, default=str)
+    return CatalogSnapshot(
+        books=[{key: book[key] for key in BOOK_LIST_FIELDS} for book in books],
+        language_mappings=mappings,
+        levels_by_language=levels_by_language,
+        books_by_language_level=books_by_language_level,
+        version=hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16],
+    )
+
+class CatalogCache:
+    """
+    Keeps books, language mappings and levels in memory so catalog endpoints never query Postgres.
+
+    The snapshot is replaced as a whole on reload. Workers reload when an ingestion script
+    sends NOTIFY on CATALOG_CHANNEL, and every CATALOG_REFRESH_INTERVAL seconds as a fallback.
+
+    Args:
+        listen (bool): Whether start() subscribes to CATALOG_CHANNEL.
+        refresh_interval (float): Seconds between fallback reloads.
+    """
+
+    def __init__(self, listen: bool = CATALOG_LISTEN, refresh_interval: float = CATALOG_REFRESH_INTERVAL):
+        self.listen = listen
+        self.refresh_interval = refresh_interval
+        self.snapshot: Optional[CatalogSnapshot] = None
+        self.reloads = 0
+        self._load_lock = asyncio.Lock()
+        self._stopped = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._pending = set()
+
+    async def load(self) -> CatalogSnapshot:
+        """
+        Reads the catalog tables and swaps in a new snapshot.
+
+        Returns:
+            CatalogSnapshot: The snapshot now being served.
+        """
+        async with self._load_lock:
+            async with async_db.managed_async_connection() as session:
+                books = await async_db.raw(
+                    "SELECT id, gutenberg_id, title, author, language, language_level FROM books ORDER BY id",
+                    session=session)
+                mappings = await async_db.raw("SELECT code, name FROM language_mapping ORDER BY code", session=session)
+                levels = await async_db.raw(
+                    "SELECT language, level FROM language_levels ORDER BY language, level", session=session)
+            self.snapshot = build_snapshot(books, mappings, levels)
+            self.reloads += 1
+        log.info(f"Catalog loaded: {len(books)} books, version {self.snapshot.version}")
+        return self.snapshot
+
+    async def get(self) -> CatalogSnapshot:
+        """
+        Returns the current snapshot, loading it on first use (e.g. when startup hooks did not run).
+        """
+        snapshot = self.snapshot
+        if snapshot is None:
+            snapshot = await self.load()
+        return snapshot
+
+    def _on_notify(self, connection, pid, channel, payload):
+        if payload.isdigit():
+            invalidate_book_meta(int(payload))
+        task = asyncio.get_running_loop().create_task(self.load())
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _listen_loop(self):
+        while not self._stopped.is_set():
+            try:
+                async with async_engine.connect() as conn:
+                    driver = (await conn.get_raw_connection()).driver_connection
+                    await driver.add_listener(CATALOG_CHANNEL, self._on_notify)
+                    await self.load()  # anything changed while we were not listening
+                    while not self._stopped.is_set() and not driver.is_closed():
+                        try:
+                            await asyncio.wait_for(self._stopped.wait(), timeout=self.refresh_interval)
+                        except asyncio.TimeoutError:
+                            await self.load()
+                    if not driver.is_closed():
+                        await driver.remove_listener(CATALOG_CHANNEL, self._on_notify)
+            except Exception as e:
+                log.warning(f"Catalog listener failed, retrying: {e}")
+                try:
+                    await asyncio.wait_for(self._stopped.wait(), timeout=5)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _refresh_loop(self):
+        while not self._stopped.is_set():
+            try:
+                await asyncio.wait_for(self._stopped.wait(), timeout=self.refresh_interval)
+            except asyncio.TimeoutError:
+                try:
+                    await self.load()
+                except Exception as e:
+                    log.warning(f"Catalog refresh failed: {e}")
+
+    async def start(self):
+        """
+        Loads the catalog and starts the background listener (or the periodic refresh if listening is off).
+        """
+        self._stopped.clear()
+        try:
+            await self.load()
+        except Exception as e:
+            log.warning(f"Catalog load at startup failed, will load on first request: {e}")
+        loop = self._listen_loop() if self.listen else self._refresh_loop()
+        self._task = asyncio.create_task(loop)
+
+    async def stop(self):
+        self._stopped.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+
+    def stats(self) -> dict:
+        snapshot = self.snapshot
+        return {
+            "loaded": snapshot is not None,
+            "version": snapshot.version if snapshot else None,
+            "books": len(snapshot.books) if snapshot else 0,
+            "reloads": self.reloads,
+            "listening": self.listen and self._task is not None,
+        }
+
+catalog_cache = CatalogCache()
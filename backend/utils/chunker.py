@@ -0,0 +1,137 @@
+import io
+import re
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, Union
+
+from backend.config import CHUNK_MAX_TOKENS, OPENAI_EMBEDDINGS
+from backend.utils.token_utils import count_tokens
+
+# recorded with every ingestion job; bump the prefix whenever page boundaries would change,
+# since a book can only be resumed with the chunker that produced its existing pages
+CHUNKER_VERSION = f"sentences-v2/{CHUNK_MAX_TOKENS}"
+
+# a sentence ends at . ! ? or … optionally followed by closing quotes/brackets
+SENTENCE_END = re.compile(r"(?<=[.!?…])[\"'»”’)\]]*\s+")
+
+# paragraphs longer than this are cut early so one unbroken block cannot grow the buffer without limit
+MAX_PARAGRAPH_CHARS = 20000
+
+@dataclass
+class TextChunk:
+    text: str
+    tokens: int
+
+def count_embedding_tokens(text: str) -> int:
+    # chunks are sized for the embeddings model, whose tokenizer can differ from the chat model's
+    return count_tokens(text, OPENAI_EMBEDDINGS)
+
+def iter_paragraphs(source: Union[str, Iterable[str]], max_chars: int = MAX_PARAGRAPH_CHARS) -> Iterator[str]:
+    """
+    Streams paragraphs (blocks separated by blank lines) with their line breaks unwrapped.
+
+    Args:
+        source (str | Iterable[str]): The whole text, or an iterable of lines such as an open file.
+        max_chars (int): Longest paragraph held in memory before it is emitted early.
+
+    Yields:
+        str: One paragraph at a time.
+    """
+    lines = io.StringIO(source) if isinstance(source, str) else source
+    buffer = []
+    size = 0
+    for line in lines:
+        line = line.strip()
+        if not line:
+            if buffer:
+                yield " ".join(buffer)
+                buffer, size = [], 0
+            continue
+        buffer.append(line)
+        size += len(line) + 1
+        if size >= max_chars:
+            yield " ".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield " ".join(buffer)
+
+def _split_long(sentence: str, max_tokens: int, count: Callable[[str], int]) -> Iterator[str]:
+    # a single sentence over budget is cut at word boundaries
+    words = sentence.split()
+    start = 0
+    while start < len(words):
+        end, tokens = start, 0
+        while end < len(words):
+            word_tokens = count(" " + words[end])
+            if end > start and tokens + word_tokens > max_tokens:
+                break
+            tokens += word_tokens
+            end += 1
+        # summed word counts can undercount the joined words; back off until they fit
+        while end - start > 1 and count(" ".join(words[start:end])) > max_tokens:
+            end -= 1
+        yield " ".join(words[start:end])
+        start = end
+
+def _join(parts: list[tuple[str, str]]) -> str:
+    return "".join(separator + piece for separator, piece in parts)
+
+def _take(parts: list[tuple[str, str]], max_tokens: int, count: Callable[[str], int]) -> tuple[TextChunk, list]:
+    # pieces are packed by their summed counts, but the joined text can tokenize a little
+    # differently, so trailing pieces move to the next chunk until the real count fits
+    carry = []
+    text = _join(parts)
+    tokens = count(text)
+    while tokens > max_tokens and len(parts) > 1:
+        carry.insert(0, parts.pop())
+        text = _join(parts)
+        tokens = count(text)
+    if carry:
+        carry[0] = ("", carry[0][1])
+    return TextChunk(text=text, tokens=tokens), carry
+
+def chunk_text(source: Union[str, Iterable[str]], max_tokens: int = CHUNK_MAX_TOKENS,
+               count: Callable[[str], int] = count_embedding_tokens) -> Iterator[TextChunk]:
+    """
+    Streams the text as chunks of whole sentences that fit a token budget.
+
+    Sentences are packed greedily; a chunk never ends mid-sentence unless the sentence alone
+    exceeds the budget. Paragraph breaks inside a chunk are kept as blank lines, and the
+    separators count towards the budget. Only the current paragraph and chunk are held in
+    memory, so `source` can be a file over a very large book.
+
+    Args:
+        source (str | Iterable[str]): Cleaned book text, or an iterable of its lines.
+        max_tokens (int): Token budget per chunk.
+        count (Callable[[str], int]): Token counter, the embeddings model's tokenizer by default.
+
+    Yields:
+        TextChunk: Chunk text and its token count (for the chunks.tokens column).
+    """
+    parts = []  # (separator, piece) pairs of the current chunk
+    used = 0
+
+    for paragraph in iter_paragraphs(source):
+        new_paragraph = True
+        for sentence in SENTENCE_END.split(paragraph):
+            sentence = sentence.strip()
+            if not sentence:
+                continue
+            separator = ("\n\n" if new_paragraph else " ") if parts else ""
+            sentence_tokens = count(separator + sentence)
+            pieces = [sentence] if sentence_tokens <= max_tokens else list(_split_long(sentence, max_tokens, count))
+            for piece in pieces:
+                separator = ("\n\n" if new_paragraph else " ") if parts else ""
+                piece_tokens = sentence_tokens if len(pieces) == 1 else count(separator + piece)
+                while parts and used + piece_tokens > max_tokens:
+                    chunk, parts = _take(parts, max_tokens, count)
+                    yield chunk
+                    used = sum(count(s + p) for s, p in parts)
+                    separator = ("\n\n" if new_paragraph else " ") if parts else ""
+                    piece_tokens = count(separator + piece)
+                parts.append((separator, piece))
+                used += piece_tokens
+                new_paragraph = False
+
+    while parts:
+        chunk, parts = _take(parts, max_tokens, count)
+        yield chunk
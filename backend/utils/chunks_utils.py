@@ -1,53 +1,145 @@
-from backend.db import db
+import threading
+import time
 
-def get_chunk_by_page(gutenberg_id: int, page: int, limit: int = 1):
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.db import async_db
+from backend.config import BOOK_META_CACHE_TTL, CHUNK_WINDOW_MAX_CHUNKS
+
+# gutenberg_id -> (book_id, total_chunks, content_version, page_span, loaded_at)
+# page_span is MAX(page_number) + 1: pages are addressed by page_number, which can have gaps
+# (pages that failed during ingestion), so the chunk count would cut off the end of the book
+_book_meta_cache = {}
+_book_meta_lock = threading.Lock()
+
+def _get_cached_book_meta(gutenberg_id: int):
+    with _book_meta_lock:
+        meta = _book_meta_cache.get(gutenberg_id)
+    if meta is None or time.monotonic() - meta[4] > BOOK_META_CACHE_TTL:
+        return None
+    return meta[:4]
+
+def _set_cached_book_meta(gutenberg_id: int, book_id: int, total_chunks: int, content_version: int, page_span: int):
+    with _book_meta_lock:
+        _book_meta_cache[gutenberg_id] = (book_id, total_chunks, content_version, page_span, time.monotonic())
+
+def get_cached_content_version(gutenberg_id: int):
     """
-    Retrieves a specific chunk for a book by its Gutenberg ID and page number.
+    Returns the cached content version and chunk count of a book without touching the database.
+
+    Args:
+        gutenberg_id (int): The Project Gutenberg ID of the book.
+
+    Returns:
+        tuple[int, int] | None: (content_version, total_chunks), or None if the book is not cached.
+    """
+    meta = _get_cached_book_meta(gutenberg_id)
+    if meta is None:
+        return None
+    return meta[2], meta[1]
+
+def invalidate_book_meta(gutenberg_id: int = None):
+    """
+    Drops cached book id / chunk count entries so the next page fetch re-reads them.
+
+    Args:
+        gutenberg_id (int, optional): Book to invalidate. Clears every book if omitted.
+    """
+    with _book_meta_lock:
+        if gutenberg_id is None:
+            _book_meta_cache.clear()
+        else:
+            _book_meta_cache.pop(gutenberg_id, None)
+
+def _clamp_window(limit: int, ahead: int, behind: int):
+    # keep the response under CHUNK_WINDOW_MAX_CHUNKS, giving up pages behind before pages ahead
+    max_pages = max(1, CHUNK_WINDOW_MAX_CHUNKS // limit)
+    ahead = min(ahead, max_pages - 1)
+    behind = min(behind, max_pages - 1 - ahead)
+    return ahead, behind
+
+async def get_chunk_by_page(gutenberg_id: int, page: int, limit: int = 1, ahead: int = 0, behind: int = 0,
+                            session: AsyncSession = None):
+    """
+    Retrieves the chunk for a page, plus an optional window of neighbouring pages, by Gutenberg ID.
+
+    The whole window is read with one range seek on the (book_id, page_number) unique key,
+    so the cost of a page turn does not depend on how deep into the book it is.
 
     Args:
         gutenberg_id (int): The Project Gutenberg ID of the book.
         page (int): Page number to fetch (1-indexed).
         limit (int): Number of chunks per page (default 1).
+        ahead (int): Number of following pages to include (default 0).
+        behind (int): Number of preceding pages to include (default 0).
+        session (AsyncSession, optional): Request-scoped session from get_async_session().
 
     Returns:
-        dict: Contains pagination info and the chunk.
+        dict: Contains pagination info, the chunk for the requested page and the chunks of
+        every page in the window, each tagged with its page and page_number.
     """
-    offset = (page - 1) * limit
+    if page < 1:
+        return None
 
-    # Step 1: Look up internal book_id using gutenberg_id
-    book_lookup = db.raw(
-        "SELECT id FROM books WHERE gutenberg_id = :gutenberg_id",
-        {"gutenberg_id": gutenberg_id}
-    )
+    ahead, behind = _clamp_window(limit, ahead, behind)
+    first_page = max(1, page - behind)
+    params = {"start": (first_page - 1) * limit, "end": (page + ahead) * limit}
+    meta = _get_cached_book_meta(gutenberg_id)
 
-    if not book_lookup:
-        return None  # Book not found
+    if meta is None:
+        # book id, chunk count, page span and the requested window in a single round trip
+        rows = await async_db.raw("""
+            SELECT b.id AS book_id,
+                   b.content_version,
+                   (SELECT COUNT(*) FROM chunks WHERE book_id = b.id) AS total_chunks,
+                   (SELECT COALESCE(MAX(page_number) + 1, 0) FROM chunks WHERE book_id = b.id) AS page_span,
+                   c.id AS chunk_id,
+                   c.page_number,
+                   c.text
+            FROM books b
+            LEFT JOIN chunks c
+              ON c.book_id = b.id
+             AND c.page_number >= :start
+             AND c.page_number < :end
+            WHERE b.gutenberg_id = :gutenberg_id
+            ORDER BY c.page_number
+        """, {**params, "gutenberg_id": gutenberg_id}, session=session)
 
-    book_id = book_lookup[0]["id"]
+        if not rows:
+            return None  # Book not found
 
-    # Step 2: Count total chunks for that book_id
-    total_chunks_result = db.raw(
-        "SELECT COUNT(*) as count FROM chunks WHERE book_id = :book_id",
-        {"book_id": book_id}
-    )
-    total_chunks = total_chunks_result[0]['count']
-    total_pages = (total_chunks + limit - 1) // limit
+        book_id, total_chunks = rows[0]["book_id"], rows[0]["total_chunks"]
+        content_version, page_span = rows[0]["content_version"], rows[0]["page_span"]
+        _set_cached_book_meta(gutenberg_id, book_id, total_chunks, content_version, page_span)
+        chunk_rows = [row for row in rows if row["chunk_id"] is not None]
+    else:
+        book_id, total_chunks, content_version, page_span = meta
+        chunk_rows = None
 
-    if page > total_pages or page < 1:
+    total_pages = (page_span + limit - 1) // limit
+    if page > total_pages:
         return None
 
-    # Step 3: Fetch the chunk for that page
-    chunk_result = db.raw("""
-        SELECT id as chunk_id, text
-        FROM chunks
-        WHERE book_id = :book_id
-        ORDER BY id
-        LIMIT :limit OFFSET :offset
-    """, {
-        "book_id": book_id,
-        "limit": limit,
-        "offset": offset
-    })
+    if chunk_rows is None:
+        chunk_rows = await async_db.raw("""
+            SELECT id AS chunk_id, page_number, text
+            FROM chunks
+            WHERE book_id = :book_id
+              AND page_number >= :start
+              AND page_number < :end
+            ORDER BY page_number
+        """, {**params, "book_id": book_id}, session=session)
+
+    window = [
+        {
+            "page": row["page_number"] // limit + 1,
+            "page_number": row["page_number"],
+            "chunk_id": row["chunk_id"],
+            "text": row["text"],
+        }
+        for row in chunk_rows
+    ]
+    current = next((chunk for chunk in window if chunk["page"] == page), None)
 
     return {
         "gutenberg_id": gutenberg_id,
@@ -55,5 +147,9 @@ def get_chunk_by_page(gutenberg_id: int, page: int, limit: int = 1):
         "limit": limit,
         "total_pages": total_pages,
         "total_chunks": total_chunks,
-        "chunk": chunk_result[0] if chunk_result else None
+        "content_version": content_version,
+        "chunk": {"chunk_id": current["chunk_id"], "text": current["text"]} if current else None,
+        "first_page": first_page,
+        "last_page": min(page + ahead, total_pages),
+        "chunks": window,
     }
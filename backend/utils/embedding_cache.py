@@ -0,0 +1,211 @@
+import hashlib
+import json
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import text
+
+from backend.db.db import managed_connection, to_pgvector
+from backend.db.async_db import managed_async_connection
+from backend.config import (
+    QUERY_EMBEDDING_CACHE_SIZE, QUERY_EMBEDDING_CACHE_TTL, QUERY_EMBEDDING_CACHE_PERSIST,
+    QUERY_EMBEDDING_CACHE_PRUNE_INTERVAL,
+)
+from backend.utils.text_utils import normalize_text
+from backend.utils.logging_config import setup_logger
+from backend.utils.lru_cache import LRUCache, TieredCacheCounters
+
+logger = setup_logger(__name__)
+
+# embeddings are read and written as text so neither driver needs a pgvector codec
+SELECT_SQL = """
+    SELECT embedding::text AS embedding
+    FROM query_embeddings
+    WHERE cache_key = :cache_key
+      AND (:ttl = 0 OR created_at > now() - make_interval(secs => :ttl))
+"""
+UPSERT_SQL = """
+    INSERT INTO query_embeddings (cache_key, model, query, embedding)
+    VALUES (:cache_key, :model, :query, CAST(CAST(:embedding AS text) AS vector))
+    ON CONFLICT (cache_key) DO UPDATE SET embedding = EXCLUDED.embedding, created_at = now()
+"""
+# expired rows are never read again; deleting them keeps the table from growing without bound
+PRUNE_SQL = """
+    DELETE FROM query_embeddings
+    WHERE created_at <= now() - make_interval(secs => :ttl)
+"""
+
+def make_query_key(model: str, query: str) -> str:
+    """
+    Builds the cache key for a query embedding.
+
+    Args:
+        model (str): Embedding model name.
+        query (str): Query text.
+
+    Returns:
+        str: Hex-encoded SHA-256 digest of the model name and the normalized query.
+    """
+    return hashlib.sha256(f"{model}\x1f{normalize_text(query)}".encode("utf-8")).hexdigest()
+
+class QueryEmbeddingCache:
+    """
+    Cache of query embeddings keyed on (model name, normalized text).
+
+    An in-memory LRU with expiry sits in front of an optional Postgres tier
+    (query_embeddings table) shared by every worker. Writes also delete the table's
+    expired rows, at most once per `prune_interval` seconds per process.
+
+    Args:
+        max_size (int): Maximum number of embeddings held in memory.
+        ttl (int): Seconds an embedding stays valid in both tiers (0 = never expire).
+        persist (bool): Whether to use the Postgres tier.
+        prune_interval (float): Seconds between deletes of expired rows.
+    """
+
+    def __init__(self, max_size: int = QUERY_EMBEDDING_CACHE_SIZE, ttl: int = QUERY_EMBEDDING_CACHE_TTL,
+                 persist: bool = QUERY_EMBEDDING_CACHE_PERSIST,
+                 prune_interval: float = QUERY_EMBEDDING_CACHE_PRUNE_INTERVAL):
+        self.memory = LRUCache(max_size, ttl=ttl)
+        self.ttl = ttl
+        self.persist = persist
+        self.prune_interval = prune_interval
+        self.counters = TieredCacheCounters(self.memory)
+        self._next_prune = 0.0
+        self._prune_lock = threading.Lock()
+
+    def _prune_due(self) -> bool:
+        if not self.ttl:
+            return False
+        with self._prune_lock:
+            now = time.monotonic()
+            if now < self._next_prune:
+                return False
+            self._next_prune = now + self.prune_interval
+            return True
+
+    def prune(self) -> int:
+        """
+        Deletes the rows of the Postgres tier that have outlived the TTL.
+
+        Returns:
+            int: Number of rows deleted (0 if entries never expire).
+        """
+        if not self.ttl:
+            return 0
+        with managed_connection() as db:
+            deleted = db.execute(text(PRUNE_SQL), {"ttl": self.ttl}).rowcount
+            db.commit()
+        return deleted
+
+    def get(self, model: str, query: str) -> Optional[list[float]]:
+        """
+        Looks up a query embedding, first in memory and then in Postgres.
+
+        Args:
+            model (str): Embedding model name.
+            query (str): Query text.
+
+        Returns:
+            Optional[list[float]]: The cached embedding, or None on a miss.
+        """
+        key = make_query_key(model, query)
+        embedding = self.memory.get(key)
+        if embedding is not None:
+            self.counters.count("memory_hits")
+            return embedding
+
+        if self.persist:
+            try:
+                with managed_connection() as db:
+                    row = db.execute(text(SELECT_SQL), {"cache_key": key, "ttl": self.ttl}).fetchone()
+            except Exception as e:
+                logger.warning(f"Query embedding cache lookup failed: {e}")
+                row = None
+            if row:
+                embedding = json.loads(row[0])
+                self.memory.set(key, embedding)
+                self.counters.count("db_hits")
+                return embedding
+
+        self.counters.count("misses")
+        return None
+
+    def set(self, model: str, query: str, embedding: list[float]) -> None:
+        """
+        Stores a query embedding in memory and, if enabled, in Postgres.
+
+        Args:
+            model (str): Embedding model name.
+            query (str): Query text.
+            embedding (list[float]): The query's embedding.
+        """
+        key = make_query_key(model, query)
+        self.memory.set(key, embedding)
+        self.counters.count("stores")
+
+        if self.persist:
+            try:
+                with managed_connection() as db:
+                    db.execute(text(UPSERT_SQL), {"cache_key": key, "model": model, "query": normalize_text(query),
+                                                  "embedding": to_pgvector(embedding)})
+                    if self._prune_due():
+                        db.execute(text(PRUNE_SQL), {"ttl": self.ttl})
+                    db.commit()
+            except Exception as e:
+                logger.warning(f"Query embedding cache store failed: {e}")
+
+    async def aget(self, model: str, query: str) -> Optional[list[float]]:
+        """
+        Async variant of get, using the asyncpg pool for the Postgres tier.
+        """
+        key = make_query_key(model, query)
+        embedding = self.memory.get(key)
+        if embedding is not None:
+            self.counters.count("memory_hits")
+            return embedding
+
+        if self.persist:
+            try:
+                async with managed_async_connection() as db:
+                    row = (await db.execute(text(SELECT_SQL), {"cache_key": key, "ttl": self.ttl})).fetchone()
+            except Exception as e:
+                logger.warning(f"Query embedding cache lookup failed: {e}")
+                row = None
+            if row:
+                embedding = json.loads(row[0])
+                self.memory.set(key, embedding)
+                self.counters.count("db_hits")
+                return embedding
+
+        self.counters.count("misses")
+        return None
+
+    async def aset(self, model: str, query: str, embedding: list[float]) -> None:
+        """
+        Async variant of set, using the asyncpg pool for the Postgres tier.
+        """
+        key = make_query_key(model, query)
+        self.memory.set(key, embedding)
+        self.counters.count("stores")
+
+        if self.persist:
+            try:
+                async with managed_async_connection() as db:
+                    await db.execute(text(UPSERT_SQL), {"cache_key": key, "model": model, "query": normalize_text(query),
+                                                        "embedding": to_pgvector(embedding)})
+                    if self._prune_due():
+                        await db.execute(text(PRUNE_SQL), {"ttl": self.ttl})
+                    await db.commit()
+            except Exception as e:
+                logger.warning(f"Query embedding cache store failed: {e}")
+
+    def stats(self) -> dict:
+        """
+        Returns hit/miss counters for sizing the cache.
+
+        Returns:
+            dict: Counters plus the current size, the maximum size and the overall hit rate.
+        """
+        return self.counters.stats()
@@ -0,0 +1,276 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional
+
+from openai import OpenAI, RateLimitError, APIConnectionError, APITimeoutError, InternalServerError
+
+from backend.config import (
+    OPENAI_API_KEY,
+    OPENAI_BASE_URL,
+    OPENAI_EMBEDDINGS,
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_MAX_CONCURRENCY,
+    EMBEDDING_MAX_ATTEMPTS,
+)
+from backend.utils.embedding_store import EmbeddingStore
+from backend.utils.logging_config import setup_logger
+
+logger = setup_logger(__name__)
+
+RETRY_WAIT_MIN = 1
+RETRY_WAIT_MAX = 30
+TRANSIENT_ERRORS = (APIConnectionError, APITimeoutError, InternalServerError)
+
+class RateLimitBudget:
+    """
+    Adaptive concurrency limit shared by every thread that calls the embeddings endpoint.
+
+    A 429 pauses all callers until its Retry-After has passed and halves the number of
+    requests allowed in flight. Each run of successful requests adds one slot back.
+
+    Args:
+        max_concurrency (int): Upper bound on requests in flight.
+    """
+
+    def __init__(self, max_concurrency: int = EMBEDDING_MAX_CONCURRENCY):
+        self.max_concurrency = max_concurrency
+        self.concurrency = max_concurrency
+        self.rate_limited = 0
+        self._in_flight = 0
+        self._successes = 0
+        self._resume_at = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self) -> None:
+        """
+        Blocks until a request slot is free and no cooldown is active.
+        """
+        with self._cond:
+            while True:
+                pause = self._resume_at - time.monotonic()
+                if pause > 0:
+                    self._cond.wait(pause)
+                elif self._in_flight >= self.concurrency:
+                    self._cond.wait()
+                else:
+                    self._in_flight += 1
+                    return
+
+    def release(self, success: bool = True) -> None:
+        """
+        Frees a request slot, growing the limit back after a run of successes.
+
+        Args:
+            success (bool): Whether the request completed without being rate limited.
+        """
+        with self._cond:
+            self._in_flight -= 1
+            if success:
+                self._successes += 1
+                if self.concurrency < self.max_concurrency and self._successes >= self.concurrency:
+                    self.concurrency += 1
+                    self._successes = 0
+            self._cond.notify_all()
+
+    def backoff(self, retry_after: float) -> None:
+        """
+        Records a 429: pauses every caller for `retry_after` seconds and halves the concurrency.
+
+        Args:
+            retry_after (float): Seconds to wait, usually from the Retry-After header.
+        """
+        with self._cond:
+            self.rate_limited += 1
+            self._successes = 0
+            self.concurrency = max(1, self.concurrency // 2)
+            self._resume_at = max(self._resume_at, time.monotonic() + retry_after)
+            self._cond.notify_all()
+
+@dataclass
+class EmbeddedBatch:
+    """
+    Result of embedding one batch of consecutive texts.
+
+    Attributes:
+        start (int): Index of the first text of the batch in the input sequence.
+        texts (list[str]): The texts in the batch.
+        embeddings (Optional[list[list[float]]]): One vector per text, or None if the batch failed.
+        error (Optional[Exception]): The last error if every attempt failed.
+        hashes (Optional[list[str]]): Content hash of each text when the pipeline uses an EmbeddingStore.
+    """
+    start: int
+    texts: list
+    embeddings: Optional[list] = None
+    error: Optional[Exception] = None
+    hashes: Optional[list] = None
+
+def _retry_after(error: RateLimitError, attempt: int) -> float:
+    """
+    Reads the wait time from a 429 response, falling back to exponential backoff.
+    """
+    headers = getattr(error.response, "headers", {}) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except ValueError:
+        pass
+    return _backoff(attempt)
+
+def _backoff(attempt: int) -> float:
+    return random.uniform(0, min(RETRY_WAIT_MAX, RETRY_WAIT_MIN * 2 ** attempt))
+
+class EmbeddingPipeline:
+    """
+    Embeds texts in large batches with a bounded number of concurrent requests.
+
+    Args:
+        client (OpenAI, optional): Client to use. Defaults to one built from backend.config.
+        model (str, optional): Embedding model name.
+        batch_size (int, optional): Number of texts sent per request.
+        max_attempts (int, optional): Attempts per batch before it is reported as failed.
+        budget (RateLimitBudget, optional): Shared rate limit state. Pass the same instance to
+            pipelines that should share one budget.
+        store (EmbeddingStore, optional): Content-hash store checked before calling the API;
+            new embeddings are added to it.
+    """
+
+    def __init__(
+        self,
+        client: Optional[OpenAI] = None,
+        model: str = OPENAI_EMBEDDINGS,
+        batch_size: int = EMBEDDING_BATCH_SIZE,
+        max_attempts: int = EMBEDDING_MAX_ATTEMPTS,
+        budget: Optional[RateLimitBudget] = None,
+        store: Optional[EmbeddingStore] = None,
+    ):
+        self.client = client or OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL, max_retries=0)
+        self.model = model
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.budget = budget or RateLimitBudget()
+        self.store = store
+        self.requests = 0
+        self.cache_hits = 0  # texts served from the store
+        self.requests_avoided = 0  # batches served entirely from the store
+        self._lock = threading.Lock()
+
+    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        """
+        Embeds one batch, retrying on rate limits and transient errors.
+
+        Args:
+            texts (list[str]): Texts to embed in a single request.
+
+        Raises:
+            Exception: The last error once all attempts are used up.
+
+        Returns:
+            list[list[float]]: One embedding per text, in input order.
+        """
+        for attempt in range(1, self.max_attempts + 1):
+            self.budget.acquire()
+            success = False
+            wait_seconds = 0
+            try:
+                with self._lock:
+                    self.requests += 1
+                response = self.client.embeddings.create(model=self.model, input=texts)
+                success = True
+                return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+            except RateLimitError as e:
+                if attempt == self.max_attempts:
+                    raise
+                retry_after = _retry_after(e, attempt)
+                logger.warning(f"Embeddings rate limited, retrying batch in {retry_after:.2f}s (attempt {attempt})")
+                # the budget holds every caller back, so there is nothing to sleep here
+                self.budget.backoff(retry_after)
+            except TRANSIENT_ERRORS as e:
+                if attempt == self.max_attempts:
+                    raise
+                wait_seconds = _backoff(attempt)
+                logger.warning(f"Embeddings request failed ({e}), retrying batch in {wait_seconds:.2f}s (attempt {attempt})")
+            finally:
+                self.budget.release(success)
+            # sleep without a slot, so other books sharing the budget keep their requests going
+            if wait_seconds:
+                time.sleep(wait_seconds)
+
+    def embed_with_store(self, texts: list[str]) -> tuple[list[list[float]], list[str]]:
+        """
+        Embeds one batch, taking every text already in the store from there.
+
+        Only unseen texts (deduplicated) are sent to the API, and their embeddings are stored.
+
+        Args:
+            texts (list[str]): Texts of one batch.
+
+        Returns:
+            tuple[list[list[float]], list[str]]: One embedding and one content hash per text, in input order.
+        """
+        hashes = [self.store.key(text) for text in texts]
+        found = self.store.lookup(hashes)
+        missing = {h: text for h, text in zip(hashes, texts) if h not in found}
+        with self._lock:
+            self.cache_hits += sum(1 for h in hashes if h in found)
+            if not missing:
+                self.requests_avoided += 1
+
+        if missing:
+            embeddings = self.embed_batch(list(missing.values()))
+            new = dict(zip(missing, embeddings))
+            self.store.save(new.items())
+            found.update(new)
+        return [found[h] for h in hashes], hashes
+
+    def _batches(self, texts: Iterable[str]) -> Iterator[tuple[int, list[str]]]:
+        batch, start = [], 0
+        for i, text in enumerate(texts):
+            batch.append(text)
+            if len(batch) == self.batch_size:
+                yield start, batch
+                batch, start = [], i + 1
+        if batch:
+            yield start, batch
+
+    def embed(self, texts: Iterable[str]) -> Iterator[EmbeddedBatch]:
+        """
+        Embeds a stream of texts, yielding each batch as soon as it completes.
+
+        Batches may complete out of order; use EmbeddedBatch.start to place them.
+        Only a bounded number of batches is read ahead of the workers, so `texts`
+        can be a generator over a very large book.
+
+        Args:
+            texts (Iterable[str]): Texts to embed.
+
+        Yields:
+            EmbeddedBatch: A completed (or permanently failed) batch.
+        """
+        def run(start: int, batch: list[str]) -> EmbeddedBatch:
+            try:
+                if self.store is not None:
+                    embeddings, hashes = self.embed_with_store(batch)
+                    return EmbeddedBatch(start, batch, embeddings=embeddings, hashes=hashes)
+                return EmbeddedBatch(start, batch, embeddings=self.embed_batch(batch))
+            except Exception as e:
+                logger.error(f"Embedding failed for batch starting at {start}: {e}")
+                return EmbeddedBatch(start, batch, error=e)
+
+        max_workers = self.budget.max_concurrency
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = set()
+            for start, batch in self._batches(texts):
+                pending.add(executor.submit(run, start, batch))
+                if len(pending) >= max_workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
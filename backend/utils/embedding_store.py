@@ -0,0 +1,86 @@
+import hashlib
+import json
+import threading
+from typing import Iterable
+
+from backend.db import db
+from backend.utils.text_utils import normalize_text
+
+# embeddings are read as text so psycopg2 does not need a pgvector codec
+LOOKUP_SQL = """
+    SELECT content_hash, embedding::text AS embedding
+    FROM chunk_embeddings
+    WHERE content_hash = ANY(:hashes)
+"""
+
+def make_content_hash(model: str, text: str) -> str:
+    """
+    Builds the key under which a chunk's embedding is stored.
+
+    Args:
+        model (str): Embedding model name.
+        text (str): Chunk text.
+
+    Returns:
+        str: Hex-encoded SHA-256 digest of the model name and the normalized text.
+    """
+    return hashlib.sha256(f"{model}\x1f{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+class EmbeddingStore:
+    """
+    Content-addressed store of chunk embeddings (chunk_embeddings table).
+
+    Identical text (another edition, a re-ingestion) is only embedded once per model;
+    every chunks row with that text can reuse the stored vector.
+
+    Args:
+        model (str): Embedding model the stored vectors belong to.
+    """
+
+    def __init__(self, model: str):
+        self.model = model
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "stores": 0}
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += n
+
+    def key(self, text: str) -> str:
+        return make_content_hash(self.model, text)
+
+    def lookup(self, hashes: list[str]) -> dict:
+        """
+        Fetches stored embeddings with one query.
+
+        Args:
+            hashes (list[str]): Content hashes from key().
+
+        Returns:
+            dict: Content hash -> embedding for every hash that is stored.
+        """
+        unique = list(dict.fromkeys(hashes))
+        rows = db.raw(LOOKUP_SQL, {"hashes": unique}) if unique else []
+        found = {row["content_hash"]: json.loads(row["embedding"]) for row in rows}
+        self._count("hits", sum(1 for h in hashes if h in found))
+        self._count("misses", sum(1 for h in hashes if h not in found))
+        return found
+
+    def save(self, items: Iterable[tuple]) -> int:
+        """
+        Stores new embeddings; hashes that are already stored are left untouched.
+
+        Args:
+            items (Iterable[tuple]): (content_hash, embedding) pairs.
+
+        Returns:
+            int: Number of embeddings added.
+        """
+        rows = [(content_hash, self.model, embedding) for content_hash, embedding in items]
+        added = db.bulk_insert("chunk_embeddings", ["content_hash", "model", "embedding"], rows, skip_duplicates=True)
+        self._count("stores", added)
+        return added
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._counters)
@@ -0,0 +1,201 @@
+import hashlib
+from typing import Optional
+
+from sqlalchemy.exc import IntegrityError
+
+from backend.db import db, async_db
+from backend.config import EXPLANATION_CACHE_SIZE, EXPLANATION_CACHE_PERSIST
+from backend.utils.logging_config import setup_logger
+from backend.utils.lru_cache import LRUCache, TieredCacheCounters
+from backend.utils.text_utils import normalize_text
+
+logger = setup_logger(__name__)
+
+EXPLANATION_TYPE = "explanation"
+
+def make_cache_key(
+    text: str,
+    level: str,
+    context_before: Optional[str] = None,
+    context_after: Optional[str] = None,
+    book_title: Optional[str] = None,
+    book_author: Optional[str] = None,
+    book_language: Optional[str] = None,
+    prompt_version: str = "v1",
+) -> str:
+    """
+    Builds the cache key for an explanation request.
+
+    Args:
+        text (str): The selected text.
+        level (str): The user's language proficiency level (e.g., A1, B2).
+        context_before (Optional[str]): Text that appears before the selection.
+        context_after (Optional[str]): Text that appears after the selection.
+        book_title (Optional[str]): The title of the book.
+        book_author (Optional[str]): The author of the book.
+        book_language (Optional[str]): The language the book is written in.
+        prompt_version (str): Version of the prompt template used to generate the explanation.
+
+    Returns:
+        str: Hex-encoded SHA-256 digest of the normalized request fields.
+    """
+    parts = [
+        prompt_version,
+        normalize_text(level).upper(),
+        normalize_text(text),
+        normalize_text(context_before),
+        normalize_text(context_after),
+        normalize_text(book_title),
+        normalize_text(book_author),
+        normalize_text(book_language),
+    ]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+class ExplanationCache:
+    """
+    Two-tier explanation cache: an in-process LRU in front of the aioutput table.
+
+    Args:
+        max_size (int): Maximum number of explanations held in memory.
+        persist (bool): Whether to read from and write to the aioutput table.
+    """
+
+    def __init__(self, max_size: int = EXPLANATION_CACHE_SIZE, persist: bool = EXPLANATION_CACHE_PERSIST):
+        self.memory = LRUCache(max_size)
+        self.persist = persist
+        self.counters = TieredCacheCounters(self.memory)
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Looks up an explanation, first in memory and then in the aioutput table.
+
+        Args:
+            key (str): Cache key built by make_cache_key.
+
+        Returns:
+            Optional[str]: The cached explanation, or None on a miss.
+        """
+        explanation = self.memory.get(key)
+        if explanation is not None:
+            self.counters.count("memory_hits")
+            return explanation
+
+        if self.persist:
+            try:
+                rows = db.select("aioutput", columns="content", condition={"cache_key": key})
+            except Exception as e:
+                logger.warning(f"Explanation cache lookup failed: {e}")
+                rows = []
+            if rows:
+                explanation = rows[0]["content"]
+                self.memory.set(key, explanation)
+                self.counters.count("db_hits")
+                return explanation
+
+        self.counters.count("misses")
+        return None
+
+    def set(self, key: str, explanation: str) -> None:
+        """
+        Stores an explanation in memory and, if persistence is enabled, in the aioutput table.
+
+        Args:
+            key (str): Cache key built by make_cache_key.
+            explanation (str): The explanation returned by the LLM.
+        """
+        self.memory.set(key, explanation)
+        self.counters.count("stores")
+
+        if self.persist:
+            try:
+                db.insert("aioutput", ["type", "cache_key", "content"], [EXPLANATION_TYPE, key, explanation])
+            except IntegrityError:
+                pass  # another worker stored the same explanation first
+            except Exception as e:
+                logger.warning(f"Explanation cache store failed: {e}")
+
+    async def aget(self, key: str) -> Optional[str]:
+        """
+        Async variant of get that queries the aioutput table without blocking the event loop.
+        """
+        explanation = self.memory.get(key)
+        if explanation is not None:
+            self.counters.count("memory_hits")
+            return explanation
+
+        if self.persist:
+            try:
+                rows = await async_db.select("aioutput", columns="content", condition={"cache_key": key})
+            except Exception as e:
+                logger.warning(f"Explanation cache lookup failed: {e}")
+                rows = []
+            if rows:
+                explanation = rows[0]["content"]
+                self.memory.set(key, explanation)
+                self.counters.count("db_hits")
+                return explanation
+
+        self.counters.count("misses")
+        return None
+
+    async def aget_many(self, keys: list[str]) -> dict:
+        """
+        Looks up several explanations at once, with a single query for the database tier.
+
+        Args:
+            keys (list[str]): Cache keys built by make_cache_key.
+
+        Returns:
+            dict: Cache key -> explanation for every key that was found.
+        """
+        found = {}
+        for key in keys:
+            explanation = self.memory.get(key)
+            if explanation is not None:
+                found[key] = explanation
+                self.counters.count("memory_hits")
+
+        remaining = [key for key in keys if key not in found]
+        if self.persist and remaining:
+            try:
+                rows = await async_db.raw(
+                    "SELECT cache_key, content FROM aioutput WHERE cache_key = ANY(:keys)",
+                    {"keys": remaining},
+                )
+            except Exception as e:
+                logger.warning(f"Explanation cache lookup failed: {e}")
+                rows = []
+            for row in rows:
+                found[row["cache_key"]] = row["content"]
+                self.memory.set(row["cache_key"], row["content"])
+                self.counters.count("db_hits")
+
+        for _ in range(len(keys) - len(found)):
+            self.counters.count("misses")
+        return found
+
+    async def aset(self, key: str, explanation: str) -> None:
+        """
+        Async variant of set that writes to the aioutput table without blocking the event loop.
+        """
+        self.memory.set(key, explanation)
+        self.counters.count("stores")
+
+        if self.persist:
+            try:
+                await async_db.insert("aioutput", ["type", "cache_key", "content"], [EXPLANATION_TYPE, key, explanation])
+            except IntegrityError:
+                pass  # another worker stored the same explanation first
+            except Exception as e:
+                logger.warning(f"Explanation cache store failed: {e}")
+
+    def stats(self) -> dict:
+        """
+        Returns hit/miss counters for sizing the cache.
+
+        Returns:
+            dict: Counters plus the current size, the maximum size and the overall hit rate.
+        """
+        return self.counters.stats()
+
+explanation_cache = ExplanationCache()
@@ -0,0 +1,122 @@
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from starlette.middleware.gzip import GZipMiddleware
+
+from backend.config import HTTP_CACHE_MAX_AGE, HTTP_CACHE_S_MAXAGE
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, the standard encoder produces the same JSON
+    orjson = None
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse that encodes with orjson when it is installed.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:  # brotli is optional, gzip is always available
+    BrotliMiddleware = None
+
+def cache_control(max_age: int = HTTP_CACHE_MAX_AGE, s_maxage: int = HTTP_CACHE_S_MAXAGE,
+                  public: bool = False) -> str:
+    # responses behind verify_api_key must stay private: a shared cache would hand them to clients without a key
+    if not public:
+        return f"private, max-age={max_age}, stale-while-revalidate={max_age}"
+    return f"public, max-age={max_age}, s-maxage={s_maxage}, stale-while-revalidate={max_age}"
+
+def make_etag(*parts: Any) -> str:
+    """
+    Builds a weak ETag from the values that identify a representation.
+
+    The ETag is weak because the same value is sent for the gzip, brotli and identity
+    encodings of the body, which are not byte-for-byte equal.
+
+    Args:
+        *parts (Any): Values such as the book id, content version and query parameters.
+
+    Returns:
+        str: A weak ETag, e.g. 'W/"3f1c..."'.
+    """
+    digest = hashlib.sha256("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return f'W/"{digest[:32]}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Checks whether the request's If-None-Match header matches an ETag.
+
+    Args:
+        request (Request): Incoming request.
+        etag (str): Current ETag of the resource.
+
+    Returns:
+        bool: True if the client's copy is current and a 304 can be sent.
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    # If-None-Match uses the weak comparison, so the W/ prefix is ignored on both sides
+    candidates = [value.strip().removeprefix("W/") for value in header.split(",")]
+    return "*" in candidates or etag.removeprefix("W/") in candidates
+
+def not_modified(etag: str, max_age: int = HTTP_CACHE_MAX_AGE, public: bool = False) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control(max_age, public=public)})
+
+def cached_json_response(request: Request, content: Any, etag: Optional[str] = None,
+                         max_age: int = HTTP_CACHE_MAX_AGE, public: bool = False) -> Response:
+    """
+    Serializes content with the fast JSON encoder and adds ETag and Cache-Control headers.
+
+    Args:
+        request (Request): Incoming request, checked for If-None-Match.
+        content (Any): JSON-serializable response body.
+        etag (Optional[str]): Precomputed ETag. Derived from the serialized body if omitted.
+        max_age (int): Seconds browsers may reuse the response without revalidating.
+        public (bool): Allow shared caches (CDNs) to store it; only for routes without an API key.
+
+    Returns:
+        Response: A 304 if the client's copy is current, otherwise the JSON response.
+    """
+    response = FastJSONResponse(content)
+    etag = etag or make_etag(hashlib.sha256(response.body).hexdigest())
+    if etag_matches(request, etag):
+        return not_modified(etag, max_age, public)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control(max_age, public=public)
+    return response
+
+class CompressionMiddleware:
+    """
+    Compresses responses for the given path prefixes only, with brotli when installed and gzip otherwise.
+
+    Other routes (e.g. the /explain/stream SSE endpoint) are passed through untouched,
+    so compression never buffers a streamed response.
+
+    Args:
+        app: The ASGI app to wrap.
+        prefixes (tuple[str, ...]): Path prefixes whose responses are compressed.
+        minimum_size (int): Responses smaller than this many bytes are sent as-is.
+    """
+
+    def __init__(self, app, prefixes: tuple = (), minimum_size: int = 500):
+        self.app = app
+        self.prefixes = tuple(prefixes)
+        if BrotliMiddleware is not None:
+            self.compressed = BrotliMiddleware(app, minimum_size=minimum_size, gzip_fallback=True)
+        else:
+            self.compressed = GZipMiddleware(app, minimum_size=minimum_size)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith(self.prefixes):
+            await self.compressed(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
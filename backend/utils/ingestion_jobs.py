@@ -0,0 +1,192 @@
+import json
+from typing import Optional
+
+from sqlalchemy import text
+
+from backend.db import db
+from backend.db.db import managed_connection
+
+class PageWatermark:
+    """
+    Tracks the highest page_number below which every page is stored, as batches finish out of order.
+
+    Args:
+        done_pages (set[int]): Pages already stored before this run.
+    """
+
+    def __init__(self, done_pages: set[int]):
+        self.done = set(done_pages)
+        self.last_page = None
+        self._advance()
+
+    def _advance(self):
+        next_page = 0 if self.last_page is None else self.last_page + 1
+        while next_page in self.done:
+            self.done.discard(next_page)
+            self.last_page = next_page
+            next_page += 1
+
+    def add(self, pages) -> Optional[int]:
+        self.done.update(pages)
+        self._advance()
+        return self.last_page
+
+def get_job(book_id: int) -> Optional[dict]:
+    """
+    Returns the ingestion job of a book.
+
+    Args:
+        book_id (int): Internal book id.
+
+    Returns:
+        Optional[dict]: The ingestion_jobs row, or None if the book was never tracked.
+    """
+    rows = db.select("ingestion_jobs", "*", {"book_id": book_id})
+    return rows[0] if rows else None
+
+START_JOB_SQL = """
+    INSERT INTO ingestion_jobs (book_id, chunker_version, status)
+    VALUES (:book_id, :chunker_version, 'running')
+    ON CONFLICT (book_id) DO UPDATE
+       SET status = 'running', error = NULL, finished_at = NULL, updated_at = now()
+    RETURNING *
+"""
+
+def start_job(book_id: int, chunker_version: str) -> dict:
+    """
+    Creates the job for a book, or marks an existing one as running again.
+
+    Args:
+        book_id (int): Internal book id.
+        chunker_version (str): CHUNKER_VERSION of the chunker producing the pages.
+
+    Returns:
+        dict: The ingestion_jobs row.
+    """
+    with managed_connection() as session:
+        row = session.execute(text(START_JOB_SQL), {"book_id": book_id, "chunker_version": chunker_version}).mappings().one()
+        session.commit()
+    return dict(row)
+
+def create_book_with_job(book_info: dict, chunker_version: str) -> dict:
+    """
+    Inserts a book and its running job in one transaction.
+
+    A crash can then never leave a book row without the job that tracks its pages.
+
+    Args:
+        book_info (dict): gutenberg_id, title, author, language, level and source_url.
+        chunker_version (str): CHUNKER_VERSION of the chunker producing the pages.
+
+    Returns:
+        dict: The ingestion_jobs row (its book_id is the new book's id).
+    """
+    with managed_connection() as session:
+        book_id = session.execute(text("""
+            INSERT INTO books (gutenberg_id, title, author, language, language_level, source)
+            VALUES (:gutenberg_id, :title, :author, :language, :level, :source_url)
+            RETURNING id
+        """), {key: book_info[key] for key in ("gutenberg_id", "title", "author", "language", "level", "source_url")}).scalar()
+        row = session.execute(text(START_JOB_SQL), {"book_id": book_id, "chunker_version": chunker_version}).mappings().one()
+        session.commit()
+    return dict(row)
+
+def checkpoint(job_id: int, last_page: Optional[int]):
+    """
+    Records the highest page_number below which every page is committed.
+
+    Args:
+        job_id (int): ingestion_jobs id.
+        last_page (Optional[int]): Contiguous watermark, None if page 0 is not committed yet.
+    """
+    with managed_connection() as session:
+        session.execute(text("""
+            UPDATE ingestion_jobs SET last_page = :last_page, updated_at = now() WHERE id = :job_id
+        """), {"job_id": job_id, "last_page": last_page})
+        session.commit()
+
+def finish_job(job_id: int, total_chunks: int, failed_pages: list[int], last_page: Optional[int]):
+    """
+    Closes a job: completed if every page is stored, failed (and resumable) otherwise.
+
+    Args:
+        job_id (int): ingestion_jobs id.
+        total_chunks (int): Number of pages the chunker produced.
+        failed_pages (list[int]): Pages whose embeddings could not be computed.
+        last_page (Optional[int]): Final contiguous watermark.
+
+    Returns:
+        str: The final status.
+    """
+    status = "failed" if failed_pages else "completed"
+    with managed_connection() as session:
+        session.execute(text("""
+            UPDATE ingestion_jobs
+               SET status = :status, total_chunks = :total_chunks, failed_pages = CAST(:failed_pages AS jsonb),
+                   last_page = :last_page, updated_at = now(), finished_at = now()
+             WHERE id = :job_id
+        """), {"job_id": job_id, "status": status, "total_chunks": total_chunks,
+               "failed_pages": json.dumps(sorted(failed_pages)), "last_page": last_page})
+        session.commit()
+    return status
+
+def fail_job(job_id: int, error: str):
+    """
+    Marks a job as failed after an unexpected error so a rerun resumes it.
+
+    Args:
+        job_id (int): ingestion_jobs id.
+        error (str): Error message.
+    """
+    with managed_connection() as session:
+        session.execute(text("""
+            UPDATE ingestion_jobs SET status = 'failed', error = :error, updated_at = now() WHERE id = :job_id
+        """), {"job_id": job_id, "error": error[:2000]})
+        session.commit()
+
+def committed_pages(book_id: int) -> set[int]:
+    """
+    Returns the page numbers of a book that are stored with an embedding.
+
+    Args:
+        book_id (int): Internal book id.
+
+    Returns:
+        set[int]: Stored page numbers.
+    """
+    rows = db.raw("SELECT page_number FROM chunks WHERE book_id = :book_id AND embedding IS NOT NULL",
+                  {"book_id": book_id})
+    return {row["page_number"] for row in rows}
+
+def find_partial_books() -> list[dict]:
+    """
+    Finds books whose ingestion did not finish cleanly.
+
+    A book is partial if its job is not completed, if pages are missing (gaps in page_number or
+    fewer pages than the job's total_chunks), if some chunks have no embedding, or if it has
+    neither a job nor any chunks (its ingestion never got past the books row).
+
+    Returns:
+        list[dict]: book_id, gutenberg_id, language, level, job status, chunker_version,
+        chunk count, expected count, missing pages and chunks without embeddings.
+    """
+    return db.raw("""
+        SELECT b.id AS book_id, b.gutenberg_id, b.language, b.language_level AS level,
+               j.status, j.chunker_version,
+               COALESCE(c.chunks, 0) AS chunks,
+               COALESCE(j.total_chunks, c.max_page + 1, 0) AS expected,
+               COALESCE(j.total_chunks, c.max_page + 1, 0) - COALESCE(c.chunks, 0) AS missing_pages,
+               COALESCE(c.unembedded, 0) AS unembedded
+        FROM books b
+        LEFT JOIN ingestion_jobs j ON j.book_id = b.id
+        LEFT JOIN (
+            SELECT book_id, COUNT(*) AS chunks, MAX(page_number) AS max_page,
+                   COUNT(*) FILTER (WHERE embedding IS NULL) AS unembedded
+            FROM chunks GROUP BY book_id
+        ) c ON c.book_id = b.id
+        WHERE (j.id IS NOT NULL AND j.status <> 'completed')
+           OR COALESCE(j.total_chunks, c.max_page + 1, 0) <> COALESCE(c.chunks, 0)
+           OR COALESCE(c.unembedded, 0) > 0
+           OR (j.id IS NULL AND c.book_id IS NULL)
+        ORDER BY b.id
+    """)
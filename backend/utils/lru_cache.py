@@ -0,0 +1,105 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+class LRUCache:
+    """
+    Thread-safe, size-bounded least-recently-used cache with optional expiry.
+
+    Args:
+        max_size (int): Maximum number of entries kept before the oldest is evicted.
+        ttl (Optional[float]): Seconds an entry stays valid. Entries never expire if None or 0.
+    """
+
+    def __init__(self, max_size: int, ttl: Optional[float] = None):
+        self.max_size = max_size
+        self.ttl = ttl or None
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Returns the cached value for a key and marks it as recently used.
+
+        Args:
+            key (Hashable): Cache key.
+
+        Returns:
+            Optional[Any]: The cached value, or None if the key is not cached or has expired.
+        """
+        with self._lock:
+            if key not in self._data:
+                return None
+            value, expires_at = self._data[key]
+            if expires_at is not None and time.monotonic() > expires_at:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Stores a value, evicting the least recently used entry if the cache is full.
+
+        Args:
+            key (Hashable): Cache key.
+            value (Any): Value to cache.
+        """
+        if self.max_size <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        """
+        Removes a key if present.
+        """
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """
+        Removes every entry from the cache.
+        """
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+class TieredCacheCounters:
+    """
+    Thread-safe hit/miss counters for a cache with an LRU in front of a Postgres tier.
+
+    Args:
+        memory (LRUCache): The in-memory tier, reported with its size and maximum size.
+    """
+
+    def __init__(self, memory: LRUCache):
+        self.memory = memory
+        self._counters = {"memory_hits": 0, "db_hits": 0, "misses": 0, "stores": 0}
+        self._lock = threading.Lock()
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def stats(self) -> dict:
+        """
+        Returns the counters plus the current size, the maximum size and the overall hit rate.
+        """
+        with self._lock:
+            counters = dict(self._counters)
+        hits = counters["memory_hits"] + counters["db_hits"]
+        lookups = hits + counters["misses"]
+        return {
+            **counters,
+            "size": len(self.memory),
+            "max_size": self.memory.max_size,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
@@ -1,18 +1,17 @@
-from typing import Optional
+from typing import AsyncIterator, Optional
 from openai import AsyncOpenAI
 from tenacity import retry, wait_random_exponential, stop_after_attempt
 
-from backend.config import OPENAI_MODEL, OPENAI_API_KEY
-from backend.utils.prompt_loader import load_prompt_template  
+from backend.config import OPENAI_MODEL, OPENAI_API_KEY, OPENAI_BASE_URL, PROMPT_VERSION
+from backend.utils.prompt_loader import prompt_registry
 
-client = AsyncOpenAI(api_key=OPENAI_API_KEY)
+client = AsyncOpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL)
 MODEL_NAME = OPENAI_MODEL
 RETRY_WAIT_MIN = 1
 RETRY_WAIT_MAX = 10
 RETRY_ATTEMPTS = 3
 
-@retry(wait=wait_random_exponential(min=RETRY_WAIT_MIN, max=RETRY_WAIT_MAX), stop=stop_after_attempt(RETRY_ATTEMPTS))
-async def get_explanation(
+def build_messages(
     text: str,
     level: str,
     context_before: Optional[str] = None,
@@ -20,24 +19,14 @@ async def get_explanation(
     book_title: Optional[str] = None,
     book_author: Optional[str] = None,
     book_language: Optional[str] = None,
-) -> str:
+) -> list[dict]:
     """
-    Calls the OpenAI API to explain a given text to a language learner.
-
-    Args:
-        text (str): The selected input text that needs to be explained.
-        level (str): The user's language proficiency level (e.g., A1, B2).
-        context_before (Optional[str]): Up to 50 words that appear before the selected text.
-        context_after (Optional[str]): Up to 50 words that appear after the selected text.
-        book_title (Optional[str]): The title of the book the text is from.
-        book_author (Optional[str]): The author of the book the text is from.
-        book_language (Optional[str]): The language the book is written in (e.g., "Spanish").
+    Builds the system and user messages for an explanation request.
 
     Returns:
-        str: A simplified explanation of the input text, tailored to the user's level and context.
+        list[dict]: Chat messages for chat.completions.create.
     """
-
-    template = load_prompt_template()
+    template = prompt_registry.get("explanation", PROMPT_VERSION)
     system_prompt = template.render(
         level=level,
         book_title=book_title,
@@ -56,13 +45,78 @@ async def get_explanation(
 
     user_message = "\n".join(user_parts)
 
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_message},
+    ]
+
+@retry(wait=wait_random_exponential(min=RETRY_WAIT_MIN, max=RETRY_WAIT_MAX), stop=stop_after_attempt(RETRY_ATTEMPTS))
+async def get_explanation(
+    text: str,
+    level: str,
+    context_before: Optional[str] = None,
+    context_after: Optional[str] = None,
+    book_title: Optional[str] = None,
+    book_author: Optional[str] = None,
+    book_language: Optional[str] = None,
+) -> str:
+    """
+    Calls the OpenAI API to explain a given text to a language learner.
+
+    Args:
+        text (str): The selected input text that needs to be explained.
+        level (str): The user's language proficiency level (e.g., A1, B2).
+        context_before (Optional[str]): Up to 50 words that appear before the selected text.
+        context_after (Optional[str]): Up to 50 words that appear after the selected text.
+        book_title (Optional[str]): The title of the book the text is from.
+        book_author (Optional[str]): The author of the book the text is from.
+        book_language (Optional[str]): The language the book is written in (e.g., "Spanish").
+
+    Returns:
+        str: A simplified explanation of the input text, tailored to the user's level and context.
+    """
+    messages = build_messages(text, level, context_before, context_after, book_title, book_author, book_language)
+
     response = await client.chat.completions.create(
         model=MODEL_NAME,
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_message},
-        ],
+        messages=messages,
         temperature=0,
     )
 
     return response.choices[0].message.content.strip()
+
+async def stream_explanation(
+    text: str,
+    level: str,
+    context_before: Optional[str] = None,
+    context_after: Optional[str] = None,
+    book_title: Optional[str] = None,
+    book_author: Optional[str] = None,
+    book_language: Optional[str] = None,
+) -> AsyncIterator[str]:
+    """
+    Streams an explanation from the OpenAI API token by token.
+
+    Closing the generator early (e.g. when the reader disconnects) closes the
+    upstream HTTP stream, which cancels the completion.
+
+    Args:
+        Same as get_explanation.
+
+    Yields:
+        str: Pieces of the explanation as they arrive.
+    """
+    messages = build_messages(text, level, context_before, context_after, book_title, book_author, book_language)
+
+    stream = await client.chat.completions.create(
+        model=MODEL_NAME,
+        messages=messages,
+        temperature=0,
+        stream=True,
+    )
+    try:
+        async for event in stream:
+            if event.choices and event.choices[0].delta.content:
+                yield event.choices[0].delta.content
+    finally:
+        await stream.close()
@@ -1,7 +1,94 @@
-from jinja2 import Environment, FileSystemLoader
+import threading
+from pathlib import Path
+from typing import Optional
 
-PROMPT_DIR = "backend/prompt_templates"  
+from jinja2 import Environment, FileSystemLoader, Template
 
-def load_prompt_template(prompt_name: str = "explanation", version: str = "v1"):
-    env = Environment(loader=FileSystemLoader(PROMPT_DIR))
-    return env.get_template(f"{prompt_name}_{version}.j2")
+from backend.utils.token_utils import count_tokens
+
+PROMPT_DIR = Path(__file__).resolve().parent.parent / "prompt_templates"
+
+# values used to render every template when measuring its size
+SAMPLE_VARIABLES = {
+    "level": "B1",
+    "book_title": "Don Quijote",
+    "book_author": "Miguel de Cervantes",
+    "book_language": "Spanish",
+    "context_before": "En un lugar de la Mancha,",
+    "context_after": "no ha mucho tiempo que vivía un hidalgo",
+}
+
+class PromptRegistry:
+    """
+    Compiles every versioned prompt template (<name>_<version>.j2) once and serves the compiled objects.
+
+    Args:
+        directory (Path): Folder holding the .j2 templates. Defaults to the package's prompt_templates folder.
+    """
+
+    def __init__(self, directory: Path = PROMPT_DIR):
+        self.directory = Path(directory)
+        self._lock = threading.Lock()
+        self._templates = {}
+        self.reload()
+
+    def reload(self) -> list[str]:
+        """
+        Recompiles all templates from disk, replacing the current set in one step.
+
+        Returns:
+            list[str]: Names of the loaded templates, e.g. "explanation_v1".
+        """
+        env = Environment(loader=FileSystemLoader(str(self.directory)), auto_reload=False)
+        templates = {path.stem: env.get_template(path.name) for path in sorted(self.directory.glob("*.j2"))}
+        with self._lock:
+            self._templates = templates
+        return list(templates)
+
+    def get(self, prompt_name: str = "explanation", version: str = "v1") -> Template:
+        """
+        Returns a compiled template.
+
+        Args:
+            prompt_name (str): Template family, e.g. "explanation".
+            version (str): Template version, e.g. "v2".
+
+        Returns:
+            Template: The compiled Jinja template.
+
+        Raises:
+            KeyError: If no template with that name and version was loaded.
+        """
+        name = f"{prompt_name}_{version}"
+        try:
+            return self._templates[name]
+        except KeyError:
+            raise KeyError(f"Unknown prompt template '{name}' in {self.directory}") from None
+
+    def token_counts(self, model: Optional[str] = None) -> dict:
+        """
+        Measures each template's rendered size.
+
+        static_tokens is the template rendered without any variables, i.e. the part
+        every request shares; sample_tokens is the template rendered with SAMPLE_VARIABLES.
+
+        Args:
+            model (Optional[str]): Model whose tokenizer is used. Defaults to OPENAI_MODEL.
+
+        Returns:
+            dict: Template name -> {"static_tokens": int, "sample_tokens": int}.
+        """
+        with self._lock:
+            templates = dict(self._templates)
+        return {
+            name: {
+                "static_tokens": count_tokens(template.render(), model),
+                "sample_tokens": count_tokens(template.render(**SAMPLE_VARIABLES), model),
+            }
+            for name, template in templates.items()
+        }
+
+prompt_registry = PromptRegistry()
+
+def load_prompt_template(prompt_name: str = "explanation", version: str = "v1") -> Template:
+    return prompt_registry.get(prompt_name, version)
@@ -1,70 +1,548 @@
-from llama_index.core import Settings, VectorStoreIndex, StorageContext
-from llama_index.vector_stores.postgres import PGVectorStore
-from llama_index.core.node_parser import SimpleNodeParser
-from llama_index.core.query_engine import RetrieverQueryEngine
+import os
+import re
+import json
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
 from llama_index.embeddings.openai import OpenAIEmbedding
-from llama_index.llms.openai import OpenAI
-from llama_index.core.vector_stores.types import MetadataFilters, MetadataFilter
 
-from sqlalchemy.engine.url import make_url
+from sqlalchemy import text
 
-from backend.config import DATABASE_URL, OPENAI_EMBEDDINGS, OPENAI_MODEL
+from backend.config import (
+    OPENAI_EMBEDDINGS, PGVECTOR_EF_SEARCH, PGVECTOR_PROBES, PGVECTOR_ITERATIVE_SCAN, RETRIEVER_BACKEND,
+    BOOK_MATRIX_MAX_MB, BOOK_MATRIX_CACHE_DIR, BOOK_MATRIX_TTL,
+)
+from backend.db import db as sync_db
+from backend.db.db import managed_connection, to_pgvector
+from backend.db.async_db import managed_async_connection
+from backend.utils.embedding_cache import QueryEmbeddingCache
 
 from tenacity import retry, stop_after_attempt, wait_random_exponential
 
-def get_pgvector_store(book_id: int) -> PGVectorStore:
+SEARCH_SETTINGS_SQL = "SELECT set_config('hnsw.ef_search', :ef_search, true), set_config('ivfflat.probes', :probes, true)"
+# the ANN index covers every book and the book_id filter is applied to what it returns, so without an
+# iterative scan (pgvector >= 0.8) a query can come back with fewer than top_k rows; ivfflat only
+# supports relaxed_order
+ITERATIVE_SCAN_SQL = "SELECT set_config('hnsw.iterative_scan', :hnsw, true), set_config('ivfflat.iterative_scan', :ivfflat, true)"
+EXACT_SEARCH_SQL = "SET LOCAL enable_indexscan = off"
+# before 0.8, pgvector reserves the hnsw./ivfflat. prefixes and rejects the iterative_scan settings
+PGVECTOR_VERSION_SQL = "SELECT extversion FROM pg_extension WHERE extname = 'vector'"
+# capped at top_k: only needed to tell a short ANN result from a book that has fewer chunks
+EMBEDDED_CHUNKS_SQL = """
+    SELECT count(*) FROM (
+        SELECT 1 FROM chunks WHERE book_id = :book_id AND embedding IS NOT NULL LIMIT :top_k
+    ) AS embedded
+"""
+# the query vector is bound as text so asyncpg does not need a pgvector codec
+SEARCH_SQL = """
+    SELECT id AS chunk_id, page_number, text, embedding <=> CAST(CAST(:query AS text) AS vector) AS distance
+    FROM chunks
+    WHERE book_id = :book_id
+      AND embedding IS NOT NULL
+    ORDER BY embedding <=> CAST(CAST(:query AS text) AS vector)
+    LIMIT :top_k
+"""
+
+_iterative_scan_supported: Optional[bool] = None
+
+def _supports_iterative_scan(version: Optional[str]) -> bool:
+    numbers = [int(n) for n in re.findall(r"\d+", version or "")[:2]]
+    return len(numbers) == 2 and tuple(numbers) >= (0, 8)
+
+def _iterative_scan_params(iterative_scan: str) -> dict:
+    return {"hnsw": iterative_scan, "ivfflat": "off" if iterative_scan == "off" else "relaxed_order"}
+
+def _start_iterative_scan(db, iterative_scan: str) -> bool:
+    # the installed pgvector version is read once per process
+    global _iterative_scan_supported
+    if iterative_scan == "off":
+        return False
+    if _iterative_scan_supported is None:
+        _iterative_scan_supported = _supports_iterative_scan(db.execute(text(PGVECTOR_VERSION_SQL)).scalar())
+    if _iterative_scan_supported:
+        db.execute(text(ITERATIVE_SCAN_SQL), _iterative_scan_params(iterative_scan))
+    return _iterative_scan_supported
+
+async def _astart_iterative_scan(db, iterative_scan: str) -> bool:
+    global _iterative_scan_supported
+    if iterative_scan == "off":
+        return False
+    if _iterative_scan_supported is None:
+        version = (await db.execute(text(PGVECTOR_VERSION_SQL))).scalar()
+        _iterative_scan_supported = _supports_iterative_scan(version)
+    if _iterative_scan_supported:
+        await db.execute(text(ITERATIVE_SCAN_SQL), _iterative_scan_params(iterative_scan))
+    return _iterative_scan_supported
+
+def search_chunks(
+    query_embedding: list[float],
+    book_id: int,
+    top_k: int = 5,
+    ef_search: int = PGVECTOR_EF_SEARCH,
+    probes: int = PGVECTOR_PROBES,
+    exact: bool = False,
+    iterative_scan: str = PGVECTOR_ITERATIVE_SCAN,
+    exact_fallback: bool = True,
+) -> list[dict]:
     """
-    Initializes a PGVectorStore for a specific book using LlamaIndex's pgvector integration.
+    Finds the chunks of a book closest to a query embedding (cosine distance).
+
+    Filters on the chunks.book_id column, and lets the ANN index on chunks.embedding
+    serve the ordering. The index is shared by all books, so the filter can discard most
+    of its candidates: on pgvector 0.8+ an iterative scan keeps searching until top_k rows
+    pass; on older versions a result shorter than top_k is repeated as an exact search,
+    unless the book simply has fewer than top_k embedded chunks.
 
     Args:
-        book_id (int): The ID of the book to scope the vector collection.
+        query_embedding (list[float]): Embedding of the query.
+        book_id (int): The ID of the book to search.
+        top_k (int): Number of chunks to return.
+        ef_search (int): HNSW candidate list size; higher trades speed for recall.
+        probes (int): IVFFlat lists to scan; higher trades speed for recall.
+        exact (bool): Skip the ANN index and compute exact distances.
+        iterative_scan (str): hnsw.iterative_scan mode ("strict_order", "relaxed_order" or "off");
+            ignored before pgvector 0.8.
+        exact_fallback (bool): Repeat a short ANN result as an exact search when no iterative scan ran.
 
     Returns:
-        PGVectorStore: A vector store object connected to the given book's embedding collection.
-    """
-    url = make_url(DATABASE_URL)
-    return PGVectorStore.from_params(
-        database=url.database,
-        host=url.host,
-        port=url.port,
-        user=url.username,
-        password=url.password,
-        table_name="chunks",  
-        embed_dim=1536
-    )
+        list[dict]: Matching chunks (chunk_id, page_number, text, distance), closest first.
+    """
+    params = {"query": to_pgvector(query_embedding), "book_id": book_id, "top_k": top_k}
+    with managed_connection() as db:
+        # SET LOCAL equivalents, scoped to this transaction only
+        db.execute(text(SEARCH_SETTINGS_SQL), {"ef_search": str(ef_search), "probes": str(probes)})
+        scanning = not exact and _start_iterative_scan(db, iterative_scan)
+        if exact:
+            db.execute(text(EXACT_SEARCH_SQL))
+
+        records = [dict(row) for row in db.execute(text(SEARCH_SQL), params).mappings().all()]
+        if (len(records) < top_k and exact_fallback and not exact and not scanning
+                and db.execute(text(EMBEDDED_CHUNKS_SQL), params).scalar() > len(records)):
+            db.execute(text(EXACT_SEARCH_SQL))
+            records = [dict(row) for row in db.execute(text(SEARCH_SQL), params).mappings().all()]
+        db.rollback()
+    return records
+
+async def asearch_chunks(
+    query_embedding: list[float],
+    book_id: int,
+    top_k: int = 5,
+    ef_search: int = PGVECTOR_EF_SEARCH,
+    probes: int = PGVECTOR_PROBES,
+    iterative_scan: str = PGVECTOR_ITERATIVE_SCAN,
+) -> list[dict]:
+    """
+    Async variant of search_chunks, run on the asyncpg pool.
+    """
+    params = {"query": to_pgvector(query_embedding), "book_id": book_id, "top_k": top_k}
+    async with managed_async_connection() as db:
+        await db.execute(text(SEARCH_SETTINGS_SQL), {"ef_search": str(ef_search), "probes": str(probes)})
+        scanning = await _astart_iterative_scan(db, iterative_scan)
+
+        result = await db.execute(text(SEARCH_SQL), params)
+        records = [dict(row) for row in result.mappings().all()]
+        if (len(records) < top_k and not scanning
+                and (await db.execute(text(EMBEDDED_CHUNKS_SQL), params)).scalar() > len(records)):
+            await db.execute(text(EXACT_SEARCH_SQL))
+            result = await db.execute(text(SEARCH_SQL), params)
+            records = [dict(row) for row in result.mappings().all()]
+        await db.rollback()
+    return records
+
+CONTENT_VERSION_SQL = "SELECT content_version FROM books WHERE id = :book_id"
+MATRIX_META_SQL = """
+    SELECT id, page_number, text
+    FROM chunks
+    WHERE book_id = :book_id AND embedding IS NOT NULL
+    ORDER BY id
+"""
+# embeddings are read as text so psycopg2 does not need a pgvector codec
+MATRIX_ROWS_SQL = """
+    SELECT id, page_number, text, embedding::text AS embedding
+    FROM chunks
+    WHERE book_id = :book_id AND embedding IS NOT NULL
+    ORDER BY id
+"""
+
+@dataclass
+class BookMatrix:
+    """
+    One book's chunk embeddings as a float32 matrix of unit rows, plus what search results need.
+    """
+    book_id: int
+    content_version: int
+    chunk_ids: np.ndarray
+    page_numbers: np.ndarray
+    texts: list
+    matrix: np.ndarray
+    checked_at: float
+
+    @property
+    def nbytes(self) -> int:
+        return self.matrix.nbytes + self.chunk_ids.nbytes + self.page_numbers.nbytes + sum(len(t) for t in self.texts)
+
+    def search(self, query_embedding, top_k: int) -> list[dict]:
+        """
+        Exact cosine search: one matrix-vector product, then argpartition for the top k.
+
+        Args:
+            query_embedding (list[float]): Embedding of the query.
+            top_k (int): Number of chunks to return.
+
+        Returns:
+            list[dict]: Matching chunks (chunk_id, page_number, text, distance), closest first.
+        """
+        if not len(self.chunk_ids):
+            return []
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+        similarities = self.matrix @ query
 
-def get_vector_index(book_id: int) -> VectorStoreIndex:
+        k = min(top_k, len(similarities))
+        if k <= 0:
+            return []
+        top = np.argpartition(-similarities, k - 1)[:k] if k < len(similarities) else np.arange(k)
+        top = top[np.argsort(-similarities[top], kind="stable")]
+        return [
+            {
+                "chunk_id": int(self.chunk_ids[i]),
+                "page_number": int(self.page_numbers[i]),
+                "text": self.texts[i],
+                "distance": float(1.0 - similarities[i]),
+            }
+            for i in top
+        ]
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    matrix /= norms
+    return matrix
+
+def _save_npy(path: str, array: np.ndarray) -> None:
+    # written to a temp file and renamed, so a concurrent reader never maps a partial file
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+def load_book_matrix(book_id: int, cache_dir: Optional[str] = None) -> BookMatrix:
     """
-    Builds a VectorStoreIndex for the given book using its associated PGVectorStore.
+    Loads a book's embeddings into a BookMatrix.
+
+    With a cache_dir, the normalized matrix is saved as .npy next to the chunk ids it was
+    built from, and later loads memory-map it instead of reading every embedding from
+    Postgres. Files are named by content_version, so a re-ingested book gets new ones.
 
     Args:
-        book_id (int): The ID of the book for which the index is constructed.
+        book_id (int): The ID of the book.
+        cache_dir (str, optional): Directory for the .npy cache; no disk cache if empty.
 
     Returns:
-        VectorStoreIndex: An index used to retrieve semantically similar chunks from the vector DB.
+        BookMatrix: The book's matrix, empty if it has no embedded chunks.
     """
-    vector_store = get_pgvector_store(book_id)
-    storage_context = StorageContext.from_defaults(vector_store=vector_store)
+    rows = sync_db.raw(CONTENT_VERSION_SQL, {"book_id": book_id})
+    content_version = rows[0]["content_version"] if rows else 0
 
-    Settings.embed_model = OpenAIEmbedding(model=OPENAI_EMBEDDINGS)
-    Settings.llm = OpenAI(model=OPENAI_MODEL)
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        prefix = os.path.join(cache_dir, f"book-{book_id}-v{content_version}")
+        matrix_path, ids_path = f"{prefix}.npy", f"{prefix}-ids.npy"
+        if os.path.exists(matrix_path) and os.path.exists(ids_path):
+            meta = sync_db.raw(MATRIX_META_SQL, {"book_id": book_id})
+            chunk_ids = np.array([row["id"] for row in meta], dtype=np.int64)
+            if np.array_equal(np.load(ids_path), chunk_ids):
+                return BookMatrix(
+                    book_id=book_id,
+                    content_version=content_version,
+                    chunk_ids=chunk_ids,
+                    page_numbers=np.array([row["page_number"] for row in meta], dtype=np.int32),
+                    texts=[row["text"] for row in meta],
+                    matrix=np.load(matrix_path, mmap_mode="r"),
+                    checked_at=time.monotonic(),
+                )
 
-    return VectorStoreIndex.from_vector_store(
-        vector_store=vector_store,
-        storage_context=storage_context,
+    ids, pages, texts, vectors = [], [], [], []
+    for row in sync_db.iter_raw(MATRIX_ROWS_SQL, {"book_id": book_id}):
+        ids.append(row["id"])
+        pages.append(row["page_number"])
+        texts.append(row["text"])
+        vectors.append(np.asarray(json.loads(row["embedding"]), dtype=np.float32))
+
+    matrix = _normalize_rows(np.vstack(vectors)) if vectors else np.empty((0, 0), dtype=np.float32)
+    chunk_ids = np.array(ids, dtype=np.int64)
+    if cache_dir and vectors:
+        _save_npy(matrix_path, matrix)
+        _save_npy(ids_path, chunk_ids)
+
+    return BookMatrix(
+        book_id=book_id,
+        content_version=content_version,
+        chunk_ids=chunk_ids,
+        page_numbers=np.array(pages, dtype=np.int32),
+        texts=texts,
+        matrix=matrix,
+        checked_at=time.monotonic(),
     )
 
+# loads of the same book are serialized on one of a fixed set of locks, so the locks do not
+# grow with the number of books ever searched; two books sharing a stripe just load in turn
+LOAD_LOCK_STRIPES = 64
+
+class NumpySearchEngine:
+    """
+    In-process exact search over per-book embedding matrices.
+
+    A book's matrix is loaded on first use and kept in an LRU bounded by a memory
+    budget. Queries are answered without a database round trip; after `ttl` seconds
+    the book's content_version is re-checked and the matrix reloaded if it changed.
+
+    Args:
+        max_bytes (int): Memory budget for cached matrices. A book larger than the budget is searched but not kept.
+        cache_dir (str, optional): Directory for memory-mapped .npy copies of the matrices.
+        ttl (float): Seconds between content_version checks for a cached book; 0 = never re-check.
+    """
+
+    def __init__(self, max_bytes: int = BOOK_MATRIX_MAX_MB * 1024 * 1024,
+                 cache_dir: Optional[str] = BOOK_MATRIX_CACHE_DIR or None, ttl: float = BOOK_MATRIX_TTL):
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self._books = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._load_locks = [threading.Lock() for _ in range(LOAD_LOCK_STRIPES)]
+        self._counters = {"hits": 0, "misses": 0, "loads": 0, "evictions": 0}
+
+    def _count(self, name: str, n: int = 1) -> None:
+        self._counters[name] += n
+
+    def _get(self, book_id: int) -> Optional[BookMatrix]:
+        with self._lock:
+            entry = self._books.get(book_id)
+            if entry is not None:
+                self._books.move_to_end(book_id)
+            return entry
+
+    def _put(self, entry: BookMatrix) -> None:
+        with self._lock:
+            self._drop(entry.book_id)
+            if entry.nbytes > self.max_bytes:
+                return
+            self._books[entry.book_id] = entry
+            self._bytes += entry.nbytes
+            while self._bytes > self.max_bytes:
+                _, evicted = self._books.popitem(last=False)
+                self._bytes -= evicted.nbytes
+                self._count("evictions")
+
+    def _drop(self, book_id: int) -> None:
+        entry = self._books.pop(book_id, None)
+        if entry is not None:
+            self._bytes -= entry.nbytes
+
+    def _is_current(self, entry: BookMatrix) -> bool:
+        if not self.ttl or time.monotonic() - entry.checked_at < self.ttl:
+            return True
+        rows = sync_db.raw(CONTENT_VERSION_SQL, {"book_id": entry.book_id})
+        if rows and rows[0]["content_version"] == entry.content_version:
+            entry.checked_at = time.monotonic()
+            return True
+        return False
+
+    def matrix_for(self, book_id: int) -> BookMatrix:
+        """
+        Returns a book's matrix, loading it (once, even under concurrent queries) if needed.
+
+        Args:
+            book_id (int): The ID of the book.
+
+        Returns:
+            BookMatrix: The book's embedding matrix.
+        """
+        entry = self._get(book_id)
+        if entry is not None and self._is_current(entry):
+            with self._lock:
+                self._count("hits")
+            return entry
+
+        with self._load_locks[book_id % LOAD_LOCK_STRIPES]:
+            entry = self._get(book_id)
+            if entry is not None and self._is_current(entry):
+                with self._lock:
+                    self._count("hits")
+                return entry
+
+            entry = load_book_matrix(book_id, self.cache_dir)
+            with self._lock:
+                self._count("misses")
+                self._count("loads")
+            self._put(entry)
+            return entry
+
+    def search(self, query_embedding: list[float], book_id: int, top_k: int = 5) -> list[dict]:
+        """
+        Finds the chunks of a book closest to a query embedding (cosine distance), exactly.
+
+        Args:
+            query_embedding (list[float]): Embedding of the query.
+            book_id (int): The ID of the book to search.
+            top_k (int): Number of chunks to return.
+
+        Returns:
+            list[dict]: Matching chunks (chunk_id, page_number, text, distance), closest first.
+        """
+        return self.matrix_for(book_id).search(query_embedding, top_k)
+
+    async def asearch(self, query_embedding: list[float], book_id: int, top_k: int = 5) -> list[dict]:
+        """
+        Async variant of search; a first-time load runs in a worker thread.
+        """
+        entry = self._get(book_id)
+        if entry is not None and (not self.ttl or time.monotonic() - entry.checked_at < self.ttl):
+            with self._lock:
+                self._count("hits")
+            return entry.search(query_embedding, top_k)
+        return await asyncio.to_thread(self.search, query_embedding, book_id, top_k)
+
+    def invalidate(self, book_id: Optional[int] = None) -> None:
+        """
+        Drops a cached matrix (or all of them) so the next query reloads it.
+        """
+        with self._lock:
+            if book_id is None:
+                self._books.clear()
+                self._bytes = 0
+            else:
+                self._drop(book_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._counters,
+                "books": len(self._books),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+class RetrieverService:
+    """
+    Long-lived retrieval service, created once per process.
+
+    Holds one embedding model and reuses the application's DB pools, so a query only
+    pays for embedding the query text and running the search. Repeated queries skip
+    the embedding call through the query-embedding cache. With the "numpy" backend,
+    searches run in process against per-book embedding matrices (NumpySearchEngine)
+    instead of in Postgres.
+
+    Args:
+        embed_model_name (str): OpenAI embedding model used for queries.
+        embedding_cache (QueryEmbeddingCache, optional): Cache for query embeddings.
+        backend (str): "pgvector" (ANN index in Postgres) or "numpy" (exact, in process).
+        numpy_engine (NumpySearchEngine, optional): Engine used by the numpy backend.
+    """
+
+    def __init__(self, embed_model_name: str = OPENAI_EMBEDDINGS,
+                 embedding_cache: Optional[QueryEmbeddingCache] = None, backend: str = RETRIEVER_BACKEND,
+                 numpy_engine: Optional[NumpySearchEngine] = None):
+        if backend not in ("pgvector", "numpy"):
+            raise ValueError(f"Unknown retriever backend: {backend}")
+        self.embed_model_name = embed_model_name
+        self.embedding_cache = embedding_cache or QueryEmbeddingCache()
+        self.backend = backend
+        self.numpy_engine = numpy_engine or NumpySearchEngine()
+        self._embed_model = None
+        self._lock = threading.Lock()
+
+    @property
+    def embed_model(self) -> OpenAIEmbedding:
+        if self._embed_model is None:
+            with self._lock:
+                if self._embed_model is None:
+                    self._embed_model = OpenAIEmbedding(model=self.embed_model_name)
+        return self._embed_model
+
+    def embed_query(self, query: str) -> list[float]:
+        embedding = self.embedding_cache.get(self.embed_model_name, query)
+        if embedding is None:
+            embedding = self.embed_model.get_query_embedding(query)
+            self.embedding_cache.set(self.embed_model_name, query, embedding)
+        return embedding
+
+    async def aembed_query(self, query: str) -> list[float]:
+        embedding = await self.embedding_cache.aget(self.embed_model_name, query)
+        if embedding is None:
+            embedding = await self.embed_model.aget_query_embedding(query)
+            await self.embedding_cache.aset(self.embed_model_name, query, embedding)
+        return embedding
+
+    def retrieve(self, query: str, book_id: int, top_k: int = 5,
+                 ef_search: int = PGVECTOR_EF_SEARCH, probes: int = PGVECTOR_PROBES) -> list[dict]:
+        """
+        Embeds the query and returns the book's closest chunks.
+
+        ef_search/probes only apply to the pgvector backend; the numpy backend is always exact.
+
+        Args:
+            query (str): Query text.
+            book_id (int): The ID of the book to search.
+            top_k (int): Number of chunks to return.
+            ef_search (int): HNSW candidate list size.
+            probes (int): IVFFlat lists to scan.
+
+        Returns:
+            list[dict]: Matching chunks (chunk_id, page_number, text, distance), closest first.
+        """
+        query_embedding = self.embed_query(query)
+        if self.backend == "numpy":
+            return self.numpy_engine.search(query_embedding, book_id, top_k=top_k)
+        return search_chunks(query_embedding, book_id, top_k=top_k, ef_search=ef_search, probes=probes)
+
+    async def aretrieve(self, query: str, book_id: int, top_k: int = 5,
+                        ef_search: int = PGVECTOR_EF_SEARCH, probes: int = PGVECTOR_PROBES) -> list[dict]:
+        """
+        Async variant of retrieve; safe to call from many concurrent requests.
+        """
+        query_embedding = await self.aembed_query(query)
+        if self.backend == "numpy":
+            return await self.numpy_engine.asearch(query_embedding, book_id, top_k=top_k)
+        return await asearch_chunks(query_embedding, book_id, top_k=top_k, ef_search=ef_search, probes=probes)
+
+retriever_service = RetrieverService()
+
 @retry(stop=stop_after_attempt(3), wait=wait_random_exponential(min=1, max=3))
-def retrieve_top_chunks(query: str, book_id: int, top_k: int = 5) -> list[str]:
+def retrieve_top_chunks(
+    query: str,
+    book_id: int,
+    top_k: int = 5,
+    ef_search: int = PGVECTOR_EF_SEARCH,
+    probes: int = PGVECTOR_PROBES,
+) -> list[str]:
     """
     Retrieves the top-k semantically similar chunks from the vector store for a given query.
 
     Filters results to only include chunks belonging to the specified book_id.
+    ef_search/probes tune the recall/speed trade-off of the ANN index for this call.
     """
-    index = get_vector_index(book_id)
-    
-    filters = MetadataFilters(filters=[MetadataFilter(key="book_id", value=book_id)])
-    retriever = index.as_retriever(similarity_top_k=top_k, filters=filters)
+    results = retriever_service.retrieve(query, book_id, top_k=top_k, ef_search=ef_search, probes=probes)
+    return [row["text"] for row in results]
 
-    results = retriever.retrieve(query)
-    return [node.get_content() for node in results]
\ No newline at end of file
+async def aretrieve_top_chunks(
+    query: str,
+    book_id: int,
+    top_k: int = 5,
+    ef_search: int = PGVECTOR_EF_SEARCH,
+    probes: int = PGVECTOR_PROBES,
+) -> list[str]:
+    """
+    Async variant of retrieve_top_chunks for use inside request handlers.
+    """
+    results = await retriever_service.aretrieve(query, book_id, top_k=top_k, ef_search=ef_search, probes=probes)
+    return [row["text"] for row in results]
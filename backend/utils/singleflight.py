@@ -0,0 +1,59 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Hashable
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into one in-flight call.
+
+    The first caller for a key starts the work as a task. Callers that arrive while it
+    is running await the same task and receive its result, or its exception. A caller
+    that gives up (e.g. the client disconnects) does not cancel the work for the others.
+    """
+
+    def __init__(self):
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._counters = {"executed": 0, "coalesced": 0}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Runs func() once per key among concurrent callers.
+
+        Args:
+            key (Hashable): Identifies identical requests.
+            func (Callable[[], Awaitable[Any]]): Starts the work; only called by the first caller.
+
+        Returns:
+            Any: The shared result.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+            self._count("executed")
+        else:
+            self._count("coalesced")
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Future) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # mark as retrieved; the callers re-raise it
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def stats(self) -> dict:
+        """
+        Returns how many calls were executed and how many were coalesced into them.
+
+        Returns:
+            dict: executed, coalesced and in_flight counts.
+        """
+        with self._lock:
+            counters = dict(self._counters)
+        return {**counters, "in_flight": len(self._inflight)}
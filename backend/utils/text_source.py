@@ -0,0 +1,105 @@
+import itertools
+import logging
+import os
+import re
+from typing import Iterable, Iterator
+from urllib.parse import urlparse
+
+import requests
+from tenacity import retry, wait_random_exponential, stop_after_attempt
+
+log = logging.getLogger(__name__)
+
+# many text files say where the book text starts and ends, noted by "*** START OF ... ***" / "*** END OF ... ***"
+START_MARKER = re.compile(r"\*\*\*\s*START OF.*?\*\*\*", re.IGNORECASE)
+END_MARKER = re.compile(r"\*\*\*\s*END OF.*?\*\*\*", re.IGNORECASE)
+
+# the START marker is expected within the header; past this many lines the text is assumed to have none
+HEADER_SCAN_LINES = 2000
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+USER_AGENT = "Mozilla/5.0 (compatible; MyBookApp/0.1)"
+
+@retry(wait=wait_random_exponential(min=1, max=4), stop=stop_after_attempt(3))
+def _open_stream(url: str, timeout: float) -> requests.Response:
+    response = requests.get(url, headers={"User-Agent": USER_AGENT}, timeout=timeout, stream=True)
+    if response.status_code != 200:
+        response.close()
+        raise Exception("Failed to download book text.")
+    return response
+
+def iter_text_lines(source: str, encoding: str = "utf-8", timeout: float = 15) -> Iterator[str]:
+    """
+    Streams the lines of a book from a URL or a local file without loading the whole text.
+
+    Args:
+        source (str): http(s) URL, file:// URL or local path of the plain text file.
+        encoding (str, optional): Text encoding format (default is "utf-8").
+        timeout (float, optional): Seconds to wait for the server to respond.
+
+    Raises:
+        Exception: If the text cannot be downloaded (non-200 status code).
+
+    Yields:
+        str: One line at a time, without the trailing newline.
+    """
+    parsed = urlparse(source)
+    if parsed.scheme in ("", "file") or os.path.exists(source):
+        path = parsed.path if parsed.scheme == "file" else source
+        with open(path, encoding=encoding, errors="replace") as f:
+            for line in f:
+                yield line.rstrip("\r\n")
+        return
+
+    response = _open_stream(source, timeout)
+    response.encoding = encoding
+    try:
+        # decode incrementally so multi-byte characters split across network chunks stay intact
+        pending = ""
+        for piece in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE, decode_unicode=True):
+            pending += piece
+            lines = pending.split("\n")
+            pending = lines.pop()
+            for line in lines:
+                yield line.rstrip("\r")
+        if pending:
+            yield pending.rstrip("\r")
+    finally:
+        response.close()
+
+def strip_boilerplate(lines: Iterable[str], header_scan_lines: int = HEADER_SCAN_LINES) -> Iterator[str]:
+    """
+    Removes the Project Gutenberg header and license footer from a stream of lines.
+
+    Lines before the START marker are held (at most header_scan_lines of them) until the marker
+    is found; if it never shows up they are treated as book text. Reading stops at the END marker.
+
+    Args:
+        lines (Iterable[str]): Raw book lines, e.g. from iter_text_lines.
+        header_scan_lines (int, optional): How far into the text to look for the START marker.
+
+    Yields:
+        str: Lines of the actual story/text.
+    """
+    lines = iter(lines)
+    header = []
+    for line in lines:
+        start = START_MARKER.search(line)
+        if start:
+            body = [line[start.end():]]
+            break
+        header.append(line)
+        if END_MARKER.search(line) or len(header) >= header_scan_lines:
+            log.info("No START marker found in the text.")
+            body = header
+            break
+    else:
+        log.info("No START/END markers found in the text.")
+        yield from header
+        return
+
+    for line in itertools.chain(body, lines):
+        end = END_MARKER.search(line)
+        if end:
+            yield line[:end.start()]
+            return
+        yield line
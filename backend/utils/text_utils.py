@@ -0,0 +1,16 @@
+import unicodedata
+from typing import Optional
+
+def normalize_text(value: Optional[str]) -> str:
+    """
+    Normalizes text so that trivially different inputs share a cache or hash key.
+
+    Args:
+        value (Optional[str]): Raw text (may be None).
+
+    Returns:
+        str: NFC-normalized text with whitespace collapsed to single spaces.
+    """
+    if not value:
+        return ""
+    return " ".join(unicodedata.normalize("NFC", value).split())
@@ -0,0 +1,46 @@
+import logging
+from functools import lru_cache
+from typing import Optional
+
+from backend.config import OPENAI_MODEL
+
+try:
+    import tiktoken
+except ImportError:  # tiktoken ships with llama-index, but keep the estimate as a fallback
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# rough characters-per-token ratio used when tiktoken is unavailable
+CHARS_PER_TOKEN = 4
+
+@lru_cache(maxsize=8)
+def _encoding(model: str):
+    # tiktoken downloads its BPE files on first use; offline (or firewalled) hosts get the
+    # length estimate instead, and the failure is cached so it is not retried on every call
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning(f"No tokenizer for {model} ({e!r}); estimating {CHARS_PER_TOKEN} characters per token")
+        return None
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """
+    Counts the tokens in a piece of text for a given model.
+
+    Args:
+        text (str): Text to measure.
+        model (Optional[str]): Model name used to pick the tokenizer. Defaults to OPENAI_MODEL.
+
+    Returns:
+        int: Number of tokens, or an estimate based on length if no tokenizer is available.
+    """
+    if not text:
+        return 0
+    encoding = _encoding(model or OPENAI_MODEL) if tiktoken is not None else None
+    if encoding is None:
+        return max(1, len(text) // CHARS_PER_TOKEN)
+    return len(encoding.encode(text))
@@ -2,6 +2,9 @@ import React, { useState, useEffect, useRef } from "react";
 import { useParams, useNavigate } from "react-router-dom";
 import "../styles/BookViewer.css";
 
+const PREFETCH_AHEAD = 3;
+const PREFETCH_BEHIND = 1;
+
 const BookViewer = () => {
   const { gutenberg_id } = useParams();
   const navigate = useNavigate();
@@ -17,11 +20,30 @@ const BookViewer = () => {
   const [explainError, setExplainError] = useState("");
   const explanationRef = useRef(null); // 🔹 for scroll into view
 
+  // page number -> text for pages already fetched, so page turns inside the window are instant
+  const pageCache = useRef(new Map());
+
+  useEffect(() => {
+    pageCache.current = new Map();
+  }, [gutenberg_id]);
+
   useEffect(() => {
-    const fetchChunk = async () => {
+    const cached = pageCache.current.get(page);
+    if (cached !== undefined) {
+      setChunk(cached);
+      setError("");
+    }
+
+    // refill the window once the next page is no longer prefetched
+    const lastPage = totalPages || Infinity;
+    const needsFetch =
+      cached === undefined || (page < lastPage && !pageCache.current.has(page + 1));
+    if (!needsFetch) return;
+
+    const fetchChunks = async () => {
       try {
         const res = await fetch(
-          `${import.meta.env.VITE_API_URL}/book/${gutenberg_id}/chunks?page=${page}&limit=1`,
+          `${import.meta.env.VITE_API_URL}/book/${gutenberg_id}/chunks?page=${page}&limit=1&ahead=${PREFETCH_AHEAD}&behind=${PREFETCH_BEHIND}`,
           {
             headers: { "x-api-key": import.meta.env.VITE_API_KEY },
           }
@@ -30,20 +52,22 @@ const BookViewer = () => {
         if (!res.ok) throw new Error("Failed to fetch chunk");
 
         const data = await res.json();
+        (data.chunks || []).forEach((c) => pageCache.current.set(c.page, c.text));
+
         if (!data.chunk || !data.chunk.text) {
           throw new Error("No text found in chunk");
         }
 
-        setChunk(data.chunk.text);
+        if (cached === undefined) setChunk(data.chunk.text);
         setTotalPages(data.total_pages || null);
         setError("");
       } catch (err) {
         console.error(err);
-        setError("Unable to load this page.");
+        if (cached === undefined) setError("Unable to load this page.");
       }
     };
 
-    fetchChunk();
+    fetchChunks();
   }, [gutenberg_id, page]);
 
   useEffect(() => {
@@ -79,7 +103,7 @@ const BookViewer = () => {
     setExplanation("");
 
     try {
-      const res = await fetch(`${import.meta.env.VITE_API_URL}/explain`, {
+      const res = await fetch(`${import.meta.env.VITE_API_URL}/explain/stream`, {
         method: "POST",
         headers: {
           "Content-Type": "application/json",
@@ -96,10 +120,40 @@ const BookViewer = () => {
         }),
       });
 
-      if (!res.ok) throw new Error("Explanation failed");
+      if (!res.ok || !res.body) throw new Error("Explanation failed");
+
+      // read Server-Sent Events as they arrive so the explanation renders progressively
+      const reader = res.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = "";
+      let streamed = "";
+
+      while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        const events = buffer.split("\n\n");
+        buffer = events.pop();
+        for (const rawEvent of events) {
+          const lines = rawEvent.split("\n");
+          const eventType = lines.find((l) => l.startsWith("event: "))?.slice(7) || "message";
+          const dataLine = lines.find((l) => l.startsWith("data: "));
+          if (!dataLine) continue;
+          const data = JSON.parse(dataLine.slice(6));
+
+          if (eventType === "error") throw new Error(data.detail);
+          if (eventType === "done") {
+            streamed = data.explanation;
+          } else {
+            streamed += data.delta;
+            setExplaining(false);
+          }
+          setExplanation(streamed);
+        }
+      }
 
-      const data = await res.json();
-      setExplanation(data.explanation || "No explanation returned.");
+      if (!streamed) setExplanation("No explanation returned.");
     } catch (err) {
       console.error(err);
       setExplainError("Failed to get explanation.");
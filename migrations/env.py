@@ -17,7 +17,10 @@ from backend.db.models import (
     chunk,      # noqa: F401
     ai_output,  # noqa: F401
     language_level,  # noqa: F401
-    language_mapping # noqa: F401
+    language_mapping, # noqa: F401
+    query_embedding,  # noqa: F401
+    ingestion_job,  # noqa: F401
+    chunk_embedding  # noqa: F401
 )
 
 target_metadata = Base.metadata
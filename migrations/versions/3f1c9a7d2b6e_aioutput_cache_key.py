@@ -0,0 +1,33 @@
+"""aioutput cache key
+
+Revision ID: 3f1c9a7d2b6e
+Revises: 88307ec2a34e
+Create Date: 2026-10-18 09:12:41.310522
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c9a7d2b6e'
+down_revision: Union[str, Sequence[str], None] = '88307ec2a34e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # explanations are cached per request, not per chunk
+    op.alter_column('aioutput', 'chunk_id', existing_type=sa.Integer(), nullable=True)
+    op.add_column('aioutput', sa.Column('cache_key', sa.String(length=64), nullable=True))
+    op.create_index(op.f('ix_aioutput_cache_key'), 'aioutput', ['cache_key'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_aioutput_cache_key'), table_name='aioutput')
+    op.drop_column('aioutput', 'cache_key')
+    op.execute("DELETE FROM aioutput WHERE chunk_id IS NULL")
+    op.alter_column('aioutput', 'chunk_id', existing_type=sa.Integer(), nullable=False)
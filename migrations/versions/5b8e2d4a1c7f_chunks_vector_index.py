@@ -0,0 +1,44 @@
+"""chunks vector index
+
+Revision ID: 5b8e2d4a1c7f
+Revises: 3f1c9a7d2b6e
+Create Date: 2026-10-18 11:40:05.127843
+
+"""
+import os
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '5b8e2d4a1c7f'
+down_revision: Union[str, Sequence[str], None] = '3f1c9a7d2b6e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# build parameters, e.g. PGVECTOR_INDEX_TYPE=ivfflat PGVECTOR_IVFFLAT_LISTS=200 alembic upgrade head
+INDEX_TYPE = os.getenv("PGVECTOR_INDEX_TYPE", "hnsw")
+HNSW_M = int(os.getenv("PGVECTOR_HNSW_M", "16"))
+HNSW_EF_CONSTRUCTION = int(os.getenv("PGVECTOR_HNSW_EF_CONSTRUCTION", "64"))
+IVFFLAT_LISTS = int(os.getenv("PGVECTOR_IVFFLAT_LISTS", "100"))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if INDEX_TYPE == "hnsw":
+        using = f"hnsw (embedding vector_cosine_ops) WITH (m = {HNSW_M}, ef_construction = {HNSW_EF_CONSTRUCTION})"
+    elif INDEX_TYPE == "ivfflat":
+        using = f"ivfflat (embedding vector_cosine_ops) WITH (lists = {IVFFLAT_LISTS})"
+    else:
+        raise ValueError(f"Unsupported PGVECTOR_INDEX_TYPE: {INDEX_TYPE}")
+
+    # built concurrently so ingestion and reads keep working on a large table;
+    # chunks.book_id is already covered by the leading column of uq_book_page
+    with op.get_context().autocommit_block():
+        op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_chunks_embedding_ann ON chunks USING {using}")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_chunks_embedding_ann")
@@ -0,0 +1,37 @@
+"""query embeddings cache
+
+Revision ID: 7d2f4c8e9a13
+Revises: 5b8e2d4a1c7f
+Create Date: 2026-10-18 13:05:52.441907
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2f4c8e9a13'
+down_revision: Union[str, Sequence[str], None] = '5b8e2d4a1c7f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('query_embeddings',
+    sa.Column('cache_key', sa.String(length=64), nullable=False),
+    sa.Column('model', sa.String(), nullable=False),
+    sa.Column('query', sa.Text(), nullable=False),
+    sa.Column('embedding', Vector(1536), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('cache_key')
+    )
+    op.create_index(op.f('ix_query_embeddings_created_at'), 'query_embeddings', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_query_embeddings_created_at'), table_name='query_embeddings')
+    op.drop_table('query_embeddings')
@@ -0,0 +1,27 @@
+"""books content version
+
+Revision ID: 9c4e1b7f2a60
+Revises: 7d2f4c8e9a13
+Create Date: 2026-10-18 14:21:37.118540
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '9c4e1b7f2a60'
+down_revision: Union[str, Sequence[str], None] = '7d2f4c8e9a13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('books', sa.Column('content_version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('books', 'content_version')
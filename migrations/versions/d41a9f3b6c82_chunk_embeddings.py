@@ -0,0 +1,38 @@
+"""chunk embeddings store
+
+Revision ID: d41a9f3b6c82
+Revises: b27d5e8c4f19
+Create Date: 2026-10-18 15:48:26.905113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41a9f3b6c82'
+down_revision: Union[str, Sequence[str], None] = 'b27d5e8c4f19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('chunk_embeddings',
+    sa.Column('content_hash', sa.String(length=64), nullable=False),
+    sa.Column('model', sa.String(), nullable=False),
+    sa.Column('embedding', Vector(1536), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('content_hash')
+    )
+    op.add_column('chunks', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.create_index(op.f('ix_chunks_content_hash'), 'chunks', ['content_hash'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_chunks_content_hash'), table_name='chunks')
+    op.drop_column('chunks', 'content_hash')
+    op.drop_table('chunk_embeddings')
@@ -0,0 +1,30 @@
+"""drop unused chunks metadata book_id index
+
+Revision ID: e5c2a8f17b34
+Revises: d41a9f3b6c82
+Create Date: 2026-10-18 18:02:41.318904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5c2a8f17b34'
+down_revision: Union[str, Sequence[str], None] = 'd41a9f3b6c82'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # retrieval filters on the chunks.book_id column, so the metadata expression index is never used;
+    # 5b8e2d4a1c7f no longer creates it, this drops it from databases that already ran that revision
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_chunks_metadata_book_id")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # nothing to restore: the index was dead weight
+    pass
@@ -1,29 +1,36 @@
 
 import argparse
 import requests
-import re
-import time
 from tenacity import retry, wait_random_exponential, stop_after_attempt
 from openai import OpenAI
 from tqdm import tqdm
-from sqlalchemy.exc import IntegrityError
 import logging
 import json
-from psycopg2.extras import Json
+import time
+from typing import Iterable, Optional
+
+from sqlalchemy import text
 
 from backend.db import db
+from backend.db.db import managed_connection
+from backend.utils.catalog_cache import notify_catalog_changed
 from backend import config
 from backend.utils.logging_config import setup_logger
+from backend.utils.embedding_pipeline import EmbeddingPipeline, RateLimitBudget
+from backend.utils.embedding_store import EmbeddingStore
+from backend.utils.chunker import CHUNKER_VERSION, TextChunk, chunk_text
+from backend.utils import ingestion_jobs
+from backend.utils.text_source import iter_text_lines, strip_boilerplate
 
 logging.getLogger("httpx").setLevel(logging.WARNING) # so that the command line doesn't show these two logs
 logging.getLogger("httpcore").setLevel(logging.WARNING)
 
-CHUNK_SIZE = 100 
 RETRY_ATTEMPTS = 3 
-client = OpenAI(api_key=config.OPENAI_API_KEY)
+client = OpenAI(api_key=config.OPENAI_API_KEY, base_url=config.OPENAI_BASE_URL)
 embeddings_model = config.OPENAI_EMBEDDINGS
 timeout = 15
 retry_settings = dict(wait=wait_random_exponential(min=1, max=4), stop=stop_after_attempt(RETRY_ATTEMPTS))
+logger = logging.getLogger(__name__)  # main() swaps in a logger that also writes to a per-book file
 
 @retry(**retry_settings)
 def fetch_metadata_from_gutendex(book_id: int) -> dict:
@@ -85,93 +92,26 @@ def fetch_metadata_from_gutendex(book_id: int) -> dict:
         "encoding": encoding
     }
 
-@retry(**retry_settings)
-def download_text(url: str, encoding: str = "utf-8") -> str:
-    """
-    Downloads the raw text of the book from the given URL.
-
-    Args:
-        url (str): URL pointing to the plain text file.
-        encoding (str, optional): Text encoding format (default is "utf-8").
-
-    Raises:
-        Exception: If the text cannot be downloaded (non-200 status code).
-
-    Returns:
-        str: Raw book text as a single string.
-    """
-    response = requests.get(
-        url, 
-        headers={"User-Agent": "Mozilla/5.0 (compatible; MyBookApp/0.1)"}, 
-        timeout=timeout
-        )
-    if response.status_code != 200:
-        raise Exception("Failed to download book text.")
-    response.encoding = encoding
-    return response.text
-
-def clean_text(raw_text: str) -> str:
-    """
-    Removes boilerplate and license content from the raw book text using START/END markers.
-
-    Args:
-        raw_text (str): Raw book text including headers and footers.
-
-    Returns:
-        str: Cleaned book content with only the actual story/text.
-    """
-    start = re.search(r"\*\*\*\s*START OF.*?\*\*\*", raw_text, re.IGNORECASE) # many text files tend to say when the book text actually starts, noted by "START OF..."
-    end = re.search(r"\*\*\*\s*END OF.*?\*\*\*", raw_text, re.IGNORECASE) # many text files tend to say when the book text ends, noted by "END OF..."
-
-    if start and end:
-        return raw_text[start.end():end.start()].strip()
-    elif start:
-        return raw_text[start.end():].strip()
-    elif end:
-        return raw_text[:end.start()].strip()
-    else:
-        print("No START/END markers found in the text.")
-        return raw_text.strip()
-
-def split_into_chunks(cleaned: str, max_words=CHUNK_SIZE):
-    """
-    Splits the cleaned book text into chunks of up to `max_words` words each.
-
-    Args:
-        cleaned (str): Cleaned book text (without headers/footers).
-        max_words (int, optional): Maximum number of words per chunk (default is CHUNK_SIZE).
-
-    Returns:
-        list[str]: List of text chunks.
-    """
-    words = cleaned.split()
-    return [' '.join(words[i:i + max_words]).strip() for i in range(0, len(words), max_words)]
-
-@retry(**retry_settings)
-def get_embedding(text: str) -> list[float]:
-    """
-    Computes the embedding vector for a given chunk of text using the OpenAI API.
-
-    Args:
-        text (str): A single chunk of book text.
-
-    Returns:
-        list[float]: Embedding vector representing the chunk.
-    """
-    response = client.embeddings.create(
-        model=embeddings_model,
-        input=text
-    )
-    return response.data[0].embedding
-
-def insert_book_and_chunks(book_info: dict, chunks: list[str], dry_run: bool = False):
+def insert_book_and_chunks(book_info: dict, chunks: Iterable[TextChunk], dry_run: bool = False,
+                           budget: Optional[RateLimitBudget] = None, show_progress: bool = True,
+                           repair: bool = False) -> dict:
     """
     Insert book and chunks into their respective tables
 
+    Progress is checkpointed in ingestion_jobs. If the book already exists with an unfinished
+    job, only the pages that are not stored yet are embedded and inserted.
+
     Args:
         book_info (dict): Book metadata
-        chunks (list[str]): List of chunks
+        chunks (Iterable[TextChunk]): Chunks in page order, e.g. the chunk_text generator
         dry_run (bool, optional): If dry_run, the insertion won't actually happen
+        budget (RateLimitBudget, optional): Embeddings rate budget shared with other books being ingested
+        show_progress (bool, optional): Whether to draw a progress bar
+        repair (bool, optional): Also fill in missing pages of a book whose job is marked completed
+
+    Returns:
+        dict: status ("completed", "failed", "exists" or "dry_run"), chunks, inserted, resumed_from,
+        failed_pages, embedding_requests, embedding_cache_hits and embedding_requests_avoided
     """
     if not db.exists("language_levels", {"language": book_info["language"], "level": book_info["level"]}):
         raise ValueError(
@@ -179,68 +119,180 @@ def insert_book_and_chunks(book_info: dict, chunks: list[str], dry_run: bool = F
             "Seed or insert it first (e.g., scripts/seed_reference_data.py)."
         )
     existing = db.select("books", "*", {"gutenberg_id": book_info["gutenberg_id"]})
-    if existing:
+    job = ingestion_jobs.get_job(existing[0]["id"]) if existing else None
+    # a book row with no job and no chunks never got past its insert, so it is simply started again
+    untracked = bool(existing) and job is None and not db.exists("chunks", {"book_id": existing[0]["id"]})
+    if existing and job is None and not untracked and repair:
+        raise ValueError(
+            f"Book {book_info['gutenberg_id']} was ingested before jobs were tracked; its pages cannot be "
+            "matched to the current chunker. Delete the book and ingest it again."
+        )
+    finished = job is not None and job["status"] == "completed" and not repair
+    if existing and ((job is None and not untracked) or finished):
         print(f"Book with gutenberg_id={book_info['gutenberg_id']} already exists. Skipping insert.")
         logger.warning(f"Book {book_info['gutenberg_id']} already exists")
-        return
-
-    if not dry_run:
-        db.insert("books",
-            ["gutenberg_id", "title", "author", "language", "language_level", "source"],
-            [book_info["gutenberg_id"], book_info["title"], book_info["author"], book_info["language"], book_info["level"], book_info["source_url"]]
+        return {"status": "exists", "chunks": 0, "inserted": 0, "failed_pages": [], "embedding_requests": 0}
+    if job is not None and job["chunker_version"] != CHUNKER_VERSION:
+        raise ValueError(
+            f"Book {book_info['gutenberg_id']} was chunked with {job['chunker_version']}, not {CHUNKER_VERSION}; "
+            "its pages cannot be resumed. Delete the book and ingest it again."
         )
 
-    record = db.select("books", "*", {"gutenberg_id": book_info["gutenberg_id"]})
-    book_id = record[0]["id"]
-    failed_chunks = []
+    if dry_run:
+        total = sum(1 for _ in chunks)
+        logger.info(f"[Dry Run] Would embed and insert {total} chunks")
+        return {"status": "dry_run", "chunks": total, "inserted": 0, "failed_pages": [], "embedding_requests": 0}
 
-    for i, chunk_text in enumerate(tqdm(chunks, desc="Embedding chunks")):
-        try:
-            if dry_run:
-                logger.info(f"[Dry Run] Would embed and insert chunk {i}")
+    if existing:
+        book_id = existing[0]["id"]
+        job = ingestion_jobs.start_job(book_id, CHUNKER_VERSION)
+    else:
+        job = ingestion_jobs.create_book_with_job(book_info, CHUNKER_VERSION)
+        book_id = job["book_id"]
+
+    done_pages = ingestion_jobs.committed_pages(book_id) if existing else set()
+    if done_pages:
+        print(f"Resuming book {book_info['gutenberg_id']}: {len(done_pages)} pages already stored")
+        logger.info(f"Resuming book {book_info['gutenberg_id']} from page {job['last_page']} ({len(done_pages)} pages stored)")
+
+    # the pipeline handles 429s itself, so the client must not retry on its own;
+    # text already embedded for another book or an earlier run comes from the content-hash store
+    pipeline = EmbeddingPipeline(client=client.with_options(max_retries=0), model=embeddings_model, budget=budget,
+                                 store=EmbeddingStore(embeddings_model))
+    failed_pages = []
+    inserted = 0
+    produced = 0
+    pending = {}  # stream index -> (page_number, tokens), only for pages read ahead of the embedding workers
+    watermark = ingestion_jobs.PageWatermark(done_pages)
+
+    def texts():
+        nonlocal produced
+        index = 0
+        for page, chunk in enumerate(chunks):
+            produced += 1
+            if page in done_pages:
                 continue
+            pending[index] = (page, chunk.tokens)
+            index += 1
+            yield chunk.text
+
+    try:
+        # batches are retried inside the pipeline; whatever still fails is reported at the end
+        total = len(chunks) if hasattr(chunks, "__len__") else None
+        with tqdm(total=total, initial=len(done_pages), desc="Embedding chunks", disable=not show_progress) as progress:
+            for batch in pipeline.embed(texts()):
+                pages, batch_tokens = zip(*(pending.pop(i) for i in range(batch.start, batch.start + len(batch.texts))))
+                if batch.error is not None:
+                    failed_pages.extend(pages)
+                    progress.update(len(batch.texts))
+                    continue
 
-            embedding = get_embedding(chunk_text)
-            try:
                 metadata = {"book_id": book_id}
-                db.insert("chunks",
-                    ["book_id", "page_number", "text", "embedding", "metadata"],
-                    [book_id, i, chunk_text, embedding, Json(metadata)])
-            except IntegrityError:
-                logger.warning(f"Duplicate chunk skipped: book_id={book_id}, page_number={i}")
-                continue
+                rows = [
+                    (book_id, page, page_text, tokens, embedding, content_hash, metadata)
+                    for page, page_text, tokens, embedding, content_hash
+                    in zip(pages, batch.texts, batch_tokens, batch.embeddings, batch.hashes)
+                ]
+                batch_inserted = db.bulk_insert("chunks",
+                    ["book_id", "page_number", "text", "tokens", "embedding", "content_hash", "metadata"],
+                    rows, skip_duplicates=True)
+                if batch_inserted < len(rows):
+                    logger.warning(f"Skipped {len(rows) - batch_inserted} duplicate chunks in pages {pages[0]}-{pages[-1]}")
+                inserted += batch_inserted
+                ingestion_jobs.checkpoint(job["id"], watermark.add(pages))
+                progress.update(len(batch.texts))
+    except BaseException as e:
+        ingestion_jobs.fail_job(job["id"], repr(e))
+        raise
+
+    status = ingestion_jobs.finish_job(job["id"], produced, failed_pages, watermark.last_page)
+
+    # readers revalidating cached pages of this book get fresh content, and API workers reload the catalog
+    with managed_connection() as session:
+        session.execute(text("UPDATE books SET content_version = content_version + 1 WHERE id = :book_id"),
+                        {"book_id": book_id})
+        notify_catalog_changed(session, book_info["gutenberg_id"])
+        session.commit()
+
+    if failed_pages:
+        logger.warning(f"Final failed chunks: {sorted(failed_pages)}; rerun to retry them")
+    print(f"Inserted {inserted} of {produced} chunks ({pipeline.requests} embedding requests, "
+          f"{pipeline.cache_hits} chunks reused from the embedding store, {pipeline.requests_avoided} requests avoided, "
+          f"{pipeline.budget.rate_limited} rate limited)")
+    logger.info(f"Book {book_info['gutenberg_id']} inserted with {inserted} chunks (failed: {len(failed_pages)})")
+    return {
+        "status": status,
+        "chunks": produced,
+        "inserted": inserted,
+        "resumed_from": len(done_pages),
+        "failed_pages": sorted(failed_pages),
+        "embedding_requests": pipeline.requests,
+        "embedding_cache_hits": pipeline.cache_hits,
+        "embedding_requests_avoided": pipeline.requests_avoided,
+    }
 
-            if (i + 1) % 100 == 0 or (i + 1) == len(chunks):
-                print(f"Progress: Inserted {i + 1}/{len(chunks)} chunks")
+def embed_missing_embeddings(book_id: int, budget: Optional[RateLimitBudget] = None) -> int:
+    """
+    Computes embeddings for stored chunks of a book that have none, keeping their text and page.
 
-        except Exception as e:
-            logger.error(f"Embedding failed for chunk {i}: {e}")
-            failed_chunks.append((i, chunk_text))
+    Args:
+        book_id (int): Internal book id
+        budget (RateLimitBudget, optional): Embeddings rate budget shared with other books being repaired
 
-        time.sleep(0.5)
+    Returns:
+        int: Number of chunks updated
+    """
+    rows = db.raw("SELECT id, text FROM chunks WHERE book_id = :book_id AND embedding IS NULL ORDER BY page_number",
+                  {"book_id": book_id})
+    if not rows:
+        return 0
+    pipeline = EmbeddingPipeline(client=client.with_options(max_retries=0), model=embeddings_model, budget=budget,
+                                 store=EmbeddingStore(embeddings_model))
+    updated = 0
+    for batch in pipeline.embed([row["text"] for row in rows]):
+        if batch.error is not None:
+            continue
+        ids = [row["id"] for row in rows[batch.start:batch.start + len(batch.texts)]]
+        updated += db.bulk_update("chunks", "id", ["embedding", "content_hash"], zip(ids, batch.embeddings, batch.hashes))
+    return updated
+
+def ingest_book(gutenberg_id: int, level: str, language: Optional[str] = None, text_source: Optional[str] = None,
+                dry_run: bool = False, budget: Optional[RateLimitBudget] = None, metadata: Optional[dict] = None,
+                show_progress: bool = True, repair: bool = False) -> dict:
+    """
+    Fetches, streams, chunks, embeds and inserts one book without prompting.
 
-    for attempt in range(1, 4):
-        if not failed_chunks:
-            break
-        logger.info(f"Retrying {len(failed_chunks)} failed chunks: Attempt {attempt}")
-        new_failed = []
-        for i, chunk_text in failed_chunks:
-            try:
-                embedding = get_embedding(chunk_text)
-                metadata = {"book_id": book_id}
-                db.insert("chunks",
-                    ["book_id", "page_number", "text", "embedding", "metadata"],
-                    [book_id, i, chunk_text, embedding, Json(metadata)])
-            except Exception as e:
-                logger.error(f"Retry {attempt} failed for chunk {i}: {e}")
-                new_failed.append((i, chunk_text))
-            time.sleep(0.5)
-        failed_chunks = new_failed
+    Args:
+        gutenberg_id (int): Gutenberg book ID
+        level (str): Language level (e.g. A1, A2)
+        language (str, optional): Override for the language code reported by Gutendex
+        text_source (str, optional): URL or local file to read instead of Gutenberg's text URL
+        dry_run (bool, optional): If dry_run, the insertion won't actually happen
+        budget (RateLimitBudget, optional): Embeddings rate budget shared with other books being ingested
+        metadata (dict, optional): Gutendex metadata if it was already fetched
+        show_progress (bool, optional): Whether to draw a progress bar
+        repair (bool, optional): Fill in missing pages even if the book's job is marked completed
 
-    if failed_chunks:
-        logger.warning(f"Final failed chunks: {[i for i, _ in failed_chunks]}")
-    print(f"Inserted {len(chunks) - len(failed_chunks)} of {len(chunks)} chunks")
-    logger.info(f"Book {book_info['gutenberg_id']} inserted with {len(chunks) - len(failed_chunks)} chunks (failed: {len(failed_chunks)})")
+    Returns:
+        dict: The insert_book_and_chunks stats plus gutenberg_id, title and seconds
+    """
+    start = time.perf_counter()
+    metadata = metadata or fetch_metadata_from_gutendex(gutenberg_id)
+    book_info = {
+        "gutenberg_id": gutenberg_id,
+        "title": metadata["title"],
+        "author": metadata["author"],
+        "language": language or metadata["language"],
+        "level": level,
+        "source_url": metadata["source_url"]
+    }
+
+    # download, boilerplate stripping and chunking all stream, so the full text is never held in memory
+    cleaned = strip_boilerplate(iter_text_lines(text_source or metadata["text_url"], metadata["encoding"], timeout=timeout))
+    stats = insert_book_and_chunks(book_info, chunk_text(cleaned), dry_run=dry_run, budget=budget,
+                                   show_progress=show_progress, repair=repair)
+    return {"gutenberg_id": gutenberg_id, "title": metadata["title"], **stats,
+            "seconds": round(time.perf_counter() - start, 2)}
 
 
 def main():
@@ -249,6 +301,7 @@ def main():
     parser.add_argument("--level", type=str, required=True, help="Language level (e.g. A1, A2)")
     parser.add_argument("--language", type=str, choices=["es", "en", "pt"], help="Override language code in Gutenberg")
     parser.add_argument("--dry-run", action="store_true", help="Run script without inserting into database")
+    parser.add_argument("--text-source", type=str, help="Read the text from this URL or local file instead of Gutenberg's")
     args = parser.parse_args()
     
     global logger
@@ -264,14 +317,21 @@ def main():
 
     print(f"{metadata['title']} by {metadata['author']}")
     print(f"Gutendex language: {metadata['language']}  |  Using: {chosen_language}")
-    print(f"Downloading from: {metadata['text_url']}")
-    raw = download_text(metadata["text_url"], metadata["encoding"])
-
-    cleaned = clean_text(raw)
+    text_source = args.text_source or metadata["text_url"]
+    print(f"Downloading from: {text_source}")
+
+    # the preview only reads the start of the text; the stream is closed before the prompt
+    preview = ""
+    raw_lines = iter_text_lines(text_source, metadata["encoding"], timeout=timeout)
+    for line in strip_boilerplate(raw_lines):
+        preview += line + "\n"
+        if len(preview.strip()) >= 300:
+            break
+    raw_lines.close()
 
     print("Showing first 300 characters:")
     print("─" * 60)
-    print(cleaned[:300])
+    print(preview.strip()[:300])
     print("─" * 60)
 
     confirm = input("Do you want to insert this book into the database? (y/n): ").strip().lower()
@@ -279,17 +339,8 @@ def main():
         print("Cancelled.")
         return
 
-    chunks = split_into_chunks(cleaned)
-    book_info = {
-        "gutenberg_id": args.id,
-        "title": metadata["title"],
-        "author": metadata["author"],
-        "language": chosen_language,
-        "level": args.level,
-        "source_url": metadata["source_url"]
-    }
-
-    insert_book_and_chunks(book_info, chunks, dry_run=args.dry_run)
+    ingest_book(args.id, args.level, language=chosen_language, text_source=text_source,
+                dry_run=args.dry_run, metadata=metadata)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,176 @@
+# bulk version of add_book.py for onboarding a whole catalog: no prompts, several books at once
+# every book shares one embeddings rate budget and the process's DB pool
+# usage: PYTHONPATH=. python scripts/add_books.py --file books.txt --workers 4
+#        PYTHONPATH=. python scripts/add_books.py --books 2000:B1 15532:A2:es --report report.json
+#        PYTHONPATH=. python scripts/add_books.py --repair
+# the file has one "<gutenberg_id> <level> [language]" per line, # starts a comment
+# --repair finds partially ingested books (unfinished jobs, missing pages, missing embeddings) and completes them
+import argparse
+import json
+import logging
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from backend import config
+from backend.utils.embedding_pipeline import RateLimitBudget
+from backend.utils.logging_config import setup_logger
+from backend.utils.ingestion_jobs import find_partial_books
+from scripts.add_book import embed_missing_embeddings, ingest_book
+
+logger = logging.getLogger(__name__)
+
+def parse_book_spec(spec: str) -> dict:
+    """
+    Parses "<gutenberg_id> <level> [language]" (space or colon separated).
+
+    Args:
+        spec (str): One book specification.
+
+    Returns:
+        dict: gutenberg_id, level and language (None if not overridden).
+    """
+    parts = spec.replace(":", " ").split()
+    if len(parts) not in (2, 3):
+        raise ValueError(f"Expected '<gutenberg_id> <level> [language]', got {spec!r}")
+    return {"gutenberg_id": int(parts[0]), "level": parts[1], "language": parts[2] if len(parts) == 3 else None}
+
+def read_book_specs(path: str) -> list[dict]:
+    specs = []
+    with open(path) as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if line:
+                specs.append(parse_book_spec(line))
+    return specs
+
+def repair_book(partial: dict, budget: RateLimitBudget, dry_run: bool = False) -> dict:
+    """
+    Completes one partially ingested book from find_partial_books.
+
+    Missing pages are resumed from the book's ingestion job (a book with no job and no chunks is
+    ingested from the start); chunks stored without an embedding are embedded in place.
+
+    Args:
+        partial (dict): Row from find_partial_books.
+        budget (RateLimitBudget): Embeddings rate budget shared by all books.
+        dry_run (bool, optional): If dry_run, only report what would be repaired.
+
+    Returns:
+        dict: Report in the same shape as ingest_book's, plus embedded (chunks given an embedding).
+    """
+    report = {"gutenberg_id": partial["gutenberg_id"], "status": "completed", "inserted": 0, "embedded": 0}
+    if partial["missing_pages"] or not partial["chunks"] or (partial["status"] not in (None, "completed")):
+        report = {**report, **ingest_book(partial["gutenberg_id"], partial["level"], language=partial["language"],
+                                          dry_run=dry_run, budget=budget, show_progress=False, repair=True)}
+    if partial["unembedded"] and not dry_run:
+        report["embedded"] = embed_missing_embeddings(partial["book_id"], budget=budget)
+    return report
+
+def ingest_all(specs: list[dict], workers: int, budget: RateLimitBudget, dry_run: bool = False,
+               repair: bool = False) -> list[dict]:
+    """
+    Ingests books concurrently; a failing book is reported and does not stop the others.
+
+    Args:
+        specs (list[dict]): Books from parse_book_spec, or rows from find_partial_books when repairing.
+        workers (int): Books processed at the same time.
+        budget (RateLimitBudget): Embeddings rate budget shared by all books.
+        dry_run (bool, optional): If dry_run, nothing is inserted.
+        repair (bool, optional): Complete partially ingested books instead of adding new ones.
+
+    Returns:
+        list[dict]: One report per book, in the order given.
+    """
+    reports = [None] * len(specs)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(repair_book, spec, budget, dry_run=dry_run) if repair else
+            executor.submit(ingest_book, spec["gutenberg_id"], spec["level"], language=spec["language"],
+                            dry_run=dry_run, budget=budget, show_progress=False): i
+            for i, spec in enumerate(specs)
+        }
+        done = 0
+        for future in as_completed(futures):
+            i = futures[future]
+            spec = specs[i]
+            try:
+                report = future.result()
+            except Exception as e:
+                logger.error(f"Book {spec['gutenberg_id']} failed: {e}")
+                report = {"gutenberg_id": spec["gutenberg_id"], "status": "error", "error": str(e)}
+            reports[i] = report
+            done += 1
+            logger.info(f"[{done}/{len(specs)}] Book {spec['gutenberg_id']}: {report['status']}")
+    return reports
+
+def print_summary(reports: list[dict], budget: RateLimitBudget):
+    print(f"{'gutenberg_id':>12}  {'status':<9} {'chunks':>7} {'failed':>6} {'reused':>7} {'avoided':>7} "
+          f"{'seconds':>8} {'chunks/s':>9}  title")
+    for r in reports:
+        seconds = r.get("seconds") or 0
+        rate = round(r.get("inserted", 0) / seconds, 1) if seconds else 0
+        print(f"{r['gutenberg_id']:>12}  {r['status']:<9} {r.get('chunks', 0):>7} {len(r.get('failed_pages', [])):>6} "
+              f"{r.get('embedding_cache_hits', 0):>7} {r.get('embedding_requests_avoided', 0):>7} "
+              f"{seconds:>8} {rate:>9}  {r.get('title') or r.get('error', '')}")
+
+    by_status = {}
+    for r in reports:
+        by_status[r["status"]] = by_status.get(r["status"], 0) + 1
+    total_chunks = sum(r.get("inserted", 0) for r in reports)
+    reused = sum(r.get("embedding_cache_hits", 0) for r in reports)
+    avoided = sum(r.get("embedding_requests_avoided", 0) for r in reports)
+    print(f"\n{len(reports)} books: {by_status}; {total_chunks} chunks inserted; {reused} embeddings reused, "
+          f"{avoided} embedding requests avoided; {budget.rate_limited} rate-limited embedding requests")
+
+def main():
+    parser = argparse.ArgumentParser(description="Add many Project Gutenberg books concurrently")
+    parser.add_argument("--file", type=str, help="File with one '<gutenberg_id> <level> [language]' per line")
+    parser.add_argument("--books", nargs="*", default=[], help="Books as <gutenberg_id>:<level>[:<language>]")
+    parser.add_argument("--workers", type=int, default=4, help="Books ingested at the same time")
+    parser.add_argument("--max-concurrency", type=int, default=config.EMBEDDING_MAX_CONCURRENCY,
+                        help="Embedding requests in flight across all books")
+    parser.add_argument("--report", type=str, help="Write the per-book report to this JSON file")
+    parser.add_argument("--dry-run", action="store_true", help="Chunk the books without inserting into database")
+    parser.add_argument("--repair", action="store_true", help="Complete every partially ingested book")
+    args = parser.parse_args()
+
+    global logger
+    logger = setup_logger(__name__, log_file="logs/log_add_books.log")
+
+    if args.repair:
+        specs = find_partial_books()
+        for partial in specs:
+            print(f"Partial book {partial['gutenberg_id']}: job {partial['status']}, {partial['chunks']}/{partial['expected']} "
+                  f"pages, {partial['unembedded']} without embedding")
+        if not specs:
+            print("No partially ingested books found.")
+            return
+    else:
+        specs = read_book_specs(args.file) if args.file else []
+        specs += [parse_book_spec(spec) for spec in args.books]
+        if not specs:
+            parser.error("no books given, use --file, --books or --repair")
+
+    # each book holds a pooled connection on its main thread and one per embedding thread
+    # (the embedding store is read and written from the pipeline workers)
+    pool_capacity = config.DB_POOL_SIZE + config.DB_MAX_OVERFLOW
+    per_book = 1 + args.max_concurrency
+    max_workers = max(1, pool_capacity // per_book)
+    if args.workers > max_workers:
+        logger.warning(f"{args.workers} workers x {per_book} connections exceed the DB pool ({pool_capacity}); "
+                       f"using {max_workers} workers")
+        args.workers = max_workers
+
+    budget = RateLimitBudget(max_concurrency=args.max_concurrency)
+    reports = ingest_all(specs, args.workers, budget, dry_run=args.dry_run, repair=args.repair)
+    print_summary(reports, budget)
+
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(reports, f, indent=2)
+
+    if any(r["status"] in ("error", "failed") or r.get("failed_pages") for r in reports):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
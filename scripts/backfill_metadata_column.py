@@ -1,22 +1,46 @@
-# i created this script because i forgot to add metadata to the chunks 
+# i created this script because i forgot to add metadata to the chunks
 # i modified my add_book.py script so that will add the metadata - so i don't need to run this script again
-from backend.db.db import select, update
-from tqdm import tqdm
-from psycopg2.extras import Json
+# the metadata is now computed by postgres in keyset slices (backend/db/backfill.py), one commit per slice,
+# so no rows come back to python and an interrupted run picks up where it stopped.
+# usage: PYTHONPATH=. python scripts/backfill_metadata_column.py [--dry-run] [--batch-size 5000] [--sleep 0.1]
+import argparse
 
-def backfill_metadata_column():
-    rows = select("chunks", columns="id, book_id", condition={})  # get all rows
+from backend.config import BACKFILL_BATCH_SIZE, BACKFILL_SLEEP
+from backend.db.backfill import run_backfill
 
-    print(f"Updating metadata for {len(rows)} chunks...")
+SET_METADATA = "metadata = jsonb_build_object('book_id', book_id)"
+# rows that already have the right metadata are skipped, so re-running is cheap
+NEEDS_METADATA = "metadata IS DISTINCT FROM jsonb_build_object('book_id', book_id)"
 
-    for row in tqdm(rows, desc="Backfilling metadata"):
-        chunk_id = row["id"]
-        book_id = row["book_id"]
+def backfill_metadata_column(batch_size: int = BACKFILL_BATCH_SIZE, sleep: float = BACKFILL_SLEEP,
+                             checkpoint_path: str = None, start_after: int = None, dry_run: bool = False):
+    if dry_run:
+        result = run_backfill("chunks", SET_METADATA, where=NEEDS_METADATA, batch_size=batch_size, sleep=sleep,
+                              checkpoint_path=checkpoint_path, start_after=start_after, dry_run=True)
+        print(f"{result.remaining} chunks need metadata; one slice of {batch_size} took {result.seconds:.2f}s, "
+              f"estimated {result.estimated_seconds:.0f}s remaining")
+        return result
 
-        metadata = {"book_id": book_id}
-        update("chunks", data={"metadata": Json(metadata)}, update_condition={"id": chunk_id})
+    def report(progress):
+        print(f"slice {progress.slices}: {progress.updated} chunks updated, last id {progress.last_key}, "
+              f"{progress.seconds:.1f}s")
 
-    print("Metadata column successfully backfilled.")
+    result = run_backfill("chunks", SET_METADATA, where=NEEDS_METADATA, batch_size=batch_size, sleep=sleep,
+                          checkpoint_path=checkpoint_path, start_after=start_after, on_slice=report)
+    print(f"Metadata column successfully backfilled ({result.updated} chunks).")
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill chunks.metadata from chunks.book_id")
+    parser.add_argument("--batch-size", type=int, default=BACKFILL_BATCH_SIZE, help="Rows per committed slice")
+    parser.add_argument("--sleep", type=float, default=BACKFILL_SLEEP, help="Seconds to pause between slices")
+    parser.add_argument("--checkpoint", default=".backfill_metadata_column.json",
+                        help="File recording the last committed id, used to resume")
+    parser.add_argument("--start-after", type=int, help="Only update chunks with a larger id (ignores the checkpoint)")
+    parser.add_argument("--dry-run", action="store_true", help="Estimate the remaining time without changing anything")
+    args = parser.parse_args()
+
+    backfill_metadata_column(args.batch_size, args.sleep, args.checkpoint, args.start_after, args.dry_run)
 
 if __name__ == "__main__":
-    backfill_metadata_column()
+    main()
@@ -0,0 +1,99 @@
+# benchmark for ingestion chunking: the old split-on-words splitter vs the streaming
+# sentence-aware chunker, on a synthetic multi-megabyte book
+# each variant runs in its own process so peak RSS is measured separately
+# usage: PYTHONPATH=. python scripts/bench_chunker.py --megabytes 20
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from backend.utils.chunker import chunk_text
+
+WORDS = ["el", "hidalgo", "caballero", "de", "la", "Mancha", "vivía", "con", "una", "ama", "que", "pasaba",
+         "los", "cuarenta", "y", "un", "mozo", "campo", "plaza", "rocín", "flaco", "galgo", "corredor"]
+
+def write_synthetic_book(path: str, megabytes: float):
+    rng = random.Random(0)
+    target = int(megabytes * 1024 * 1024)
+    written = 0
+    with open(path, "w", encoding="utf-8") as f:
+        while written < target:
+            sentences = []
+            for _ in range(rng.randint(2, 8)):
+                words = [rng.choice(WORDS) for _ in range(rng.randint(5, 30))]
+                sentences.append(" ".join(words).capitalize() + rng.choice([".", ".", "?", "!"]))
+            paragraph = " ".join(sentences)
+            # wrap lines at ~70 characters like Gutenberg plain text
+            lines, line = [], ""
+            for word in paragraph.split():
+                if len(line) + len(word) > 70:
+                    lines.append(line)
+                    line = ""
+                line = f"{line} {word}".strip()
+            lines.append(line)
+            block = "\n".join(lines) + "\n\n"
+            f.write(block)
+            written += len(block.encode("utf-8"))
+
+def split_into_chunks(cleaned: str, max_words: int = 100):
+    # the splitter scripts/add_book.py used before chunk_text
+    words = cleaned.split()
+    return [' '.join(words[i:i + max_words]).strip() for i in range(0, len(words), max_words)]
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def run_variant(variant: str, path: str) -> dict:
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    if variant == "word splitter":
+        with open(path, encoding="utf-8") as f:
+            chunks = split_into_chunks(f.read())
+        count, tokens = len(chunks), None
+    else:
+        count = tokens = 0
+        with open(path, encoding="utf-8") as f:
+            for chunk in chunk_text(f):
+                count += 1
+                tokens += chunk.tokens
+    elapsed = time.perf_counter() - start
+    size_mb = os.path.getsize(path) / (1024 * 1024)
+    return {
+        "chunks": count,
+        "avg_tokens": round(tokens / count, 1) if tokens else None,
+        "mb_per_s": round(size_mb / elapsed, 2),
+        "seconds": round(elapsed, 2),
+        "peak_rss_delta_mb": round(peak_rss_mb() - baseline, 1),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the chunkers on a synthetic book")
+    parser.add_argument("--megabytes", type=float, default=20.0, help="Size of the synthetic book")
+    parser.add_argument("--variant", type=str, help=argparse.SUPPRESS)
+    parser.add_argument("--path", type=str, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variant:
+        print(json.dumps(run_variant(args.variant, args.path)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "book.txt")
+        write_synthetic_book(path, args.megabytes)
+        print(f"synthetic book: {os.path.getsize(path) / (1024 * 1024):.1f} MB")
+        for variant in ["word splitter", "chunk_text (streaming)"]:
+            output = subprocess.run(
+                [sys.executable, __file__, "--variant", variant, "--path", path],
+                capture_output=True, text=True, check=True,
+            ).stdout
+            print(f"{variant:>24}: {output.strip()}")
+
+if __name__ == "__main__":
+    main()
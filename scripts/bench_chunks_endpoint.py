@@ -0,0 +1,113 @@
+# load test for /book/{gutenberg_id}/chunks: sustained requests/sec of the old sync
+# psycopg2 handler (runs in starlette's threadpool) vs the async asyncpg handler
+# usage: PYTHONPATH=. python scripts/bench_chunks_endpoint.py --concurrency 64 --duration 10
+#        PYTHONPATH=. python scripts/bench_chunks_endpoint.py --url http://localhost:8000 --gutenberg-id 2000
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+import httpx
+from fastapi import FastAPI, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from backend.config import PAGEPAL_API_KEY
+from backend.db import db
+from backend.routers import chunks
+from scripts.bench_page_fetch import BENCH_GUTENBERG_ID, create_synthetic_book, drop_synthetic_book
+
+def build_sync_app() -> FastAPI:
+    # the pre-async handler: sync def + sync helpers, same queries as the async path
+    app = FastAPI()
+    book_meta = {}
+
+    @app.get("/book/{gutenberg_id}/chunks")
+    def get_book_chunk(gutenberg_id: int, page: int = Query(1, ge=1), session: Session = Depends(db.get_session)):
+        if gutenberg_id not in book_meta:
+            rows = db.raw("""
+                SELECT b.id AS book_id, (SELECT COUNT(*) FROM chunks WHERE book_id = b.id) AS total_chunks
+                FROM books b WHERE b.gutenberg_id = :gutenberg_id
+            """, {"gutenberg_id": gutenberg_id}, session=session)
+            if not rows:
+                raise HTTPException(status_code=404, detail="Page out of range or book not found")
+            book_meta[gutenberg_id] = (rows[0]["book_id"], rows[0]["total_chunks"])
+        book_id, total_chunks = book_meta[gutenberg_id]
+        if page > total_chunks:
+            raise HTTPException(status_code=404, detail="Page out of range or book not found")
+        chunk = db.raw("""
+            SELECT id AS chunk_id, text FROM chunks
+            WHERE book_id = :book_id AND page_number >= :start AND page_number < :end
+            ORDER BY page_number
+        """, {"book_id": book_id, "start": page - 1, "end": page}, session=session)
+        return {"gutenberg_id": gutenberg_id, "page": page, "total_pages": total_chunks, "chunk": chunk[0] if chunk else None}
+
+    return app
+
+def build_async_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(chunks.router)
+    return app
+
+async def run_load(client: httpx.AsyncClient, gutenberg_id: int, max_page: int, concurrency: int, duration: float) -> dict:
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            page = random.randint(1, max_page)
+            start = time.perf_counter()
+            response = await client.get(f"/book/{gutenberg_id}/chunks", params={"page": page})
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code != 200:
+                errors += 1
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "rps": round(len(latencies) / duration, 1),
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1], 2),
+        "errors": errors,
+    }
+
+async def run_benchmark(args):
+    headers = {"x-api-key": PAGEPAL_API_KEY or ""}
+    if args.url:
+        targets = {"server": httpx.AsyncClient(base_url=args.url, headers=headers)}
+    else:
+        targets = {
+            "sync (threadpool)": httpx.AsyncClient(transport=httpx.ASGITransport(app=build_sync_app()), base_url="http://bench", headers=headers),
+            "async": httpx.AsyncClient(transport=httpx.ASGITransport(app=build_async_app()), base_url="http://bench", headers=headers),
+        }
+
+    for name, client in targets.items():
+        async with client:
+            await client.get(f"/book/{args.gutenberg_id}/chunks", params={"page": 1})  # warm up
+            result = await run_load(client, args.gutenberg_id, args.max_page, args.concurrency, args.duration)
+        print(f"{name:>18}: {result}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the chunks endpoint")
+    parser.add_argument("--url", type=str, help="Base URL of a running server (default: in-process sync vs async comparison)")
+    parser.add_argument("--gutenberg-id", type=int, help="Book to read (default: a synthetic book)")
+    parser.add_argument("--max-page", type=int, default=1000, help="Highest page requested")
+    parser.add_argument("--concurrency", type=int, default=64, help="Concurrent clients")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per run")
+    args = parser.parse_args()
+
+    book_id = None
+    if args.gutenberg_id is None:
+        book_id = create_synthetic_book(args.max_page)
+        args.gutenberg_id = BENCH_GUTENBERG_ID
+    try:
+        asyncio.run(run_benchmark(args))
+    finally:
+        if book_id is not None:
+            drop_synthetic_book(book_id)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# benchmark for the numpy retrieval backend against pgvector: cold load time (from postgres and
+# from the memory-mapped .npy cache), per-query p50/p99, throughput with concurrent queries,
+# and agreement with exact pgvector search, on the synthetic corpus from bench_vector_search.
+# usage: PYTHONPATH=. python scripts/bench_numpy_search.py --books 5 --chunks 4000 --queries 200 --threads 8
+import argparse
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from backend.config import PGVECTOR_EF_SEARCH
+from backend.utils.retriever import NumpySearchEngine, search_chunks
+from scripts.bench_vector_search import BENCH_GUTENBERG_ID, EMBED_DIM, create_corpus, drop_book, percentile
+
+def time_queries(search, queries) -> tuple[list, list]:
+    results, latency = [], []
+    for book_id, query in queries:
+        start = time.perf_counter()
+        rows = search(query, book_id)
+        latency.append((time.perf_counter() - start) * 1000)
+        results.append([row["chunk_id"] for row in rows])
+    return results, latency
+
+def throughput(search, queries, threads: int) -> float:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(lambda item: search(item[1], item[0]), queries))
+    return len(queries) / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark in-process numpy search against pgvector")
+    parser.add_argument("--books", type=int, default=5, help="Synthetic books in the corpus")
+    parser.add_argument("--chunks", type=int, default=4000, help="Chunks per book")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per backend")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=8, help="Concurrent queries for the throughput run")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    book_vectors = create_corpus(args.books, args.chunks, rng)
+    try:
+        book_ids = list(book_vectors)
+        queries = []
+        for _ in range(args.queries):
+            book_id = book_ids[rng.integers(0, len(book_ids))]
+            base = book_vectors[book_id][rng.integers(0, args.chunks)]
+            query = base + 0.3 * rng.standard_normal(EMBED_DIM)
+            queries.append((book_id, query / np.linalg.norm(query)))
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            engine = NumpySearchEngine(cache_dir=cache_dir)
+            start = time.perf_counter()
+            for book_id in book_ids:
+                engine.matrix_for(book_id)
+            load_db = (time.perf_counter() - start) * 1000 / len(book_ids)
+
+            mmap_engine = NumpySearchEngine(cache_dir=cache_dir)
+            start = time.perf_counter()
+            for book_id in book_ids:
+                mmap_engine.matrix_for(book_id)
+            load_mmap = (time.perf_counter() - start) * 1000 / len(book_ids)
+
+            backends = {
+                "pgvector exact": lambda q, b: search_chunks(q, b, top_k=args.top_k, exact=True),
+                f"pgvector ef={PGVECTOR_EF_SEARCH}": lambda q, b: search_chunks(q, b, top_k=args.top_k),
+                "numpy": lambda q, b: engine.search(q, b, top_k=args.top_k),
+                "numpy (mmap)": lambda q, b: mmap_engine.search(q, b, top_k=args.top_k),
+            }
+
+            exact = None
+            print(f"cold load per book: {load_db:.1f} ms from postgres, {load_mmap:.1f} ms from .npy cache "
+                  f"({engine.stats()['bytes'] / len(book_ids) / 1e6:.1f} MB per book)\n")
+            print(f"{'backend':>18} {'recall@' + str(args.top_k):>10} {'p50 (ms)':>10} {'p99 (ms)':>10} "
+                  f"{f'qps x{args.threads}':>10}")
+            for name, search in backends.items():
+                results, latency = time_queries(search, queries)
+                if exact is None:
+                    exact = results
+                hits = sum(len(set(got) & set(want)) for got, want in zip(results, exact))
+                recall = hits / (len(queries) * args.top_k)
+                qps = throughput(search, queries, args.threads)
+                print(f"{name:>18} {recall:>10.3f} {percentile(latency, 50):>10.2f} {percentile(latency, 99):>10.2f} "
+                      f"{qps:>10.0f}")
+    finally:
+        for b in range(args.books):
+            drop_book(BENCH_GUTENBERG_ID + b)
+
+if __name__ == "__main__":
+    main()
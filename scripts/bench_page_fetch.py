@@ -0,0 +1,91 @@
+# benchmark for the reader's page fetch: the old COUNT + LIMIT/OFFSET path vs the
+# (book_id, page_number) range seek used by get_chunk_by_page
+# usage: PYTHONPATH=. python scripts/bench_page_fetch.py --chunks 10000
+import argparse
+import asyncio
+import statistics
+import time
+
+from sqlalchemy import text
+
+from backend.db import db
+from backend.db.db import managed_connection
+from backend.utils.chunks_utils import get_chunk_by_page, invalidate_book_meta
+
+BENCH_GUTENBERG_ID = 99999990
+PAGES = [1, 10, 100, 1000, 5000, 10000]
+
+def create_synthetic_book(num_chunks: int) -> int:
+    db.delete("books", {"gutenberg_id": BENCH_GUTENBERG_ID})
+    db.insert("books", ["gutenberg_id", "title", "author", "language", "language_level", "source"], [
+        BENCH_GUTENBERG_ID, "Benchmark Book", "Benchmark", "es", "A1", "https://example.com"
+    ])
+    book_id = db.select("books", "id", {"gutenberg_id": BENCH_GUTENBERG_ID})[0]["id"]
+
+    with managed_connection() as session:
+        session.execute(text("""
+            INSERT INTO chunks (book_id, page_number, text)
+            SELECT :book_id, n, repeat('palabra ', 100)
+            FROM generate_series(0, :last) AS n
+        """), {"book_id": book_id, "last": num_chunks - 1})
+        session.execute(text("ANALYZE chunks"))
+        session.commit()
+    return book_id
+
+def drop_synthetic_book(book_id: int):
+    db.delete("chunks", {"book_id": book_id})
+    db.delete("books", {"id": book_id})
+
+def offset_page_fetch(gutenberg_id: int, page: int, limit: int = 1):
+    # the original three-round-trip implementation, kept here for comparison
+    book_id = db.raw("SELECT id FROM books WHERE gutenberg_id = :gutenberg_id", {"gutenberg_id": gutenberg_id})[0]["id"]
+    db.raw("SELECT COUNT(*) as count FROM chunks WHERE book_id = :book_id", {"book_id": book_id})
+    return db.raw("""
+        SELECT id as chunk_id, text
+        FROM chunks
+        WHERE book_id = :book_id
+        ORDER BY id
+        LIMIT :limit OFFSET :offset
+    """, {"book_id": book_id, "limit": limit, "offset": (page - 1) * limit})
+
+def time_ms(func, repeats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+async def async_time_ms(func, repeats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        await func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+async def run_benchmark(num_chunks: int, repeats: int):
+    invalidate_book_meta()
+    await get_chunk_by_page(BENCH_GUTENBERG_ID, 1)  # warm the per-book cache
+
+    print(f"{'page':>8} {'offset (ms)':>12} {'seek (ms)':>12}")
+    for page in [p for p in PAGES if p <= num_chunks]:
+        offset_ms = time_ms(lambda: offset_page_fetch(BENCH_GUTENBERG_ID, page), repeats)
+        seek_ms = await async_time_ms(lambda: get_chunk_by_page(BENCH_GUTENBERG_ID, page), repeats)
+        print(f"{page:>8} {offset_ms:>12.2f} {seek_ms:>12.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark page fetch latency by page depth")
+    parser.add_argument("--chunks", type=int, default=10000, help="Number of chunks in the synthetic book")
+    parser.add_argument("--repeats", type=int, default=50, help="Samples per page")
+    args = parser.parse_args()
+
+    book_id = create_synthetic_book(args.chunks)
+    try:
+        asyncio.run(run_benchmark(args.chunks, args.repeats))
+    finally:
+        drop_synthetic_book(book_id)
+        invalidate_book_meta()
+
+if __name__ == "__main__":
+    main()
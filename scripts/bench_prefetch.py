@@ -0,0 +1,94 @@
+# page-turn latency as the reader sees it: one request per turn (limit=1) vs a
+# prefetched window (ahead/behind) with the client-side page cache BookViewer uses
+# usage: PYTHONPATH=. python scripts/bench_prefetch.py --turns 200 --rtt-ms 40
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from backend.config import PAGEPAL_API_KEY
+from backend.routers import chunks
+from backend.utils.chunks_utils import invalidate_book_meta
+from scripts.bench_page_fetch import BENCH_GUTENBERG_ID, create_synthetic_book, drop_synthetic_book
+
+class DelayedTransport(httpx.AsyncBaseTransport):
+    # adds a fixed round trip to every request so the in-process app behaves like a remote one
+    def __init__(self, app: FastAPI, rtt: float):
+        self.inner = httpx.ASGITransport(app=app)
+        self.rtt = rtt
+
+    async def handle_async_request(self, request):
+        await asyncio.sleep(self.rtt)
+        return await self.inner.handle_async_request(request)
+
+async def read_book(client: httpx.AsyncClient, turns: int, ahead: int, behind: int, read_time: float) -> dict:
+    cache = {}
+    refill = None
+    latencies = []
+    requests = 0
+
+    async def fetch(page: int):
+        nonlocal requests
+        requests += 1
+        response = await client.get(f"/book/{BENCH_GUTENBERG_ID}/chunks",
+                                    params={"page": page, "limit": 1, "ahead": ahead, "behind": behind})
+        for chunk in response.json()["chunks"]:
+            cache[chunk["page"]] = chunk["text"]
+
+    for page in range(1, turns + 1):
+        start = time.perf_counter()
+        if page not in cache:
+            if refill is not None:
+                await refill
+            if page not in cache:
+                await fetch(page)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        # refill in the background while the reader reads, like BookViewer does
+        if ahead and page + 1 not in cache and (refill is None or refill.done()):
+            refill = asyncio.create_task(fetch(page))
+        await asyncio.sleep(read_time)
+
+    if refill is not None:
+        await refill
+    latencies.sort()
+    return {
+        "requests": requests,
+        "mean_ms": round(statistics.mean(latencies), 2),
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 2),
+    }
+
+async def run_benchmark(args):
+    app = FastAPI()
+    app.include_router(chunks.router)
+    headers = {"x-api-key": PAGEPAL_API_KEY or ""}
+    transport = DelayedTransport(app, args.rtt_ms / 1000)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as client:
+        invalidate_book_meta()
+        await client.get(f"/book/{BENCH_GUTENBERG_ID}/chunks", params={"page": 1})  # warm up
+        for name, ahead, behind in [("no prefetch", 0, 0), (f"ahead={args.ahead} behind={args.behind}", args.ahead, args.behind)]:
+            result = await read_book(client, args.turns, ahead, behind, args.read_ms / 1000)
+            print(f"{name:>22}: {result}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark page turns with and without chunk prefetch")
+    parser.add_argument("--turns", type=int, default=200, help="Pages turned in each run")
+    parser.add_argument("--ahead", type=int, default=3, help="Pages prefetched ahead")
+    parser.add_argument("--behind", type=int, default=1, help="Pages prefetched behind")
+    parser.add_argument("--rtt-ms", type=float, default=40.0, help="Simulated network round trip per request")
+    parser.add_argument("--read-ms", type=float, default=100.0, help="Time the reader spends on each page")
+    args = parser.parse_args()
+
+    book_id = create_synthetic_book(args.turns + args.ahead + 1)
+    try:
+        asyncio.run(run_benchmark(args))
+    finally:
+        drop_synthetic_book(book_id)
+
+if __name__ == "__main__":
+    main()
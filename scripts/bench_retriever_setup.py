@@ -0,0 +1,61 @@
+# microbenchmark for per-query retriever setup: rebuilding PGVectorStore + VectorStoreIndex
+# and resetting Settings on every call (the old get_vector_index) vs the process-wide
+# RetrieverService, whose only per-query setup is reaching its shared embed model.
+# only setup is timed, so no embedding calls are made.
+# usage: PYTHONPATH=. python scripts/bench_retriever_setup.py --iterations 200
+import argparse
+import statistics
+import time
+
+from llama_index.core import Settings, VectorStoreIndex, StorageContext
+from llama_index.vector_stores.postgres import PGVectorStore
+from llama_index.embeddings.openai import OpenAIEmbedding
+from llama_index.llms.openai import OpenAI
+from sqlalchemy.engine.url import make_url
+
+from backend.config import DATABASE_URL, OPENAI_EMBEDDINGS, OPENAI_MODEL
+from backend.utils.retriever import RetrieverService
+
+def rebuild_vector_index(book_id: int) -> VectorStoreIndex:
+    # the per-query setup retrieve_top_chunks used to do
+    url = make_url(DATABASE_URL)
+    vector_store = PGVectorStore.from_params(
+        database=url.database,
+        host=url.host,
+        port=url.port,
+        user=url.username,
+        password=url.password,
+        table_name="chunks",
+        embed_dim=1536
+    )
+    storage_context = StorageContext.from_defaults(vector_store=vector_store)
+    Settings.embed_model = OpenAIEmbedding(model=OPENAI_EMBEDDINGS)
+    Settings.llm = OpenAI(model=OPENAI_MODEL)
+    return VectorStoreIndex.from_vector_store(vector_store=vector_store, storage_context=storage_context)
+
+def time_us(func, iterations: int) -> tuple[float, float]:
+    samples = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        func(i)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(samples), max(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-query retriever setup overhead")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--books", type=int, default=4, help="Distinct book ids queried in rotation")
+    args = parser.parse_args()
+
+    service = RetrieverService()
+    service.embed_model  # created once at startup
+
+    old_median, old_max = time_us(lambda i: rebuild_vector_index(i % args.books), args.iterations)
+    new_median, new_max = time_us(lambda i: service.embed_model, args.iterations)
+
+    print(f"{'path':>26} {'median (us)':>12} {'max (us)':>12}")
+    print(f"{'rebuild per query':>26} {old_median:>12.1f} {old_max:>12.1f}")
+    print(f"{'RetrieverService':>26} {new_median:>12.1f} {new_max:>12.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# benchmark for the ANN index on chunks.embedding: recall@k and p50/p99 latency of
+# search_chunks at several ef_search values, against exact search on a synthetic corpus.
+# --filler-books adds books that are never queried, so each queried book is a small share of the
+# index: that is where filtering by book_id after the index scan returns short results, and the
+# "short" column shows how often it happens with and without iterative scan / exact fallback.
+# usage: PYTHONPATH=. python scripts/bench_vector_search.py --books 5 --chunks 4000 --queries 200 --filler-books 200
+import argparse
+import time
+
+import numpy as np
+from sqlalchemy import text
+
+from backend.db import db
+from backend.db.db import managed_connection
+from backend.utils.retriever import search_chunks
+
+BENCH_GUTENBERG_ID = 99999980
+FILLER_GUTENBERG_ID = 99990000
+EMBED_DIM = 1536
+
+def make_centers(rng) -> np.ndarray:
+    return rng.standard_normal((64, EMBED_DIM)).astype(np.float32)
+
+def create_corpus(num_books: int, chunks_per_book: int, rng, first_gutenberg_id: int = BENCH_GUTENBERG_ID,
+                  keep_vectors: bool = True, centers: np.ndarray = None) -> dict:
+    # clustered random unit vectors, so neighbours are meaningful
+    if centers is None:
+        centers = make_centers(rng)
+    book_vectors = {}
+    for b in range(num_books):
+        gutenberg_id = first_gutenberg_id + b
+        drop_book(gutenberg_id)
+        db.insert("books", ["gutenberg_id", "title", "author", "language", "language_level", "source"], [
+            gutenberg_id, f"Vector Benchmark {b}", "Benchmark", "es", "A1", "https://example.com"
+        ])
+        book_id = db.select("books", "id", {"gutenberg_id": gutenberg_id})[0]["id"]
+
+        vectors = centers[rng.integers(0, len(centers), chunks_per_book)] + 0.5 * rng.standard_normal((chunks_per_book, EMBED_DIM))
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        db.bulk_insert("chunks", ["book_id", "page_number", "text", "embedding"],
+                       ((book_id, i, f"chunk {i}", vectors[i]) for i in range(chunks_per_book)))
+        if keep_vectors:
+            book_vectors[book_id] = vectors
+    with managed_connection() as session:
+        session.execute(text("ANALYZE chunks"))
+        session.commit()
+    return book_vectors
+
+def drop_book(gutenberg_id: int):
+    existing = db.select("books", "id", {"gutenberg_id": gutenberg_id})
+    if existing:
+        db.delete("chunks", {"book_id": existing[0]["id"]})
+        db.delete("books", {"id": existing[0]["id"]})
+
+def percentile(samples: list, q: float) -> float:
+    return float(np.percentile(samples, q))
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ANN recall and latency against exact search")
+    parser.add_argument("--books", type=int, default=5, help="Synthetic books in the corpus")
+    parser.add_argument("--chunks", type=int, default=4000, help="Chunks per book")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per setting")
+    parser.add_argument("--top-k", type=int, default=5, help="k for recall@k")
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[10, 40, 100, 200], help="ef_search values to try")
+    parser.add_argument("--probes", type=int, default=10, help="ivfflat.probes (if the index is IVFFlat)")
+    parser.add_argument("--filler-books", type=int, default=200, help="Extra books in the index that are never queried")
+    parser.add_argument("--filler-chunks", type=int, default=300, help="Chunks per filler book")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    try:
+        # filler books share the clusters, so they crowd the queried book's neighbours in the index
+        centers = make_centers(rng)
+        book_vectors = create_corpus(args.books, args.chunks, rng, centers=centers)
+        if args.filler_books:
+            create_corpus(args.filler_books, args.filler_chunks, rng, first_gutenberg_id=FILLER_GUTENBERG_ID,
+                          keep_vectors=False, centers=centers)
+        book_ids = list(book_vectors)
+        queries = []
+        for _ in range(args.queries):
+            book_id = book_ids[rng.integers(0, len(book_ids))]
+            base = book_vectors[book_id][rng.integers(0, args.chunks)]
+            query = base + 0.3 * rng.standard_normal(EMBED_DIM)
+            queries.append((book_id, query / np.linalg.norm(query)))
+
+        exact, exact_latency = [], []
+        for book_id, query in queries:
+            start = time.perf_counter()
+            rows = search_chunks(query, book_id, top_k=args.top_k, exact=True)
+            exact_latency.append((time.perf_counter() - start) * 1000)
+            exact.append({row["chunk_id"] for row in rows})
+
+        print(f"{'setting':>30} {'recall@' + str(args.top_k):>10} {'short':>7} {'p50 (ms)':>10} {'p99 (ms)':>10}")
+        print(f"{'exact':>30} {1.0:>10.3f} {0.0:>7.3f} {percentile(exact_latency, 50):>10.2f} {percentile(exact_latency, 99):>10.2f}")
+
+        # plain post-filtering first, then what search_chunks does by default
+        modes = {"filter only": {"iterative_scan": "off", "exact_fallback": False}, "default": {}}
+        for ef_search in args.ef_search:
+            for mode, options in modes.items():
+                hits, short, latency = 0, 0, []
+                for (book_id, query), truth in zip(queries, exact):
+                    start = time.perf_counter()
+                    rows = search_chunks(query, book_id, top_k=args.top_k, ef_search=ef_search, probes=args.probes, **options)
+                    latency.append((time.perf_counter() - start) * 1000)
+                    hits += len(truth & {row["chunk_id"] for row in rows})
+                    short += len(rows) < args.top_k
+                recall = hits / (len(queries) * args.top_k)
+                setting = f"ef_search={ef_search} {mode}"
+                print(f"{setting:>30} {recall:>10.3f} {short / len(queries):>7.3f} "
+                      f"{percentile(latency, 50):>10.2f} {percentile(latency, 99):>10.2f}")
+    finally:
+        for b in range(args.books):
+            drop_book(BENCH_GUTENBERG_ID + b)
+        for b in range(args.filler_books):
+            drop_book(FILLER_GUTENBERG_ID + b)
+
+if __name__ == "__main__":
+    main()
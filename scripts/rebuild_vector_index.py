@@ -0,0 +1,144 @@
+# i needed to rebuild the index since i didn't include metadata the first time it was built
+# the metadata is needed to filter the chunks table by book id
+# that version went through llama-index's PGVectorStore, which writes to its own data_chunks table.
+# retrieval has read chunks.embedding directly (search_chunks) since the retriever rewrite, so
+# data_chunks is no longer read by anything. the index that serves queries is ix_chunks_embedding_ann
+# on chunks.embedding, and this script rebuilds that one in place with REINDEX CONCURRENTLY: the
+# stored embeddings are reused, no embedding calls are made, and reads and ingestion keep working.
+# usage: PYTHONPATH=. python scripts/rebuild_vector_index.py [--maintenance-work-mem 2GB] [--parallel-workers 4]
+#        [--drop-llama-table]
+import argparse
+import threading
+import time
+
+from sqlalchemy import text
+from tqdm import tqdm
+
+from backend.db.db import managed_connection
+from backend.db.init_db import engine
+
+INDEX_NAME = "ix_chunks_embedding_ann"
+LLAMA_INDEX_TABLE = "data_chunks"
+
+COUNT_SQL = """
+    SELECT count(*) FILTER (WHERE embedding IS NOT NULL) AS embedded,
+           count(*) FILTER (WHERE embedding IS NULL) AS missing
+    FROM chunks
+"""
+# the concurrent rebuild builds a new index (…_ccnew) next to the old one, so progress is looked up by table
+PROGRESS_SQL = """
+    SELECT phase, blocks_done, blocks_total, tuples_done, tuples_total
+    FROM pg_stat_progress_create_index
+    WHERE relid = 'chunks'::regclass AND command = 'REINDEX CONCURRENTLY'
+"""
+INDEX_VALID_SQL = """
+    SELECT i.indisvalid AS valid, pg_relation_size(i.indexrelid) AS bytes
+    FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+    WHERE c.relname = :index_name
+"""
+
+def reindex(maintenance_work_mem: str = None, parallel_workers: int = None, errors: list = None):
+    """
+    Runs REINDEX INDEX CONCURRENTLY on the ANN index; it cannot run inside a transaction.
+
+    Args:
+        maintenance_work_mem (str, optional): Memory for the build, e.g. "2GB". HNSW builds are much
+            faster when the graph fits in it.
+        parallel_workers (int, optional): max_parallel_maintenance_workers for the build.
+        errors (list, optional): Receives the exception if the rebuild fails (used when run in a thread).
+    """
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        try:
+            if maintenance_work_mem:
+                connection.execute(text("SELECT set_config('maintenance_work_mem', :value, false)"),
+                                   {"value": maintenance_work_mem})
+            if parallel_workers is not None:
+                connection.execute(text("SELECT set_config('max_parallel_maintenance_workers', :value, false)"),
+                                   {"value": str(parallel_workers)})
+            connection.execute(text(f"REINDEX INDEX CONCURRENTLY {INDEX_NAME}"))
+        except Exception as e:
+            if errors is None:
+                raise
+            errors.append(e)
+        finally:
+            # the connection goes back to the pool, so the build settings must not stick to it
+            connection.execute(text("RESET ALL"))
+
+def read_progress() -> dict:
+    with managed_connection() as db:
+        row = db.execute(text(PROGRESS_SQL)).mappings().first()
+    return dict(row) if row else None
+
+def rebuild(maintenance_work_mem: str = None, parallel_workers: int = None, show_progress: bool = True,
+            poll_interval: float = 2.0) -> dict:
+    """
+    Rebuilds the ANN index on chunks.embedding from the stored embeddings, reporting build progress.
+
+    Args:
+        maintenance_work_mem (str, optional): Memory for the build, e.g. "2GB".
+        parallel_workers (int, optional): max_parallel_maintenance_workers for the build.
+        show_progress (bool, optional): Whether to draw a progress bar.
+        poll_interval (float, optional): Seconds between pg_stat_progress_create_index reads.
+
+    Returns:
+        dict: Chunks indexed, chunks skipped for lack of an embedding, index size, validity and elapsed time.
+    """
+    with managed_connection() as db:
+        counts = db.execute(text(COUNT_SQL)).mappings().one()
+
+    errors = []
+    worker = threading.Thread(target=reindex, args=(maintenance_work_mem, parallel_workers, errors), daemon=True)
+    start = time.perf_counter()
+    worker.start()
+    with tqdm(total=counts["embedded"], desc="Rebuilding index", unit="chunk", disable=not show_progress) as progress:
+        while worker.is_alive():
+            worker.join(poll_interval)
+            state = read_progress()
+            if state:
+                progress.set_postfix_str(state["phase"])
+                if state["tuples_total"]:
+                    progress.total = state["tuples_total"]
+                progress.n = state["tuples_done"] or 0
+                progress.refresh()
+        progress.n = progress.total or 0
+        progress.refresh()
+    if errors:
+        raise errors[0]
+
+    with managed_connection() as db:
+        index = db.execute(text(INDEX_VALID_SQL), {"index_name": INDEX_NAME}).mappings().one()
+    return {
+        "indexed": counts["embedded"],
+        "missing_embeddings": counts["missing"],
+        "index_bytes": index["bytes"],
+        "valid": index["valid"],
+        "seconds": time.perf_counter() - start,
+    }
+
+def drop_llama_table():
+    # left behind by the old llama-index rebuild; nothing reads it
+    with managed_connection() as db:
+        db.execute(text(f"DROP TABLE IF EXISTS {LLAMA_INDEX_TABLE}"))
+        db.commit()
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the ANN index on chunks.embedding without re-embedding")
+    parser.add_argument("--maintenance-work-mem", help="Memory for the index build, e.g. 2GB")
+    parser.add_argument("--parallel-workers", type=int, help="Parallel maintenance workers for the build")
+    parser.add_argument("--drop-llama-table", action="store_true",
+                        help=f"Also drop {LLAMA_INDEX_TABLE}, the unused table written by the old llama-index rebuild")
+    parser.add_argument("--no-progress", action="store_true", help="Do not draw a progress bar")
+    args = parser.parse_args()
+
+    stats = rebuild(args.maintenance_work_mem, args.parallel_workers, show_progress=not args.no_progress)
+    print(f"{INDEX_NAME} rebuilt over {stats['indexed']} chunks in {stats['seconds']:.1f}s "
+          f"({stats['index_bytes'] / 1e6:.1f} MB, valid={stats['valid']}), no embedding requests made")
+    if stats["missing_embeddings"]:
+        print(f"{stats['missing_embeddings']} chunks have no embedding yet and are not in the index; "
+              f"run scripts/add_books.py --repair to embed them")
+    if args.drop_llama_table:
+        drop_llama_table()
+        print(f"Dropped {LLAMA_INDEX_TABLE}")
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 import os
 from sqlalchemy import create_engine, text
 from backend.reference.constants import LANGS, LEVELS
+from backend.utils.catalog_cache import CATALOG_CHANNEL
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 engine = create_engine(DATABASE_URL, future=True, pool_pre_ping=True)
@@ -30,4 +31,7 @@ if __name__ == "__main__":
             ON CONFLICT (language, level) DO NOTHING
         """), params)
 
+        # running API workers reload their catalog cache when this commits
+        conn.execute(text("SELECT pg_notify(:channel, '')"), {"channel": CATALOG_CHANNEL})
+
     print("Seeded language_mapping and language_levels")
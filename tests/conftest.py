@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+SYNTHETIC_GUTENBERG_ID = 99999993
+VECTOR_GUTENBERG_ID = 99999994
+EMBED_DIM = 1536
+
+@pytest.fixture
+def run_async():
+    """
+    Runs coroutines on one event loop for the whole test.
+
+    asyncpg connections belong to the loop that opened them, so the async pool is
+    disposed before the loop closes; the next test starts with fresh connections.
+    """
+    from backend.db.async_db import async_engine
+
+    loop = asyncio.new_event_loop()
+    try:
+        yield loop.run_until_complete
+    finally:
+        loop.run_until_complete(async_engine.dispose())
+        loop.close()
+
+# database modules are imported inside the fixtures, so tests that need no database
+# (chunker, text source, ...) still run without DATABASE_URL
+
+def drop_book(gutenberg_id: int):
+    from backend.db import db
+
+    existing = db.select("books", "id", {"gutenberg_id": gutenberg_id})
+    if existing:
+        db.delete("chunks", {"book_id": existing[0]["id"]})
+        db.delete("books", {"id": existing[0]["id"]})
+
+@pytest.fixture
+def synthetic_book():
+    """
+    Creates a book with num_chunks pages of placeholder text (no embeddings) and drops it afterwards.
+
+    Returns a factory: synthetic_book(num_chunks) -> (book_id, gutenberg_id).
+    """
+    from sqlalchemy import text
+    from backend.db import db
+    from backend.db.db import managed_connection
+
+    def create(num_chunks: int) -> tuple[int, int]:
+        drop_book(SYNTHETIC_GUTENBERG_ID)
+        db.insert("books", ["gutenberg_id", "title", "author", "language", "language_level", "source"], [
+            SYNTHETIC_GUTENBERG_ID, "Synthetic Book", "Test Author", "es", "A1", "https://example.com"
+        ])
+        book_id = db.select("books", "id", {"gutenberg_id": SYNTHETIC_GUTENBERG_ID})[0]["id"]
+        with managed_connection() as session:
+            session.execute(text("""
+                INSERT INTO chunks (book_id, page_number, text)
+                SELECT :book_id, n, repeat('palabra ', 100)
+                FROM generate_series(0, :last) AS n
+            """), {"book_id": book_id, "last": num_chunks - 1})
+            session.commit()
+        return book_id, SYNTHETIC_GUTENBERG_ID
+
+    yield create
+    drop_book(SYNTHETIC_GUTENBERG_ID)
+
+@pytest.fixture
+def vector_book():
+    """
+    Creates a book whose chunks have clustered random unit embeddings and drops it afterwards.
+
+    Returns a factory: vector_book(num_chunks, rng) -> (book_id, vectors).
+    """
+    import numpy as np
+    from sqlalchemy import text
+    from backend.db import db
+    from backend.db.db import managed_connection
+
+    def create(num_chunks: int, rng) -> tuple[int, "np.ndarray"]:
+        drop_book(VECTOR_GUTENBERG_ID)
+        db.insert("books", ["gutenberg_id", "title", "author", "language", "language_level", "source"], [
+            VECTOR_GUTENBERG_ID, "Vector Book", "Test Author", "es", "A1", "https://example.com"
+        ])
+        book_id = db.select("books", "id", {"gutenberg_id": VECTOR_GUTENBERG_ID})[0]["id"]
+
+        # clustered, so neighbours are meaningful
+        centers = rng.standard_normal((16, EMBED_DIM)).astype(np.float32)
+        vectors = centers[rng.integers(0, len(centers), num_chunks)] + 0.5 * rng.standard_normal((num_chunks, EMBED_DIM))
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        db.bulk_insert("chunks", ["book_id", "page_number", "text", "embedding"],
+                       ((book_id, i, f"chunk {i}", vectors[i]) for i in range(num_chunks)))
+        with managed_connection() as session:
+            session.execute(text("ANALYZE chunks"))
+            session.commit()
+        return book_id, vectors
+
+    yield create
+    drop_book(VECTOR_GUTENBERG_ID)
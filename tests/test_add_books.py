@@ -0,0 +1,39 @@
+import time
+
+import pytest
+
+from backend.utils.embedding_pipeline import RateLimitBudget
+from scripts import add_books
+from scripts.add_books import ingest_all, parse_book_spec, read_book_specs
+
+def test_parse_book_spec():
+    assert parse_book_spec("2000:B1") == {"gutenberg_id": 2000, "level": "B1", "language": None}
+    assert parse_book_spec("15532 A2 es") == {"gutenberg_id": 15532, "level": "A2", "language": "es"}
+    with pytest.raises(ValueError):
+        parse_book_spec("2000")
+
+def test_read_book_specs_skips_comments(tmp_path):
+    path = tmp_path / "books.txt"
+    path.write_text("# spanish shelf\n2000 B1\n\n15532 A2 es  # short stories\n")
+    assert [spec["gutenberg_id"] for spec in read_book_specs(str(path))] == [2000, 15532]
+
+def test_ingest_all_reports_failures_in_input_order(monkeypatch):
+    budgets = []
+
+    def fake_ingest_book(gutenberg_id, level, language=None, dry_run=False, budget=None, show_progress=True):
+        budgets.append(budget)
+        # later books finish first, so completion order differs from input order
+        time.sleep((2003 - gutenberg_id) * 0.05)
+        if gutenberg_id == 2001:
+            raise RuntimeError("download failed")
+        return {"gutenberg_id": gutenberg_id, "status": "completed"}
+
+    monkeypatch.setattr(add_books, "ingest_book", fake_ingest_book)
+    specs = [parse_book_spec(f"{gutenberg_id} B1") for gutenberg_id in (2000, 2001, 2002)]
+    budget = RateLimitBudget(max_concurrency=2)
+    reports = ingest_all(specs, workers=3, budget=budget)
+
+    assert [r["gutenberg_id"] for r in reports] == [2000, 2001, 2002]
+    assert [r["status"] for r in reports] == ["completed", "error", "completed"]
+    assert reports[1]["error"] == "download failed"
+    assert len(budgets) == 3 and all(b is budget for b in budgets)
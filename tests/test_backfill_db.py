@@ -0,0 +1,63 @@
+from sqlalchemy import text
+
+from backend.db import db
+from backend.db.backfill import run_backfill, load_checkpoint
+from backend.db.db import managed_connection
+
+BACKFILL_TABLE = "test_backfill_rows"
+BACKFILL_ROWS = 10_000
+
+def create_backfill_table():
+    with managed_connection() as session:
+        session.execute(text(f"DROP TABLE IF EXISTS {BACKFILL_TABLE}"))
+        session.execute(text(f"""
+            CREATE UNLOGGED TABLE {BACKFILL_TABLE} AS
+            SELECT n AS id, n % 7 AS book_id, NULL::jsonb AS metadata
+            FROM generate_series(1, :rows) AS n
+        """), {"rows": BACKFILL_ROWS})
+        session.execute(text(f"ALTER TABLE {BACKFILL_TABLE} ADD PRIMARY KEY (id)"))
+        session.commit()
+
+def drop_backfill_table():
+    with managed_connection() as session:
+        session.execute(text(f"DROP TABLE IF EXISTS {BACKFILL_TABLE}"))
+        session.commit()
+
+def pending_rows() -> int:
+    return db.raw(f"SELECT count(*) AS n FROM {BACKFILL_TABLE} WHERE metadata IS NULL")[0]["n"]
+
+SET_METADATA = "metadata = jsonb_build_object('book_id', book_id)"
+
+def test_backfill_runs_in_slices_and_resumes(tmp_path):
+    checkpoint = str(tmp_path / "backfill.json")
+    create_backfill_table()
+    try:
+        # interrupted after three slices
+        first = run_backfill(BACKFILL_TABLE, SET_METADATA, where="metadata IS NULL", batch_size=1000,
+                             checkpoint_path=checkpoint, max_slices=3)
+        assert (first.updated, first.slices, first.last_key, first.done) == (3000, 3, 3000, False)
+        assert load_checkpoint(checkpoint) == 3000
+        assert pending_rows() == BACKFILL_ROWS - 3000
+
+        resumed = run_backfill(BACKFILL_TABLE, SET_METADATA, where="metadata IS NULL", batch_size=1000,
+                               checkpoint_path=checkpoint)
+        assert (resumed.updated, resumed.slices, resumed.done) == (7000, 7, True)
+        assert pending_rows() == 0
+
+        sample = db.raw(f"SELECT metadata FROM {BACKFILL_TABLE} WHERE id = 4200")[0]["metadata"]
+        assert sample == {"book_id": 4200 % 7}
+    finally:
+        drop_backfill_table()
+
+def test_dry_run_estimates_without_writing():
+    create_backfill_table()
+    try:
+        result = run_backfill(BACKFILL_TABLE, SET_METADATA, batch_size=2500, sleep=0.5, start_after=5000, dry_run=True)
+        assert pending_rows() == BACKFILL_ROWS
+    finally:
+        drop_backfill_table()
+
+    assert result.remaining == 5000
+    assert result.updated == 0
+    # two slices of the sampled duration plus one pause between them
+    assert result.estimated_seconds == 2 * result.seconds + 0.5
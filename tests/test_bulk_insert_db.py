@@ -0,0 +1,52 @@
+from backend.db import db
+
+def test_bulk_insert_chunks():
+    test_gutenberg_id = 99999997
+    existing = db.select("books", "id", {"gutenberg_id": test_gutenberg_id})
+    if existing:  # clean up if exists
+        db.delete("chunks", {"book_id": existing[0]["id"]})
+        db.delete("books", {"id": existing[0]["id"]})
+
+    db.insert("books", ["gutenberg_id", "title", "author", "language", "language_level", "source"], [
+        test_gutenberg_id, "Bulk Book", "Test Author", "es", "A1", "https://example.com"
+    ])
+    book_id = db.select("books", "id", {"gutenberg_id": test_gutenberg_id})[0]["id"]
+
+    columns = ["book_id", "page_number", "text", "embedding", "metadata"]
+    rows = [(book_id, i, f"Texto, con \"comillas\" {i}", [0.1 * i] * 1536, {"book_id": book_id}) for i in range(5)]
+    inserted = db.bulk_insert("chunks", columns, rows, batch_size=2)
+    assert inserted == 5
+
+    # pages 3 and 4 already exist and are skipped, 5-6 are new
+    overlap = [(book_id, i, f"Nuevo {i}", [0.5] * 1536, {"book_id": book_id}) for i in range(3, 7)]
+    inserted = db.bulk_insert("chunks", columns, overlap, batch_size=3, skip_duplicates=True)
+    assert inserted == 2
+
+    chunks = db.raw(
+        "SELECT id, page_number, text, metadata->>'book_id' AS meta_book_id FROM chunks WHERE book_id = :book_id ORDER BY page_number",
+        {"book_id": book_id},
+    )
+    assert [c["page_number"] for c in chunks] == list(range(7))
+    assert chunks[1]["text"] == 'Texto, con "comillas" 1'
+    assert chunks[3]["text"] == 'Texto, con "comillas" 3'
+    assert chunks[0]["meta_book_id"] == str(book_id)
+
+    # values are encoded by column type: a list stays JSON in a jsonb column, and text is escaped
+    tricky = [(book_id, 7, "\\N", [0.5] * 1536, [1, 2]), (book_id, 8, "a\\b\tc\nd", [0.5] * 1536, None)]
+    assert db.bulk_insert("chunks", columns, tricky) == 2
+    rows = db.raw(
+        "SELECT text, metadata, metadata IS NULL AS no_metadata FROM chunks WHERE book_id = :book_id AND page_number >= 7 ORDER BY page_number",
+        {"book_id": book_id},
+    )
+    assert rows[0]["text"] == "\\N" and rows[0]["metadata"] == [1, 2]
+    assert rows[1]["text"] == "a\\b\tc\nd" and rows[1]["no_metadata"]
+
+    # bulk update by key
+    updated = db.bulk_update("chunks", "id", ["tokens"], [(chunks[0]["id"], 10), (chunks[1]["id"], 11)])
+    assert updated == 2
+    assert db.select("chunks", "tokens", {"id": chunks[1]["id"]})[0]["tokens"] == 11
+
+    deleted_chunks = db.delete("chunks", {"book_id": book_id})
+    deleted_book = db.delete("books", {"id": book_id})
+    assert deleted_chunks == 9
+    assert deleted_book == 1
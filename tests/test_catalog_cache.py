@@ -0,0 +1,52 @@
+import asyncio
+
+from backend.db import db
+from backend.db.db import managed_connection
+from backend.utils.catalog_cache import CatalogCache, build_snapshot, notify_catalog_changed
+
+TEST_GUTENBERG_ID = 99999991
+
+def test_snapshot_indexes():
+    books = [
+        {"id": 1, "gutenberg_id": 10, "title": "A", "author": "x", "language": "es", "language_level": "A1"},
+        {"id": 2, "gutenberg_id": 20, "title": "B", "author": "y", "language": "es", "language_level": "B1"},
+    ]
+    levels = [{"language": "es", "level": "A1"}, {"language": "es", "level": "B1"}]
+    snapshot = build_snapshot(books, [{"code": "es", "name": "Spanish"}], levels)
+
+    assert snapshot.levels_by_language == {"es": [{"level": "A1"}, {"level": "B1"}]}
+    assert [b["gutenberg_id"] for b in snapshot.books_by_language_level[("es", "B1")]] == [20]
+    assert "gutenberg_id" not in snapshot.books[0]
+    assert build_snapshot(books, [], levels).version != snapshot.version
+
+def add_book_and_notify():
+    db.delete("books", {"gutenberg_id": TEST_GUTENBERG_ID})
+    db.insert("books", ["gutenberg_id", "title", "author", "language", "language_level", "source"], [
+        TEST_GUTENBERG_ID, "Catalog Book", "Test Author", "es", "A2", "https://example.com"
+    ])
+    with managed_connection() as session:
+        notify_catalog_changed(session, TEST_GUTENBERG_ID)
+        session.commit()
+
+async def reload_on_notify():
+    cache = CatalogCache(listen=True, refresh_interval=60)
+    await cache.start()
+    try:
+        before = cache.snapshot.version
+        await asyncio.to_thread(add_book_and_notify)
+        for _ in range(50):
+            if cache.snapshot.version != before:
+                break
+            await asyncio.sleep(0.1)
+        return cache.snapshot, before
+    finally:
+        await cache.stop()
+
+def test_catalog_reloads_on_notify(run_async):
+    try:
+        snapshot, before = run_async(reload_on_notify())
+        assert snapshot.version != before
+        ids = [b["gutenberg_id"] for b in snapshot.books_by_language_level[("es", "A2")]]
+        assert TEST_GUTENBERG_ID in ids
+    finally:
+        db.delete("books", {"gutenberg_id": TEST_GUTENBERG_ID})
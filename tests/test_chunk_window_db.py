@@ -0,0 +1,50 @@
+from backend.config import CHUNK_WINDOW_MAX_CHUNKS
+from backend.db import db
+from backend.utils.chunks_utils import get_chunk_by_page, invalidate_book_meta
+
+def test_chunk_window_returns_neighbours_with_page_numbers(run_async, synthetic_book):
+    book_id, gutenberg_id = synthetic_book(50)
+    try:
+        invalidate_book_meta(gutenberg_id)
+        # first call goes through the joined meta query, the second through the cached range seek
+        first = run_async(get_chunk_by_page(gutenberg_id, 10, ahead=3, behind=2))
+        second = run_async(get_chunk_by_page(gutenberg_id, 10, ahead=3, behind=2))
+        assert first == second
+
+        assert [c["page"] for c in first["chunks"]] == [8, 9, 10, 11, 12, 13]
+        assert [c["page_number"] for c in first["chunks"]] == [7, 8, 9, 10, 11, 12]
+        assert first["chunk"]["chunk_id"] == first["chunks"][2]["chunk_id"]
+        assert (first["first_page"], first["last_page"]) == (8, 13)
+
+        # the window is clipped at both ends of the book
+        edge = run_async(get_chunk_by_page(gutenberg_id, 1, ahead=2, behind=5))
+        assert [c["page"] for c in edge["chunks"]] == [1, 2, 3]
+        end = run_async(get_chunk_by_page(gutenberg_id, 50, ahead=5))
+        assert [c["page"] for c in end["chunks"]] == [50]
+
+        # and capped in size
+        capped = run_async(get_chunk_by_page(gutenberg_id, 25, ahead=100, behind=100))
+        assert len(capped["chunks"]) <= CHUNK_WINDOW_MAX_CHUNKS
+        assert capped["chunk"] is not None
+    finally:
+        invalidate_book_meta(gutenberg_id)
+
+def test_pages_after_a_gap_stay_reachable(run_async, synthetic_book):
+    book_id, gutenberg_id = synthetic_book(20)
+    # pages that failed during ingestion leave holes in page_number
+    for page_number in range(5, 10):
+        db.delete("chunks", {"book_id": book_id, "page_number": page_number})
+    try:
+        invalidate_book_meta(gutenberg_id)
+        first = run_async(get_chunk_by_page(gutenberg_id, 1))
+        assert (first["total_chunks"], first["total_pages"]) == (15, 20)
+
+        gap = run_async(get_chunk_by_page(gutenberg_id, 7, ahead=4))
+        assert gap["chunk"] is None
+        assert [c["page"] for c in gap["chunks"]] == [11]
+
+        last = run_async(get_chunk_by_page(gutenberg_id, 20))
+        assert last["chunk"] is not None
+        assert run_async(get_chunk_by_page(gutenberg_id, 21)) is None
+    finally:
+        invalidate_book_meta(gutenberg_id)
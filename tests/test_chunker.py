@@ -0,0 +1,35 @@
+from backend.utils.chunker import chunk_text, count_embedding_tokens, iter_paragraphs
+
+TEXT = """En un lugar de la Mancha, de cuyo nombre no quiero acordarme, no ha mucho
+tiempo que vivía un hidalgo. Tenía en su casa una ama que pasaba de los cuarenta.
+
+¿Quién era? ¡Nadie lo sabía! Frisaba la edad de nuestro hidalgo con los cincuenta años.
+Era de complexión recia, seco de carnes, enjuto de rostro.
+"""
+
+def test_paragraphs_are_unwrapped():
+    paragraphs = list(iter_paragraphs(TEXT))
+    assert len(paragraphs) == 2
+    assert "mucho tiempo" in paragraphs[0]
+
+def test_chunks_keep_whole_sentences_within_budget():
+    chunks = list(chunk_text(TEXT, max_tokens=25))
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert chunk.tokens == count_embedding_tokens(chunk.text)
+        assert chunk.tokens <= 25
+        assert chunk.text.rstrip()[-1] in ".!?"
+
+    joined = " ".join(chunk.text.replace("\n\n", " ") for chunk in chunks)
+    assert joined.split() == " ".join(iter_paragraphs(TEXT)).split()
+
+def test_long_sentence_is_split_at_words():
+    text = " ".join(["palabra"] * 500) + "."
+    chunks = list(chunk_text(text, max_tokens=50))
+    assert len(chunks) > 1
+    assert all(chunk.tokens <= 50 for chunk in chunks)
+    assert sum(len(chunk.text.split()) for chunk in chunks) == 500
+
+def test_streams_from_lines():
+    lines = iter(TEXT.splitlines(keepends=True))
+    assert [c.text for c in chunk_text(lines, max_tokens=25)] == [c.text for c in chunk_text(TEXT, max_tokens=25)]
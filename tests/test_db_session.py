@@ -0,0 +1,18 @@
+from backend.db import db
+
+def test_helpers_share_request_session():
+    before = db.pool_status()["checkouts"]
+
+    dependency = db.get_session()
+    session = next(dependency)
+    try:
+        db.exists("language_levels", {"language": "es"}, session=session)
+        db.select("language_levels", "level", {"language": "es"}, session=session)
+        db.raw("SELECT 1 AS one", session=session)
+    finally:
+        dependency.close()
+
+    # three helper calls, one pool checkout
+    status = db.pool_status()
+    assert status["checkouts"] == before + 1
+    assert status["checked_out"] == 0
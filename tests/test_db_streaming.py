@@ -0,0 +1,60 @@
+from sqlalchemy import text
+
+from backend.db import db
+from backend.db.db import managed_connection
+
+STREAM_TABLE = "test_stream_rows"
+STREAM_ROWS = 100_000
+
+def current_rss_mb() -> float:
+    # resident set size right now (not the peak), from /proc
+    with open("/proc/self/statm") as f:
+        pages = int(f.read().split()[1])
+    return pages * 4096 / (1024 * 1024)
+
+def create_stream_table():
+    # ~50 MB of payload: far more than a few fetch-size batches
+    with managed_connection() as session:
+        session.execute(text(f"DROP TABLE IF EXISTS {STREAM_TABLE}"))
+        session.execute(text(f"""
+            CREATE UNLOGGED TABLE {STREAM_TABLE} AS
+            SELECT n AS id, n % 10 AS bucket, repeat(md5(n::text), 16) AS payload
+            FROM generate_series(1, :rows) AS n
+        """), {"rows": STREAM_ROWS})
+        session.commit()
+
+def drop_stream_table():
+    with managed_connection() as session:
+        session.execute(text(f"DROP TABLE IF EXISTS {STREAM_TABLE}"))
+        session.commit()
+
+def test_iter_raw_memory_stays_flat():
+    create_stream_table()
+    try:
+        baseline = current_rss_mb()
+        peak, count, total_length = baseline, 0, 0
+        for row in db.iter_raw(f"SELECT id, payload FROM {STREAM_TABLE} ORDER BY id", fetch_size=1000):
+            count += 1
+            total_length += len(row["payload"])
+            if count % 5000 == 0:
+                peak = max(peak, current_rss_mb())
+    finally:
+        drop_stream_table()
+
+    assert count == STREAM_ROWS
+    assert total_length == STREAM_ROWS * 512
+    # fetchall() of this table needs well over 50 MB; streaming holds one batch at a time
+    assert peak - baseline < 20
+
+def test_iter_select_yields_batches_with_condition():
+    create_stream_table()
+    try:
+        batches = list(db.iter_select(STREAM_TABLE, columns="id, bucket", condition={"bucket": 3},
+                                      fetch_size=4000, batches=True))
+    finally:
+        drop_stream_table()
+
+    assert [len(batch) for batch in batches] == [4000, 4000, 2000]
+    rows = [row for batch in batches for row in batch]
+    assert all(row["bucket"] == 3 for row in rows)
+    assert len({row["id"] for row in rows}) == STREAM_ROWS // 10
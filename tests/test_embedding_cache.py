@@ -0,0 +1,59 @@
+import time
+
+from sqlalchemy import text
+
+from backend.db import db
+from backend.db.db import managed_connection
+from backend.utils.embedding_cache import QueryEmbeddingCache, make_query_key
+
+def test_query_key_normalization():
+    assert make_query_key("m", "Who is  Don Quijote? ") == make_query_key("m", "Who is Don Quijote?")
+    assert make_query_key("m", "Who is Don Quijote?") != make_query_key("other-model", "Who is Don Quijote?")
+
+def test_memory_tier_expires():
+    cache = QueryEmbeddingCache(max_size=2, ttl=1, persist=False)
+    cache.set("m", "¿Quién es Sancho?", [0.1, 0.2])
+    assert cache.get("m", "¿Quién es Sancho?") == [0.1, 0.2]
+
+    time.sleep(1.1)
+    assert cache.get("m", "¿Quién es Sancho?") is None
+    assert cache.stats()["hit_rate"] == 0.5
+
+def test_persistent_tier():
+    model, query = "test-embedding-model", "Pregunta de prueba para la caché"
+    db.delete("query_embeddings", {"cache_key": make_query_key(model, query)})  # clean up if exists
+
+    cache = QueryEmbeddingCache(max_size=2, ttl=0, persist=True)
+    cache.set(model, query, [0.25] * 1536)
+
+    # a fresh process only has the database tier
+    fresh = QueryEmbeddingCache(max_size=2, ttl=0, persist=True)
+    embedding = fresh.get(model, query)
+    assert embedding is not None and len(embedding) == 1536
+    assert embedding[0] == 0.25
+    assert fresh.stats()["db_hits"] == 1
+
+    deleted = db.delete("query_embeddings", {"cache_key": make_query_key(model, query)})
+    assert deleted == 1
+
+def test_writes_prune_expired_rows():
+    model = "test-embedding-model"
+    old_key, new_key = make_query_key(model, "Consulta caducada"), make_query_key(model, "Consulta nueva")
+    for key in (old_key, new_key):
+        db.delete("query_embeddings", {"cache_key": key})
+
+    cache = QueryEmbeddingCache(max_size=2, ttl=60, persist=True)
+    cache.set(model, "Consulta caducada", [0.5] * 1536)
+    with managed_connection() as session:
+        session.execute(text("UPDATE query_embeddings SET created_at = now() - interval '1 hour' WHERE cache_key = :key"),
+                        {"key": old_key})
+        session.commit()
+
+    # the first write of a process prunes, later ones wait for prune_interval
+    fresh = QueryEmbeddingCache(max_size=2, ttl=60, persist=True)
+    fresh.set(model, "Consulta nueva", [0.25] * 1536)
+    assert not db.select("query_embeddings", "cache_key", {"cache_key": old_key})
+    assert db.select("query_embeddings", "cache_key", {"cache_key": new_key})
+    assert fresh.prune() == 0
+
+    db.delete("query_embeddings", {"cache_key": new_key})
@@ -0,0 +1,100 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from types import SimpleNamespace
+
+import httpx
+from openai import APIConnectionError, OpenAI
+
+from backend.utils import embedding_pipeline
+from backend.utils.embedding_pipeline import EmbeddingPipeline, RateLimitBudget
+
+class FakeEmbeddingsHandler(BaseHTTPRequestHandler):
+    # stand-in for /v1/embeddings: the first request is rate limited, the rest succeed
+    calls = []
+    lock = threading.Lock()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with self.lock:
+            self.calls.append(len(body["input"]))
+            first = len(self.calls) == 1
+
+        if first:
+            self._send(429, {"error": {"message": "Rate limit reached", "type": "requests"}}, {"Retry-After": "0.2"})
+            return
+
+        data = [
+            {"object": "embedding", "index": i, "embedding": [float(len(text)), float(i)]}
+            for i, text in enumerate(body["input"])
+        ]
+        self._send(200, {"object": "list", "data": data, "model": body["model"], "usage": {"prompt_tokens": 0, "total_tokens": 0}})
+
+    def _send(self, status, payload, headers=None):
+        raw = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def log_message(self, *args):
+        pass
+
+def test_pipeline_batches_and_retries_rate_limits():
+    FakeEmbeddingsHandler.calls = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeEmbeddingsHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    try:
+        client = OpenAI(api_key="test", base_url=f"http://127.0.0.1:{server.server_port}/v1", max_retries=0)
+        budget = RateLimitBudget(max_concurrency=3)
+        pipeline = EmbeddingPipeline(client=client, model="test-model", batch_size=10, budget=budget)
+
+        texts = [f"chunk {'x' * i}" for i in range(45)]
+        results = {}
+        for batch in pipeline.embed(texts):
+            assert batch.error is None
+            for offset, embedding in enumerate(batch.embeddings):
+                results[batch.start + offset] = embedding
+    finally:
+        server.shutdown()
+
+    # every chunk embedded once, in the right position
+    assert sorted(results) == list(range(45))
+    for i, text in enumerate(texts):
+        assert results[i][0] == float(len(text))
+
+    # 5 batches plus the one rate-limited attempt that was retried
+    assert len(FakeEmbeddingsHandler.calls) == 6
+    assert max(FakeEmbeddingsHandler.calls) == 10
+    assert budget.rate_limited == 1
+
+def test_transient_retry_waits_without_holding_a_slot(monkeypatch):
+    budget = RateLimitBudget(max_concurrency=1)
+    in_flight_while_sleeping = []
+    monkeypatch.setattr(embedding_pipeline, "_backoff", lambda attempt: 0.01)
+    fake_time = SimpleNamespace(monotonic=time.monotonic, sleep=lambda seconds: in_flight_while_sleeping.append(budget._in_flight))
+    monkeypatch.setattr(embedding_pipeline, "time", fake_time)
+
+    attempts = []
+
+    def create(model, input):
+        attempts.append(len(input))
+        if len(attempts) == 1:
+            raise APIConnectionError(request=httpx.Request("POST", "http://test/v1/embeddings"))
+        data = [SimpleNamespace(index=i, embedding=[float(i)]) for i in range(len(input))]
+        return SimpleNamespace(data=data)
+
+    client = SimpleNamespace(embeddings=SimpleNamespace(create=create))
+    pipeline = EmbeddingPipeline(client=client, model="test-model", budget=budget)
+
+    assert pipeline.embed_batch(["a", "b"]) == [[0.0], [1.0]]
+    assert len(attempts) == 2
+    # the only slot was free while the retry slept
+    assert in_flight_while_sleeping == [0]
@@ -0,0 +1,52 @@
+import uuid
+
+from backend.db import db
+from backend.utils.embedding_pipeline import EmbeddingPipeline, RateLimitBudget
+from backend.utils.embedding_store import EmbeddingStore, make_content_hash
+
+class CountingClient:
+    # stand-in for the OpenAI client that records every embeddings request
+    def __init__(self):
+        self.calls = []
+        self.embeddings = self
+
+    def create(self, model, input):
+        self.calls.append(list(input))
+        data = [type("Item", (), {"index": i, "embedding": [float(len(text))] * 1536}) for i, text in enumerate(input)]
+        return type("Response", (), {"data": data})
+
+def test_content_hash_ignores_whitespace_and_is_model_specific():
+    assert make_content_hash("m", "hello   world ") == make_content_hash("m", "hello world")
+    # case is kept: it changes the embedding
+    assert make_content_hash("m", "Hello world") != make_content_hash("m", "hello world")
+    assert make_content_hash("m", "hello world") != make_content_hash("other", "hello world")
+
+def test_second_run_is_served_from_store():
+    model = f"test-model-{uuid.uuid4().hex[:8]}"
+    texts = [f"{model} chunk {i}" for i in range(12)] + [f"{model} chunk 0"]
+
+    try:
+        first_client = CountingClient()
+        first = EmbeddingPipeline(client=first_client, model=model, batch_size=5,
+                                  budget=RateLimitBudget(max_concurrency=1), store=EmbeddingStore(model))
+        first_run = {}
+        for batch in first.embed(texts):
+            assert batch.error is None
+            for offset, embedding in enumerate(batch.embeddings):
+                first_run[batch.start + offset] = embedding
+
+        # batches run one at a time here, so the repeated text is only sent once
+        assert sum(len(call) for call in first_client.calls) == 12
+
+        second_client = CountingClient()
+        second = EmbeddingPipeline(client=second_client, model=model, batch_size=5, store=EmbeddingStore(model))
+        for batch in second.embed(texts):
+            assert batch.error is None
+            for offset, embedding in enumerate(batch.embeddings):
+                assert embedding == first_run[batch.start + offset]
+
+        assert second_client.calls == []
+        assert second.cache_hits == len(texts)
+        assert second.requests_avoided == 3
+    finally:
+        db.delete("chunk_embeddings", {"model": model})
@@ -0,0 +1,127 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+
+from backend import app as app_module
+from backend.utils import auth_utils, openai_helpers
+from backend.utils.explanation_cache import explanation_cache
+
+class CountingFakeLLM:
+    # stands in for AsyncOpenAI: records how many calls ran and how many overlapped at once
+    def __init__(self, delay: float = 0.2):
+        self.delay = delay
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        message = SimpleNamespace(content=f"explanation {self.calls}")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+async def post_batch(payload):
+    transport = httpx.ASGITransport(app=app_module.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.post("/explain/batch", json=payload, headers={"x-api-key": "test-key"})
+
+def test_batch_explains_unique_selections_with_bounded_concurrency(monkeypatch):
+    fake = CountingFakeLLM()
+    monkeypatch.setattr(openai_helpers, "client", fake)
+    monkeypatch.setattr(auth_utils, "PAGEPAL_API_KEY", "test-key")
+    monkeypatch.setattr(app_module, "EXPLAIN_BATCH_CONCURRENCY", 3)
+    monkeypatch.setattr(explanation_cache, "persist", False)
+    explanation_cache.memory.clear()
+
+    selections = [f"palabra {i}" for i in range(10)] + ["palabra 0", "palabra 1"]
+    payload = {
+        "selections": selections,
+        "language_level": "A2",
+        "book_title": "Don Quijote",
+        "book_language": "Spanish",
+    }
+
+    response = asyncio.run(post_batch(payload))
+    assert response.status_code == 200
+    body = response.json()
+
+    assert fake.calls == 10
+    assert fake.max_active <= 3
+    assert body["errors"] == {}
+    assert list(body["explanations"]) == [f"palabra {i}" for i in range(10)]
+
+    # a second batch is served from the cache without new LLM calls
+    response = asyncio.run(post_batch(payload))
+    assert response.status_code == 200
+    assert response.json()["explanations"] == body["explanations"]
+    assert fake.calls == 10
+
+def test_batch_rejects_too_many_selections(monkeypatch):
+    monkeypatch.setattr(auth_utils, "PAGEPAL_API_KEY", "test-key")
+    payload = {"selections": ["x"] * 1000, "language_level": "A2"}
+
+    response = asyncio.run(post_batch(payload))
+    assert response.status_code == 422
+
+async def post_explain(client_ip: str, payload):
+    transport = httpx.ASGITransport(app=app_module.app, client=(client_ip, 1234))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.post("/explain", json=payload, headers={"x-api-key": "test-key"})
+
+def test_coalesced_explain_requests_are_rate_limited_per_caller(monkeypatch):
+    fake = CountingFakeLLM(delay=0.3)
+    monkeypatch.setattr(openai_helpers, "client", fake)
+    monkeypatch.setattr(auth_utils, "PAGEPAL_API_KEY", "test-key")
+    monkeypatch.setattr(explanation_cache, "persist", False)
+    explanation_cache.memory.clear()
+    app_module.limiter.reset()
+
+    payload = {"text": "hidalgo", "language_level": "A2"}
+
+    async def fire():
+        # four identical requests from a client allowed three a minute, one from another client
+        return await asyncio.gather(*[post_explain("10.0.0.1", payload) for _ in range(4)],
+                                    post_explain("10.0.0.2", payload))
+
+    try:
+        responses = asyncio.run(fire())
+    finally:
+        app_module.limiter.reset()
+
+    statuses = [response.status_code for response in responses]
+    assert sorted(statuses[:4]) == [200, 200, 200, 429]
+    # the other client never pays for the first client's limit
+    assert statuses[4] == 200
+    assert fake.calls == 1
+
+def test_batch_is_charged_per_uncached_selection(monkeypatch):
+    fake = CountingFakeLLM(delay=0)
+    monkeypatch.setattr(openai_helpers, "client", fake)
+    monkeypatch.setattr(auth_utils, "PAGEPAL_API_KEY", "test-key")
+    monkeypatch.setattr(explanation_cache, "persist", False)
+    explanation_cache.memory.clear()
+    app_module.limiter.reset()
+
+    def batch(prefix: str, count: int) -> dict:
+        return {"selections": [f"{prefix} {i}" for i in range(count)], "language_level": "A2"}
+
+    try:
+        # 50 uncached selections fit the default 60 a minute; 20 more do not
+        first = asyncio.run(post_batch(batch("palabra", 50)))
+        second = asyncio.run(post_batch(batch("frase", 20)))
+        # selections already cached cost nothing
+        repeat = asyncio.run(post_batch(batch("palabra", 50)))
+    finally:
+        app_module.limiter.reset()
+
+    assert first.status_code == 200
+    assert second.status_code == 429
+    assert repeat.status_code == 200
+    assert fake.calls == 50
@@ -0,0 +1,157 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+from openai import AsyncOpenAI
+
+from backend import app as app_module
+from backend.schemas.validate import ExplainationRequest
+from backend.utils import auth_utils, openai_helpers
+from backend.utils.explanation_cache import explanation_cache
+
+TOKENS = ["Un ", "hidalgo ", "es ", "un ", "noble."]
+TOKEN_DELAY = 0.2
+
+class FakeStreamingHandler(BaseHTTPRequestHandler):
+    # stand-in for /v1/chat/completions with stream=True: one SSE chunk every TOKEN_DELAY seconds
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        for token in TOKENS:
+            chunk = {
+                "id": "chatcmpl-test",
+                "object": "chat.completion.chunk",
+                "created": 0,
+                "model": "fake",
+                "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+            time.sleep(TOKEN_DELAY)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def log_message(self, *args):
+        pass
+
+async def collect_stream():
+    arrivals = []
+    parts = []
+    async for token in openai_helpers.stream_explanation("hidalgo", "A2", book_language="Spanish"):
+        arrivals.append(time.perf_counter())
+        parts.append(token)
+    return arrivals, "".join(parts)
+
+def test_stream_explanation_yields_tokens_as_they_arrive(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeStreamingHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    try:
+        fake_client = AsyncOpenAI(api_key="test", base_url=f"http://127.0.0.1:{server.server_port}/v1")
+        monkeypatch.setattr(openai_helpers, "client", fake_client)
+        arrivals, text = asyncio.run(collect_stream())
+    finally:
+        server.shutdown()
+
+    assert text == "".join(TOKENS)
+    # measured from the first token, since the client's first request has its own setup cost:
+    # each token is relayed when it arrives, not once the whole explanation is done
+    assert len(arrivals) == len(TOKENS)
+    assert arrivals[-1] - arrivals[0] >= TOKEN_DELAY * (len(TOKENS) - 1) * 0.8
+
+PAYLOAD = {"text": "hidalgo", "language_level": "A2", "book_language": "Spanish"}
+
+def fake_stream_explanation(state: dict, delay: float = 0.05):
+    # stands in for openai_helpers.stream_explanation and records whether it was closed
+    async def stream_explanation(**kwargs):
+        try:
+            for token in TOKENS:
+                await asyncio.sleep(delay)
+                state["sent"] = state.get("sent", 0) + 1
+                yield token
+        finally:
+            state["closed"] = True
+    return stream_explanation
+
+def parse_sse(body: str) -> list[tuple]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines.get("event", "message"), json.loads(lines["data"])))
+    return events
+
+def setup_stream(monkeypatch, state: dict) -> str:
+    monkeypatch.setattr(app_module, "stream_explanation", fake_stream_explanation(state))
+    monkeypatch.setattr(auth_utils, "PAGEPAL_API_KEY", "test-key")
+    monkeypatch.setattr(explanation_cache, "persist", False)
+    explanation_cache.memory.clear()
+    app_module.limiter.reset()
+    return app_module._explanation_cache_key(ExplainationRequest(**PAYLOAD))
+
+async def post_stream():
+    transport = httpx.ASGITransport(app=app_module.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.post("/explain/stream", json=PAYLOAD, headers={"x-api-key": "test-key"})
+
+def test_stream_endpoint_caches_the_completed_explanation(monkeypatch):
+    state = {}
+    cache_key = setup_stream(monkeypatch, state)
+    try:
+        response = asyncio.run(post_stream())
+    finally:
+        app_module.limiter.reset()
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = parse_sse(response.text)
+    assert [data["delta"] for event, data in events[:-1]] == TOKENS
+    assert events[-1] == ("done", {"explanation": "".join(TOKENS)})
+    assert state["closed"]
+    assert explanation_cache.memory.get(cache_key) == "".join(TOKENS)
+
+async def stream_then_disconnect(app) -> list[dict]:
+    # drives the ASGI app directly so the client can go away after the first delta
+    sent = []
+    first_delta = asyncio.Event()
+    messages = [{"type": "http.request", "body": json.dumps(PAYLOAD).encode(), "more_body": False}]
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await first_delta.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+        if message["type"] == "http.response.body" and message.get("body"):
+            first_delta.set()
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": "/explain/stream", "raw_path": b"/explain/stream", "query_string": b"",
+        "root_path": "", "client": ("127.0.0.1", 1234), "server": ("test", 80),
+        "headers": [(b"content-type", b"application/json"), (b"x-api-key", b"test-key")],
+    }
+    await app(scope, receive, send)
+    return sent
+
+def test_stream_endpoint_cancels_upstream_on_disconnect(monkeypatch):
+    state = {}
+    cache_key = setup_stream(monkeypatch, state)
+    try:
+        sent = asyncio.run(stream_then_disconnect(app_module.app))
+    finally:
+        app_module.limiter.reset()
+
+    body = b"".join(message.get("body", b"") for message in sent if message["type"] == "http.response.body")
+    assert b"event: done" not in body
+    # the upstream stream was closed before it produced every token, and nothing was cached
+    assert state["closed"]
+    assert state["sent"] < len(TOKENS)
+    assert explanation_cache.memory.get(cache_key) is None
@@ -0,0 +1,34 @@
+from backend.db import db
+from backend.utils.explanation_cache import ExplanationCache, make_cache_key
+
+def test_cache_key_normalization():
+    key = make_cache_key("En un  lugar de la Mancha", "b2", context_before="  Capítulo primero ")
+    same = make_cache_key("En un lugar de la Mancha", "B2", context_before="Capítulo primero")
+    assert key == same
+
+    # different prompt versions must not share explanations
+    assert key != make_cache_key("En un lugar de la Mancha", "B2", context_before="Capítulo primero", prompt_version="v2")
+    assert key != make_cache_key("En un lugar de la Mancha", "C1", context_before="Capítulo primero")
+
+def test_explanation_cache_tiers():
+    key = make_cache_key("Texto de prueba para la caché", "Z9", prompt_version="test")
+    db.delete("aioutput", {"cache_key": key})  # clean up if exists
+
+    cache = ExplanationCache(max_size=2, persist=True)
+    assert cache.get(key) is None
+    cache.set(key, "Una explicación")
+    assert cache.get(key) == "Una explicación"
+
+    # a fresh process only has the database tier
+    fresh = ExplanationCache(max_size=2, persist=True)
+    assert fresh.get(key) == "Una explicación"
+    assert fresh.stats()["db_hits"] == 1
+    assert fresh.get(key) == "Una explicación"
+    assert fresh.stats()["memory_hits"] == 1
+
+    stats = cache.stats()
+    assert stats["misses"] == 1
+    assert stats["memory_hits"] == 1
+
+    deleted = db.delete("aioutput", {"cache_key": key})
+    assert deleted == 1
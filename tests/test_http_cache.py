@@ -0,0 +1,79 @@
+import httpx
+from fastapi import FastAPI, Request
+
+from backend.db import db
+from backend.routers import chunks
+from backend.utils import auth_utils
+from backend.utils.chunks_utils import invalidate_book_meta
+from backend.utils.http_cache import CompressionMiddleware, cached_json_response
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, prefixes=("/book",), minimum_size=100)
+
+    @app.get("/books")
+    async def books(request: Request):
+        return cached_json_response(request, [{"title": "Don Quijote " * 20}])
+
+    @app.get("/other")
+    async def other(request: Request):
+        return cached_json_response(request, [{"title": "Don Quijote " * 20}])
+
+    app.include_router(chunks.router)
+    return app
+
+async def get(app: FastAPI, path: str, headers: dict = None, params: dict = None):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.get(path, headers=headers or {}, params=params)
+
+def test_etag_revalidation_and_compression(run_async):
+    app = build_app()
+    first = run_async(get(app, "/books", {"accept-encoding": "gzip"}))
+    assert first.status_code == 200
+    assert first.headers["content-encoding"] in ("gzip", "br")
+    # every route sits behind an API key, so shared caches must not store the response
+    assert first.headers["cache-control"].startswith("private, max-age=")
+    assert "s-maxage" not in first.headers["cache-control"]
+    etag = first.headers["etag"]
+    # the same ETag is sent for every encoding, so it is weak
+    assert etag.startswith('W/"')
+    plain = run_async(get(app, "/books", {"accept-encoding": "identity"}))
+    assert plain.headers["etag"] == etag
+
+    again = run_async(get(app, "/books", {"if-none-match": etag}))
+    assert again.status_code == 304
+    assert again.content == b""
+    # a client echoing the validator without W/ still revalidates
+    strong = run_async(get(app, "/books", {"if-none-match": etag.removeprefix("W/")}))
+    assert strong.status_code == 304
+
+    # only the configured prefixes are compressed
+    other = run_async(get(app, "/other", {"accept-encoding": "gzip"}))
+    assert "content-encoding" not in other.headers
+
+def test_chunk_etag_follows_content_version(monkeypatch, run_async, synthetic_book):
+    monkeypatch.setattr(auth_utils, "PAGEPAL_API_KEY", "test-key")
+    headers = {"x-api-key": "test-key"}
+    book_id, gutenberg_id = synthetic_book(10)
+    app = build_app()
+    path = f"/book/{gutenberg_id}/chunks"
+    try:
+        invalidate_book_meta(gutenberg_id)
+        first = run_async(get(app, path, headers, {"page": 3}))
+        etag = first.headers["etag"]
+
+        cached = run_async(get(app, path, {**headers, "if-none-match": etag}, {"page": 3}))
+        assert cached.status_code == 304
+
+        other_page = run_async(get(app, path, headers, {"page": 4}))
+        assert other_page.headers["etag"] != etag
+
+        # a re-ingest bumps the version, so the old ETag no longer matches
+        db.update("books", {"content_version": first.json()["content_version"] + 1}, {"id": book_id})
+        invalidate_book_meta(gutenberg_id)
+        fresh = run_async(get(app, path, {**headers, "if-none-match": etag}, {"page": 3}))
+        assert fresh.status_code == 200
+        assert fresh.headers["etag"] != etag
+    finally:
+        invalidate_book_meta(gutenberg_id)
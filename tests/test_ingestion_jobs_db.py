@@ -0,0 +1,64 @@
+from backend.db import db
+from backend.utils import ingestion_jobs
+from backend.utils.ingestion_jobs import PageWatermark
+
+TEST_GUTENBERG_ID = 99999992
+
+def test_watermark_advances_over_out_of_order_pages():
+    watermark = PageWatermark({0, 1, 5})
+    assert watermark.last_page == 1
+    assert watermark.add([3, 4]) == 1
+    assert watermark.add([2]) == 5
+    assert PageWatermark(set()).last_page is None
+
+def test_job_lifecycle_and_partial_detection():
+    db.delete("books", {"gutenberg_id": TEST_GUTENBERG_ID})
+    db.insert("books", ["gutenberg_id", "title", "author", "language", "language_level", "source"], [
+        TEST_GUTENBERG_ID, "Partial Book", "Test Author", "es", "A2", "https://example.com"
+    ])
+    book_id = db.select("books", "id", {"gutenberg_id": TEST_GUTENBERG_ID})[0]["id"]
+    try:
+        job = ingestion_jobs.start_job(book_id, "test-chunker")
+        assert job["status"] == "running"
+
+        # pages 0, 1 and 3 stored, page 2 lost in a crash
+        db.bulk_insert("chunks", ["book_id", "page_number", "text", "embedding"], [
+            (book_id, page, f"página {page}", [0.1] * 1536) for page in (0, 1, 3)
+        ])
+        ingestion_jobs.checkpoint(job["id"], 1)
+        ingestion_jobs.fail_job(job["id"], "KeyboardInterrupt()")
+
+        assert ingestion_jobs.committed_pages(book_id) == {0, 1, 3}
+        partial = {row["gutenberg_id"]: row for row in ingestion_jobs.find_partial_books()}
+        assert partial[TEST_GUTENBERG_ID]["status"] == "failed"
+        assert partial[TEST_GUTENBERG_ID]["missing_pages"] == 1
+
+        # a rerun reuses the same job row and completes it
+        resumed = ingestion_jobs.start_job(book_id, "test-chunker")
+        assert resumed["id"] == job["id"] and resumed["last_page"] == 1
+        db.insert("chunks", ["book_id", "page_number", "text", "embedding"], [book_id, 2, "página 2", [0.1] * 1536])
+        assert ingestion_jobs.finish_job(job["id"], 4, [], 3) == "completed"
+
+        partial = {row["gutenberg_id"] for row in ingestion_jobs.find_partial_books()}
+        assert TEST_GUTENBERG_ID not in partial
+    finally:
+        db.delete("chunks", {"book_id": book_id})
+        db.delete("books", {"id": book_id})
+
+def test_book_and_job_are_created_together_and_untracked_books_are_partial():
+    db.delete("books", {"gutenberg_id": TEST_GUTENBERG_ID})
+    job = ingestion_jobs.create_book_with_job({
+        "gutenberg_id": TEST_GUTENBERG_ID, "title": "Partial Book", "author": "Test Author",
+        "language": "es", "level": "A2", "source_url": "https://example.com",
+    }, "test-chunker")
+    try:
+        book_id = db.select("books", "id", {"gutenberg_id": TEST_GUTENBERG_ID})[0]["id"]
+        assert job["book_id"] == book_id and job["status"] == "running"
+
+        # a books row left behind without a job or chunks is listed so --repair ingests it
+        db.delete("ingestion_jobs", {"book_id": book_id})
+        partial = {row["gutenberg_id"]: row for row in ingestion_jobs.find_partial_books()}
+        assert partial[TEST_GUTENBERG_ID]["status"] is None
+        assert partial[TEST_GUTENBERG_ID]["chunks"] == 0
+    finally:
+        db.delete("books", {"gutenberg_id": TEST_GUTENBERG_ID})
@@ -0,0 +1,65 @@
+import os
+import time
+
+import numpy as np
+
+from backend.utils import retriever
+from backend.utils.retriever import LOAD_LOCK_STRIPES, BookMatrix, NumpySearchEngine, search_chunks
+
+EMBED_DIM = 1536
+
+def test_numpy_search_matches_exact_pgvector(tmp_path, vector_book):
+    rng = np.random.default_rng(11)
+    book_id, vectors = vector_book(500, rng)
+    engine = NumpySearchEngine(cache_dir=str(tmp_path))
+    for _ in range(20):
+        query = vectors[rng.integers(0, len(vectors))] + 0.3 * rng.standard_normal(EMBED_DIM)
+        expected = search_chunks(query, book_id, top_k=10, exact=True)
+        actual = engine.search(query, book_id, top_k=10)
+
+        assert [row["chunk_id"] for row in actual] == [row["chunk_id"] for row in expected]
+        assert [row["page_number"] for row in actual] == [row["page_number"] for row in expected]
+        for got, want in zip(actual, expected):
+            assert abs(got["distance"] - want["distance"]) < 1e-4
+    assert engine.stats()["loads"] == 1
+
+    # a fresh engine memory-maps the .npy written by the first load
+    assert any(name.endswith(".npy") for name in os.listdir(tmp_path))
+    reloaded = NumpySearchEngine(cache_dir=str(tmp_path)).matrix_for(book_id)
+    assert isinstance(reloaded.matrix, np.memmap)
+    assert reloaded.search(vectors[0], 3)[0]["page_number"] == 0
+
+def make_matrix(book_id: int, rows: int) -> BookMatrix:
+    return BookMatrix(
+        book_id=book_id,
+        content_version=1,
+        chunk_ids=np.arange(rows, dtype=np.int64),
+        page_numbers=np.arange(rows, dtype=np.int32),
+        texts=[""] * rows,
+        matrix=np.zeros((rows, EMBED_DIM), dtype=np.float32),
+        checked_at=time.monotonic(),
+    )
+
+def test_matrices_are_evicted_least_recently_used_first():
+    size = make_matrix(0, 100).nbytes
+    engine = NumpySearchEngine(max_bytes=2 * size, ttl=0)
+    engine._put(make_matrix(1, 100))
+    engine._put(make_matrix(2, 100))
+    assert engine.matrix_for(1).book_id == 1  # book 1 is now the most recently used
+
+    engine._put(make_matrix(3, 100))
+    assert engine._get(2) is None
+    assert engine._get(1) is not None and engine._get(3) is not None
+    assert engine.stats()["bytes"] <= engine.max_bytes
+
+    # a book that alone exceeds the budget is never kept
+    engine._put(make_matrix(4, 300))
+    assert engine._get(4) is None
+
+def test_load_locks_do_not_grow_with_books(monkeypatch):
+    monkeypatch.setattr(retriever, "load_book_matrix", lambda book_id, cache_dir: make_matrix(book_id, 10))
+    engine = NumpySearchEngine(max_bytes=5 * make_matrix(0, 10).nbytes, ttl=0)
+    for book_id in range(500):
+        assert engine.matrix_for(book_id).book_id == book_id
+    assert len(engine._load_locks) == LOAD_LOCK_STRIPES
+    assert engine.stats()["books"] == 5
@@ -0,0 +1,53 @@
+from backend.utils.prompt_loader import PromptRegistry, prompt_registry
+from backend.utils import token_utils
+from backend.utils.openai_helpers import build_messages
+
+def test_templates_load_from_any_working_directory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    registry = PromptRegistry()
+    assert {"explanation_v1", "explanation_v2"} <= set(registry._templates)
+
+def test_templates_are_compiled_once():
+    first = prompt_registry.get("explanation", "v2")
+    second = prompt_registry.get("explanation", "v2")
+    assert first is second
+
+def test_v2_system_prompt_shares_a_static_prefix():
+    spanish = build_messages("hidalgo", "A2", book_title="Don Quijote", book_language="Spanish")[0]["content"]
+    french = build_messages("bonjour", "C1", book_title="Les Misérables", book_language="French")[0]["content"]
+    static = prompt_registry.get("explanation", "v2").render().split("Reader details:")[0]
+
+    assert spanish.startswith(static)
+    assert french.startswith(static)
+    assert "Proficiency level: A2" in spanish
+    assert "Book language: French" in french
+
+def test_reload_picks_up_new_templates(tmp_path):
+    (tmp_path / "greeting_v1.j2").write_text("Hello {{ name }}")
+    registry = PromptRegistry(tmp_path)
+    assert registry.get("greeting", "v1").render(name="Ana") == "Hello Ana"
+
+    (tmp_path / "greeting_v2.j2").write_text("Hola {{ name }}")
+    assert "greeting_v2" not in registry._templates
+    registry.reload()
+    assert registry.get("greeting", "v2").render(name="Ana") == "Hola Ana"
+
+def test_token_counts_reported_per_version():
+    counts = prompt_registry.token_counts()
+    for name in ("explanation_v1", "explanation_v2"):
+        assert 0 < counts[name]["static_tokens"] <= counts[name]["sample_tokens"]
+
+def test_token_count_falls_back_when_tokenizer_download_fails(monkeypatch):
+    class OfflineTiktoken:
+        def encoding_for_model(self, model):
+            raise ConnectionError("no route to openaipublic.blob.core.windows.net")
+
+        def get_encoding(self, name):
+            raise ConnectionError("no route to openaipublic.blob.core.windows.net")
+
+    monkeypatch.setattr(token_utils, "tiktoken", OfflineTiktoken())
+    token_utils._encoding.cache_clear()
+    try:
+        assert token_utils.count_tokens("x" * 40, "offline-model") == 40 // token_utils.CHARS_PER_TOKEN
+    finally:
+        token_utils._encoding.cache_clear()
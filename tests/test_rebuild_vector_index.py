@@ -0,0 +1,12 @@
+from backend.db import db
+from scripts.rebuild_vector_index import INDEX_NAME, rebuild
+
+def test_rebuild_keeps_a_valid_ann_index():
+    stats = rebuild(show_progress=False, poll_interval=0.1)
+
+    assert stats["valid"] is True
+    assert stats["indexed"] == db.raw("SELECT count(*) AS n FROM chunks WHERE embedding IS NOT NULL")[0]["n"]
+    # the concurrent rebuild swaps the new index in under the same name and drops the old one
+    names = [row["indexname"] for row in db.raw("SELECT indexname FROM pg_indexes WHERE tablename = 'chunks'")]
+    assert INDEX_NAME in names
+    assert not any(name.startswith(f"{INDEX_NAME}_cc") for name in names)
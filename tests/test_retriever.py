@@ -1,4 +1,4 @@
-from backend.utils.retriever import retrieve_top_chunks
+from backend.utils.retriever import _supports_iterative_scan, retrieve_top_chunks
 from backend.db.db import select
 
 def test_retrieve_top_chunks_from_gutenberg_id():
@@ -15,3 +15,10 @@ def test_retrieve_top_chunks_from_gutenberg_id():
     assert chunks, "No chunks were retrieved"
     assert isinstance(chunks[0], str), "Chunk should be a string"
     print("Retrieved chunks:", chunks)
+
+def test_iterative_scan_needs_pgvector_0_8():
+    assert not _supports_iterative_scan("0.6.2")
+    assert not _supports_iterative_scan("0.7.4")
+    assert not _supports_iterative_scan(None)
+    assert _supports_iterative_scan("0.8.0")
+    assert _supports_iterative_scan("1.0")
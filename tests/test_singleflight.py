@@ -0,0 +1,62 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from backend.utils import openai_helpers
+from backend.utils.singleflight import SingleFlight
+
+class SlowFakeLLM:
+    # stands in for AsyncOpenAI: chat.completions.create sleeps, then returns a fixed explanation
+    def __init__(self, delay: float = 0.3):
+        self.delay = delay
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        message = SimpleNamespace(content=" Un hidalgo es un noble de rango menor. ")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+def test_identical_requests_share_one_llm_call(monkeypatch):
+    fake = SlowFakeLLM()
+    monkeypatch.setattr(openai_helpers, "client", fake)
+    flights = SingleFlight()
+
+    async def request():
+        return await flights.do("hidalgo|A2", lambda: openai_helpers.get_explanation("hidalgo", "A2"))
+
+    async def fire(n):
+        return await asyncio.gather(*(request() for _ in range(n)))
+
+    results = asyncio.run(fire(30))
+
+    assert fake.calls == 1
+    assert set(results) == {"Un hidalgo es un noble de rango menor."}
+    stats = flights.stats()
+    assert stats["executed"] == 1
+    assert stats["coalesced"] == 29
+    assert stats["in_flight"] == 0
+
+def test_errors_are_shared():
+    flights = SingleFlight()
+    calls = 0
+
+    async def failing():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.1)
+        raise RuntimeError("upstream failed")
+
+    async def fire(n):
+        return await asyncio.gather(*(flights.do("key", failing) for _ in range(n)), return_exceptions=True)
+
+    results = asyncio.run(fire(5))
+    assert calls == 1
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+    # once the failed call is done, the next request starts a new one
+    with pytest.raises(RuntimeError):
+        asyncio.run(flights.do("key", failing))
+    assert calls == 2
@@ -0,0 +1,71 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from backend.utils.text_source import iter_text_lines, strip_boilerplate
+
+BOOK = """The Project Gutenberg eBook of Don Quijote
+Release date: 2000
+
+*** START OF THE PROJECT GUTENBERG EBOOK DON QUIJOTE ***
+
+En un lugar de la Mancha, de cuyo nombre no quiero acordarme,
+no ha mucho tiempo que vivía un hidalgo.
+
+Capítulo ñ: señor, corazón, acción.
+
+*** END OF THE PROJECT GUTENBERG EBOOK DON QUIJOTE ***
+
+Full license text follows.
+"""
+
+class SlowBookHandler(BaseHTTPRequestHandler):
+    # serves the book a few bytes at a time so multi-byte characters are split across reads
+    def do_GET(self):
+        body = BOOK.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        for i in range(0, len(body), 7):
+            self.wfile.write(body[i:i + 7])
+            self.wfile.flush()
+
+    def log_message(self, *args):
+        pass
+
+def assert_story_only(lines):
+    text = "\n".join(lines).strip()
+    assert text.startswith("En un lugar")
+    assert text.endswith("Capítulo ñ: señor, corazón, acción.")
+    assert "Gutenberg" not in text
+    assert "license" not in text
+
+def test_strip_boilerplate_from_http_stream():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowBookHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        lines = list(strip_boilerplate(iter_text_lines(f"http://127.0.0.1:{server.server_port}/book.txt")))
+    finally:
+        server.shutdown()
+    assert_story_only(lines)
+
+def test_strip_boilerplate_from_local_file(tmp_path):
+    path = tmp_path / "book.txt"
+    path.write_text(BOOK, encoding="utf-8")
+    assert_story_only(list(strip_boilerplate(iter_text_lines(str(path)))))
+
+def test_text_without_markers_is_kept():
+    lines = ["Línea uno.", "", "Línea dos."]
+    assert list(strip_boilerplate(lines)) == lines
+
+def test_reading_stops_at_end_marker():
+    consumed = []
+
+    def source():
+        for line in ["*** START OF X ***", "texto", "*** END OF X ***", "license", "more license"]:
+            consumed.append(line)
+            yield line
+
+    assert [l for l in strip_boilerplate(source()) if l] == ["texto"]
+    assert "more license" not in consumed